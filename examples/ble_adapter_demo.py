@@ -7,6 +7,9 @@ This script shows how the PartectorBleManager handles Bluetooth adapter availabi
 import asyncio
 import time
 
+from naneos.partector_ble.partector_ble_adapter_monitor import (
+    PartectorBleAdapterMonitor,
+)
 from naneos.partector_ble.partector_ble_manager import PartectorBleManager
 
 
@@ -19,7 +22,7 @@ async def demo_adapter_checking():
 
     # Test the adapter checking method directly
     print("Testing Bluetooth adapter availability...")
-    is_available = await manager._is_bluetooth_adapter_available()
+    is_available = await PartectorBleAdapterMonitor.probe()
     print(f"Bluetooth adapter available: {is_available}")
     print()
 
@@ -0,0 +1,15 @@
+from naneos.arrow.naneos_arrow_snapshot import (
+    NANEOS_ARROW_SCHEMA,
+    create_arrow_snapshot,
+    create_data_from_arrow_snapshot,
+    create_record_batch,
+)
+from naneos.arrow.naneos_parquet_sink import NaneosParquetSink
+
+__all__ = [
+    "NANEOS_ARROW_SCHEMA",
+    "create_record_batch",
+    "create_arrow_snapshot",
+    "create_data_from_arrow_snapshot",
+    "NaneosParquetSink",
+]
@@ -0,0 +1,88 @@
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError as e:  # optional dependency
+    raise ImportError(
+        "naneos.arrow needs the pyarrow package: pip install naneos-devices[arrow]"
+    ) from e
+
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+
+INDEX_NAME = "unix_timestamp"
+
+_ARROW_TYPES = {
+    "Int32": pa.int32(),
+    "Int64": pa.int64(),
+    "Float32": pa.float32(),
+}
+
+
+def _create_schema() -> pa.Schema:
+    fields = []
+    for name, dtype in NaneosDeviceDataPoint.PANDAS_DTYPES_MAPPING.items():
+        if name == "connection_type":  # "serial", "connected" or "advertisement"
+            fields.append(pa.field(name, pa.string()))
+        else:
+            fields.append(pa.field(name, _ARROW_TYPES[dtype], nullable=name != INDEX_NAME))
+    return pa.schema(fields)
+
+
+# one schema for all snapshots, same columns and order as NaneosDeviceDataPoint
+NANEOS_ARROW_SCHEMA: pa.Schema = _create_schema()
+
+
+def create_record_batch(df: pd.DataFrame) -> pa.RecordBatch:
+    """
+    Converts the DataFrame of one device (indexed by unix_timestamp) into a record batch with
+    NANEOS_ARROW_SCHEMA. The values of the nullable Int32 / Float32 columns are not copied,
+    columns missing in df are null.
+    """
+    n = len(df)
+    arrays = []
+    for field in NANEOS_ARROW_SCHEMA:
+        if field.name == INDEX_NAME:
+            values = df.index
+        elif field.name in df.columns:
+            values = df[field.name]
+        else:
+            arrays.append(pa.nulls(n, field.type))
+            continue
+
+        arrays.append(pa.array(values, type=field.type, from_pandas=True))
+
+    return pa.RecordBatch.from_arrays(arrays, schema=NANEOS_ARROW_SCHEMA)
+
+
+def create_arrow_snapshot(snapshot: dict[int, pd.DataFrame]) -> pa.Table:
+    """
+    Converts a manager snapshot (DataFrames keyed by serial number) into a table with one record
+    batch per device.
+    """
+    batches = [create_record_batch(df) for df in snapshot.values() if not df.empty]
+    return pa.Table.from_batches(batches, schema=NANEOS_ARROW_SCHEMA)
+
+
+def create_data_from_arrow_snapshot(table: pa.Table) -> dict[int, pd.DataFrame]:
+    """Inverse of create_arrow_snapshot(), DataFrames with the nullable dtypes keyed by serial."""
+    df = table.to_pandas(types_mapper=_pandas_dtype)
+    df = df.set_index(INDEX_NAME)
+    df["connection_type"] = (
+        df["connection_type"].astype(object).where(df["connection_type"].notna(), None)
+    )
+
+    return {
+        int(serial): group
+        for serial, group in df.groupby("serial_number", sort=False)
+        if not pd.isna(serial)
+    }
+
+
+def _pandas_dtype(arrow_type: pa.DataType) -> object:
+    if arrow_type == pa.int32():
+        return pd.Int32Dtype()
+    if arrow_type == pa.int64():
+        return pd.Int64Dtype()
+    if arrow_type == pa.float32():
+        return pd.Float32Dtype()
+    return None
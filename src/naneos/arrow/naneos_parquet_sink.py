@@ -0,0 +1,202 @@
+import datetime
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from naneos.arrow.naneos_arrow_snapshot import (
+    INDEX_NAME,
+    NANEOS_ARROW_SCHEMA,
+    create_arrow_snapshot,
+    create_data_from_arrow_snapshot,
+)
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+class NaneosParquetSink:
+    """
+    Archives manager snapshots in rolling, time partitioned Parquet files.
+
+    Rows are partitioned by their unix_timestamp into date=YYYY-MM-DD directories (hive style,
+    also date=YYYY-MM-DD/hour=HH with partition="hour"). Every write() appends one row group per
+    partition to the open file of the partition. A file is finished (footer written) when it is
+    roll_seconds old, when its partition got no rows for roll_seconds and on close(). Open files
+    are hidden (leading dot) and renamed when they are finished, so readers only ever see complete
+    files.
+
+    read() loads the archive with partition pruning and row group statistics, e.g.
+    NaneosParquetSink.read(path, start=..., serial_numbers=[8112]), with the partition layout the
+    archive was written with.
+    """
+
+    DEFAULT_PATH = Path.home() / ".naneos" / "parquet"
+    PARTITIONS = ("day", "hour")
+    ROLL_SECONDS = 3600.0
+    COMPRESSION = "zstd"
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_PATH,
+        partition: str = "day",
+        roll_seconds: float = ROLL_SECONDS,
+        compression: str = COMPRESSION,
+    ) -> None:
+        if partition not in self.PARTITIONS:
+            raise ValueError(f"Unknown partition {partition}, use one of {self.PARTITIONS}.")
+
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._partition = partition
+        self._roll_seconds = roll_seconds
+        self._compression = compression
+
+        self._lock = threading.Lock()
+        # partition directory -> (writer, in progress path, opened, last write)
+        self._writers: dict[str, tuple[pq.ParquetWriter, Path, float, float]] = {}
+        self._counters = {"rows": 0, "row_groups": 0, "files": 0}
+
+    def __enter__(self) -> "NaneosParquetSink":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # == Public Methods ============================================================================
+    def write(self, snapshot: Union[dict[int, pd.DataFrame], pa.Table]) -> None:
+        """Appends a snapshot, as DataFrames keyed by serial number or as arrow table."""
+        table = snapshot if isinstance(snapshot, pa.Table) else create_arrow_snapshot(snapshot)
+
+        with self._lock:
+            now = time.time()
+            if table.num_rows > 0:
+                for directory, rows in self._split(table).items():
+                    self._writer(directory, now).write_table(rows)
+                    writer, path, opened, _ = self._writers[directory]
+                    self._writers[directory] = (writer, path, opened, now)
+                    self._counters["rows"] += rows.num_rows
+                    self._counters["row_groups"] += 1
+
+            self._roll(now)
+
+    def close(self) -> None:
+        """Finishes all open files."""
+        with self._lock:
+            for directory in list(self._writers):
+                self._finish(directory)
+
+    def get_counters(self) -> dict[str, int]:
+        """Returns the written rows, row groups and finished files."""
+        with self._lock:
+            return dict(self._counters)
+
+    @staticmethod
+    def read(
+        path: Union[str, Path] = DEFAULT_PATH,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        serial_numbers: Optional[list[int]] = None,
+        partition: str = "day",
+    ) -> dict[int, pd.DataFrame]:
+        """
+        Reads the finished files of an archive into DataFrames keyed by serial number.
+        start (inclusive) and end (exclusive) are pushed down to the partitions and row groups.
+        partition has to be the one the archive was written with ("day" or "hour").
+        """
+        if partition not in NaneosParquetSink.PARTITIONS:
+            raise ValueError(
+                f"Unknown partition {partition}, use one of {NaneosParquetSink.PARTITIONS}."
+            )
+
+        keys = [pa.field("date", pa.string())]
+        if partition == "hour":
+            keys.append(pa.field("hour", pa.string()))
+        partitioning = ds.partitioning(pa.schema(keys), flavor="hive")
+        schema = pa.schema(list(NANEOS_ARROW_SCHEMA) + keys)
+        dataset = ds.dataset(path, schema=schema, format="parquet", partitioning=partitioning)
+
+        # the partition directories are pruned by date (and hour), the row groups by unix_timestamp
+        conditions = []
+        if start is not None:
+            conditions.append(_partition_bound(start, partition, after=True))
+            conditions.append(ds.field(INDEX_NAME) >= _to_ms(start))
+        if end is not None:
+            conditions.append(_partition_bound(end, partition, after=False))
+            conditions.append(ds.field(INDEX_NAME) < _to_ms(end))
+        if serial_numbers is not None:
+            conditions.append(ds.field("serial_number").isin(serial_numbers))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        table = dataset.to_table(columns=NANEOS_ARROW_SCHEMA.names, filter=expression)
+        table = table.sort_by([("serial_number", "ascending"), (INDEX_NAME, "ascending")])
+        return create_data_from_arrow_snapshot(table)
+
+    # == Helpers ===================================================================================
+    def _split(self, table: pa.Table) -> dict[str, pa.Table]:
+        """Splits the rows by their partition directory."""
+        unit = 3_600_000 if self._partition == "hour" else 86_400_000
+        keys = table.column(INDEX_NAME).to_numpy() // unit
+
+        unique_keys = np.unique(keys).tolist()
+        if len(unique_keys) == 1:
+            return {self._directory(unique_keys[0] * unit): table}
+        return {self._directory(key * unit): table.filter(keys == key) for key in unique_keys}
+
+    def _directory(self, unix_ms: int) -> str:
+        t = datetime.datetime.fromtimestamp(unix_ms / 1e3, tz=datetime.timezone.utc)
+        directory = f"date={t:%Y-%m-%d}"
+        if self._partition == "hour":
+            directory += f"/hour={t:%H}"
+        return directory
+
+    def _writer(self, directory: str, now: float) -> pq.ParquetWriter:
+        if directory in self._writers:
+            return self._writers[directory][0]
+
+        folder = self._path / directory
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f".part-{int(now * 1e3)}.parquet"  # hidden until finished
+        writer = pq.ParquetWriter(path, NANEOS_ARROW_SCHEMA, compression=self._compression)
+        self._writers[directory] = (writer, path, now, now)
+        return writer
+
+    def _roll(self, now: float) -> None:
+        for directory, (_, _, opened, last_write) in list(self._writers.items()):
+            if now - opened >= self._roll_seconds or now - last_write >= self._roll_seconds:
+                self._finish(directory)
+
+    def _finish(self, directory: str) -> None:
+        writer, path, _, _ = self._writers.pop(directory)
+        try:
+            writer.close()
+            path.rename(path.with_name(path.name.removeprefix(".")))
+            self._counters["files"] += 1
+        except Exception as e:
+            logger.error(f"Could not finish the parquet file {path}: {e}")
+
+
+def _to_ms(t: datetime.datetime) -> int:
+    return int(t.timestamp() * 1e3)
+
+
+def _partition_bound(t: datetime.datetime, partition: str, after: bool) -> ds.Expression:
+    """Partitions at or after (before) the one of t, the zero padded keys compare as strings."""
+    utc = datetime.datetime.fromtimestamp(t.timestamp(), tz=datetime.timezone.utc)
+    date = ds.field("date")
+    if partition == "day":
+        return date >= f"{utc:%Y-%m-%d}" if after else date <= f"{utc:%Y-%m-%d}"
+
+    hour = ds.field("hour")
+    if after:
+        return (date > f"{utc:%Y-%m-%d}") | ((date == f"{utc:%Y-%m-%d}") & (hour >= f"{utc:%H}"))
+    return (date < f"{utc:%Y-%m-%d}") | ((date == f"{utc:%Y-%m-%d}") & (hour <= f"{utc:%H}"))
@@ -1,7 +1,13 @@
 from naneos.iotweb.download.downloader import download_from_iotweb
+from naneos.iotweb.naneos_upload_outbox import NaneosUploadOutbox
 from naneos.iotweb.naneos_upload_thread import NaneosUploadThread
+from naneos.iotweb.naneos_upload_worker import NaneosUploadWorker
+from naneos.iotweb.naneos_uploader import NaneosUploader
 
 __all__ = [
     "download_from_iotweb",
     "NaneosUploadThread",
+    "NaneosUploadOutbox",
+    "NaneosUploadWorker",
+    "NaneosUploader",
 ]
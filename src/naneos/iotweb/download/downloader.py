@@ -1,4 +1,10 @@
 import datetime as dt
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional, Union
 
 import pandas as pd
 from influxdb_client.client.influxdb_client import InfluxDBClient
@@ -8,6 +14,11 @@ from naneos.logger import get_naneos_logger
 URL_INFLUX = "https://influxdb.naneos.ch"
 ORG_INFLUX = "naneos"
 
+CHUNK_SECONDS = 3600 * 24 * 2
+DOWNLOAD_WORKERS = 4
+CACHE_DIR = Path.home() / ".naneos" / "iotweb_cache"
+CACHE_MIN_AGE_SECONDS = 3600  # newer data may still be uploaded
+
 logger = get_naneos_logger(__name__)
 
 
@@ -42,7 +53,13 @@ def create_start_stop_timestamp(start_dt: dt.datetime, stop_dt: dt.datetime) ->
 
 
 def download_from_iotweb(
-    name: str, serial_number: str, start: dt.datetime, stop: dt.datetime, token: str
+    name: str,
+    serial_number: str,
+    start: dt.datetime,
+    stop: dt.datetime,
+    token: str,
+    workers: int = DOWNLOAD_WORKERS,
+    cache_dir: Optional[Union[str, Path]] = CACHE_DIR,
 ) -> pd.DataFrame:
     """Download your data from influxdb.naneos.ch.
     1 Month of data takes about 30 seconds to download and uses about 100 MB of data.
@@ -52,43 +69,174 @@ def download_from_iotweb(
     We kindly ask you to not overuse our server.
     If you need to download the same data in a recuring pattern, contact us.
 
+    The range is downloaded in 2 day chunks by several workers. Finished chunks are cached as
+    Parquet files in cache_dir (needs the pyarrow package), keyed by bucket, serial number and
+    time range. A re-run only downloads the chunks that are not cached yet, so an interrupted
+    download resumes where it stopped. Chunks that end less than an hour ago are never cached.
+
     Args:
         name (str): Name of the influx bucket.
         serial_number (str): Serial number of your device as string.
         start (dt.datetime): Start date of the data you want to download.
         stop (dt.datetime): End date of the data you want to download.
         token (str): Your read token. Do not push your token to public repositories.
+        workers (int): Number of chunks downloaded at the same time.
+        cache_dir (str | Path | None): Directory of the chunk cache, None disables the cache.
 
     Returns:
         pd.DataFrame: Dataframe with your data.
     """
-    timestamps = create_start_stop_timestamp(start, stop)
+    chunks = create_aligned_start_stop_timestamp(start, stop)
+    cache = _ChunkCache(cache_dir, name, serial_number) if cache_dir is not None else None
+
+    dfs: list[Optional[pd.DataFrame]] = [None] * len(chunks)
+    missing = []
+    for i, (t1, t2) in enumerate(chunks):
+        dfs[i] = cache.read(t1, t2) if cache is not None else None
+        if dfs[i] is None:
+            missing.append(i)
+    logger.info(f"Downloading {len(missing)} of {len(chunks)} chunks.")
+
+    if missing:
+        with InfluxDBClient(
+            url=URL_INFLUX,
+            org=ORG_INFLUX,
+            token=token,
+            connection_pool_maxsize=max(1, workers),
+        ) as client:
+            query_api = client.query_api()
+
+            def fetch(i: int) -> None:
+                t1, t2 = chunks[i]
+                dfs[i] = _query_chunk(query_api, get_query(name, serial_number, t1, t2))
+                if cache is not None:
+                    cache.write(t1, t2, dfs[i])  # type: ignore[arg-type]
+
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = [executor.submit(fetch, i) for i in missing]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    # finished chunks stay cached, a re-run continues with the others
+                    executor.shutdown(cancel_futures=True)
+                    raise
+
+    frames = [df for df in dfs if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame(index=pd.DatetimeIndex([], tz="UTC", name="_time"))
+
+    df = pd.concat(frames, axis=0)
+    df.set_index("_time", inplace=True)
 
-    dfs = []
+    return df
 
-    with InfluxDBClient(url=URL_INFLUX, org=ORG_INFLUX, token=token) as client:
-        for t1, t2 in timestamps:
-            query = get_query(name, serial_number, t1, t2)
 
-            df = client.query_api().query_data_frame(query)
+def create_aligned_start_stop_timestamp(start_dt: dt.datetime, stop_dt: dt.datetime) -> list:
+    """
+    Like create_start_stop_timestamp(), but the chunks are aligned to multiples of 2 days since
+    the epoch, so the same chunks (and cache entries) are used for overlapping ranges.
+    """
+    start = int(start_dt.timestamp())
+    stop = int(stop_dt.timestamp())
+
+    start_stop_times = []
+    while start < stop:
+        chunk_stop = min(stop, (start // CHUNK_SECONDS + 1) * CHUNK_SECONDS)
+        start_stop_times.append([start, chunk_stop])
+        start = chunk_stop
 
-            if isinstance(df, list):
-                dfs.extend(df)
-            elif isinstance(df, pd.DataFrame):
-                dfs.append(df)
-            else:
-                logger.warning(f"Unknown type: {type(df)}")
+    return start_stop_times
 
-    df = pd.concat(dfs, axis=0)
-    df.set_index("_time", inplace=True)
-    df.drop(["result", "table"], axis=1, inplace=True)
 
-    return df
+def _query_chunk(query_api: Any, query: str) -> pd.DataFrame:
+    df = query_api.query_data_frame(query)
+
+    if isinstance(df, list):
+        df = pd.concat(df, axis=0) if df else pd.DataFrame()
+    elif not isinstance(df, pd.DataFrame):
+        logger.warning(f"Unknown type: {type(df)}")
+        df = pd.DataFrame()
+
+    return df.drop(["result", "table"], axis=1, errors="ignore")
+
+
+class _ChunkCache:
+    """Downloaded chunks as Parquet files: <cache_dir>/<bucket>/<serial number>/<t1>_<t2>."""
+
+    def __init__(self, cache_dir: Union[str, Path], name: str, serial_number: str) -> None:
+        self._dir = Path(cache_dir) / name / str(serial_number)
+        self._enabled = _has_parquet()
+        if not self._enabled:
+            logger.warning("The download cache needs the pyarrow package, not caching.")
+
+    def read(self, t1: int, t2: int) -> Optional[pd.DataFrame]:
+        """Returns the cached chunk, also a part of a cached covering chunk, None if not cached."""
+        if not self._enabled:
+            return None
+
+        for c1, c2 in self._covering(t1, t2):
+            path = self._path(c1, c2)
+            try:
+                df = pd.read_parquet(path)
+            except Exception as e:
+                logger.warning(f"Could not read the cached chunk {path}: {e}")
+                continue
+            if (c1, c2) != (t1, t2) and not df.empty:
+                times = df["_time"]
+                df = df[(times >= _to_utc(t1, times)) & (times < _to_utc(t2, times))]
+            return df
+
+        return None
+
+    def write(self, t1: int, t2: int, df: pd.DataFrame) -> None:
+        """Stores the chunk, unless it ends less than CACHE_MIN_AGE_SECONDS ago."""
+        if not self._enabled or t2 > time.time() - CACHE_MIN_AGE_SECONDS:
+            return
+
+        path = self._path(t1, t2)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}")
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp)
+            os.replace(tmp, path)  # a chunk is either complete or missing
+        except Exception as e:
+            logger.warning(f"Could not cache the chunk {path}: {e}")
+            tmp.unlink(missing_ok=True)
+
+    def _covering(self, t1: int, t2: int) -> list[tuple[int, int]]:
+        """Ranges of the cached chunks containing t1 to t2, the exact chunk first."""
+        if self._path(t1, t2).exists():
+            return [(t1, t2)]
+
+        ranges = []
+        for path in self._dir.glob("*_*.parquet"):
+            try:
+                c1, c2 = (int(t) for t in path.stem.split("_"))
+            except ValueError:
+                continue
+            if c1 <= t1 and t2 <= c2:
+                ranges.append((c1, c2))
+        return sorted(ranges, key=lambda r: r[1] - r[0])
+
+    def _path(self, t1: int, t2: int) -> Path:
+        return self._dir / f"{t1}_{t2}.parquet"
+
+
+def _has_parquet() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _to_utc(t: int, column: pd.Series) -> pd.Timestamp:
+    timestamp = pd.Timestamp(t, unit="s", tz="UTC")
+    return timestamp if getattr(column.dt, "tz", None) is not None else timestamp.tz_localize(None)
 
 
 if __name__ == "__main__":
-    import os
-
     token = os.getenv("IOT_GUEST_TOKEN", None)
     if token is None:
         raise ValueError("No token found in your environment")
@@ -0,0 +1,125 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Union
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+class NaneosUploadOutbox:
+    """
+    Durable first in, first out store for serialized CombinedData payloads.
+
+    The payloads are kept in a SQLite database in WAL mode. Every append() is one committed
+    transaction, so a crash never loses or corrupts stored payloads. synchronous=NORMAL lets
+    SQLite batch the fsyncs at the WAL checkpoints instead of syncing every append.
+    If the stored payloads exceed max_bytes the oldest ones are evicted.
+    """
+
+    DEFAULT_PATH = Path.home() / ".naneos" / "upload_outbox.sqlite3"
+    DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+    def __init__(
+        self, path: Union[str, Path] = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "created REAL NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "payload BLOB NOT NULL)"
+        )
+        self._evicted = 0
+
+    # == Public Methods ============================================================================
+    def append(self, payload: bytes) -> None:
+        """Stores the payload. Evicts the oldest payloads if the quota is exceeded."""
+        with self._lock:
+            with self._con:  # one transaction
+                self._con.execute("BEGIN")
+                self._con.execute(
+                    "INSERT INTO outbox (created, size, payload) VALUES (?, ?, ?)",
+                    (time.time(), len(payload), payload),
+                )
+                self._evict()
+
+    def peek(self, max_bytes: int) -> list[tuple[int, bytes]]:
+        """
+        Returns the oldest payloads as (id, payload), together at most max_bytes large.
+        The oldest payload is always returned, even if it is larger.
+        """
+        with self._lock:
+            rows = self._con.execute("SELECT id, size FROM outbox ORDER BY id").fetchall()
+
+            ids: list[int] = []
+            total = 0
+            for id_, size in rows:
+                if ids and total + size > max_bytes:
+                    break
+                ids.append(id_)
+                total += size
+
+            if not ids:
+                return []
+
+            placeholders = ",".join("?" * len(ids))
+            return self._con.execute(
+                f"SELECT id, payload FROM outbox WHERE id IN ({placeholders}) ORDER BY id", ids
+            ).fetchall()
+
+    def remove(self, ids: list[int]) -> None:
+        """Removes the payloads after they were delivered."""
+        if not ids:
+            return
+        with self._lock:
+            placeholders = ",".join("?" * len(ids))
+            self._con.execute(f"DELETE FROM outbox WHERE id IN ({placeholders})", ids)
+
+    def get_pending_count(self) -> int:
+        with self._lock:
+            return self._con.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def get_pending_bytes(self) -> int:
+        with self._lock:
+            return self._con.execute("SELECT COALESCE(SUM(size), 0) FROM outbox").fetchone()[0]
+
+    def get_evicted_count(self) -> int:
+        """Returns the number of payloads evicted by the quota since the outbox was opened."""
+        return self._evicted
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+    # == Helpers ===================================================================================
+    def _evict(self) -> None:
+        """Deletes the oldest payloads until the quota is met. Called within a transaction."""
+        total = self._con.execute("SELECT COALESCE(SUM(size), 0) FROM outbox").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+
+        evict: list[int] = []
+        for id_, size in self._con.execute("SELECT id, size FROM outbox ORDER BY id"):
+            if total <= self._max_bytes:
+                break
+            evict.append(id_)
+            total -= size
+
+        placeholders = ",".join("?" * len(evict))
+        self._con.execute(f"DELETE FROM outbox WHERE id IN ({placeholders})", evict)
+        self._evicted += len(evict)
+        logger.warning(f"Upload outbox quota exceeded, evicted {len(evict)} oldest payloads.")
+
+    def __len__(self) -> int:
+        return self.get_pending_count()
@@ -1,12 +1,13 @@
-import base64
 import datetime
+import json
 import pickle
-from threading import Thread
+from threading import Lock, Thread
 from typing import Callable, ClassVar, Optional
 
 import pandas as pd
 import requests
 
+from naneos.iotweb.naneos_uploader import NaneosUploader
 from naneos.logger import LEVEL_WARNING, get_naneos_logger
 from naneos.protobuf.protobuf import create_combined_entry, create_proto_device
 
@@ -14,11 +15,11 @@ logger = get_naneos_logger(__name__, LEVEL_WARNING)
 
 
 class NaneosUploadThread(Thread):
-    URL: ClassVar[str] = "https://hg3zkburji.execute-api.eu-central-1.amazonaws.com/prod/proto/v1"
-    HEADERS: ClassVar[dict] = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
+    URL: ClassVar[str] = NaneosUploader.URL
+    HEADERS: ClassVar[dict] = NaneosUploader.HEADERS
+
+    _uploader: ClassVar[Optional[NaneosUploader]] = None  # shared keep-alive session
+    _uploader_lock: ClassVar[Lock] = Lock()
 
     def __init__(
         self,
@@ -51,16 +52,29 @@ class NaneosUploadThread(Thread):
 
     @staticmethod
     def get_body(upload_string: str) -> str:
-        return f"""
-            {{
-                "gateway": "python_webhook",
-                "data": "{upload_string}",
-                "published_at": "{datetime.datetime.now().isoformat()}"
-            }}
-            """
+        return json.dumps(
+            {
+                "gateway": NaneosUploader.GATEWAY,
+                "data": upload_string,
+                "published_at": datetime.datetime.now().isoformat(),
+            }
+        )
+
+    @classmethod
+    def get_uploader(cls) -> NaneosUploader:
+        """Returns the NaneosUploader shared by all upload threads."""
+        with cls._uploader_lock:
+            if cls._uploader is None:
+                cls._uploader = NaneosUploader(cls.URL)
+            return cls._uploader
 
     @classmethod
     def upload(cls, data: dict[int, pd.DataFrame]) -> requests.Response:
+        return cls.post(cls.create_payload(data))
+
+    @staticmethod
+    def create_payload(data: dict[int, pd.DataFrame]) -> bytes:
+        """Serializes the data as CombinedData protobuf message."""
         abs_time = int(datetime.datetime.now().timestamp())
         devices = []
 
@@ -76,13 +90,12 @@ class NaneosUploadThread(Thread):
             devices.append(create_proto_device(sn, abs_time, df))
 
         combined_entry = create_combined_entry(devices=devices, abs_timestamp=abs_time)
+        return combined_entry.SerializeToString()
 
-        proto_str = combined_entry.SerializeToString()
-        proto_str_base64 = base64.b64encode(proto_str).decode()
-
-        body = cls.get_body(proto_str_base64)
-        r = requests.post(cls.URL, headers=cls.HEADERS, data=body, timeout=10)
-        return r
+    @classmethod
+    def post(cls, payload: bytes) -> requests.Response:
+        """Sends a serialized CombinedData message over the shared session."""
+        return cls.get_uploader().post(payload)
 
 
 def read_pickle_file(file_path: str) -> dict[int, pd.DataFrame]:
@@ -0,0 +1,388 @@
+import os
+import pickle
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+import requests
+
+import naneos.protobuf.protoV1_pb2 as pbScheme
+from naneos.iotweb.naneos_upload_outbox import NaneosUploadOutbox
+from naneos.iotweb.naneos_upload_thread import NaneosUploadThread
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+from naneos.protobuf.protobuf import is_mergeable_combined_entry, merge_combined_entries
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+class NaneosUploadWorker:
+    """
+    Uploads gathered snapshots in background threads.
+
+    submit() only puts the snapshot into a bounded queue and returns, so the caller never waits
+    on the network. concurrency worker threads take the snapshots from the queue and upload them
+    with NaneosUploadThread.upload(). If the queue is full the backpressure policy decides:
+
+    - "block": submit() waits (up to block_timeout seconds) until a slot is free
+    - "drop_oldest": the oldest queued snapshot is dropped
+    - "spill": the snapshot is pickled to spill_dir and uploaded once the queue is empty again,
+      also after a restart
+
+    With an outbox every snapshot is serialized into the NaneosUploadOutbox first and a single
+    sender thread delivers the stored payloads in order. Several payloads are merged into one
+    request of at most max_request_bytes. Failed requests are retried with exponential backoff,
+    so no snapshot is lost while the connection is down.
+
+    get_counters() returns the submitted, uploaded, failed, dropped and spilled counts.
+    """
+
+    POLICY_BLOCK = "block"
+    POLICY_DROP_OLDEST = "drop_oldest"
+    POLICY_SPILL = "spill"
+    POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_SPILL)
+
+    DEFAULT_SPILL_DIR = Path.home() / ".naneos" / "upload_spill"  # private, spill files are pickles
+    SPILL_SUFFIX = ".pkl"
+    POLL_INTERVAL = 0.5  # seconds
+
+    RETRY_MIN_S = 5.0
+    RETRY_MAX_S = 600.0
+    MAX_REQUEST_BYTES = 512 * 1024
+
+    def __init__(
+        self,
+        max_queue_size: int = 4,
+        concurrency: int = 1,
+        policy: str = POLICY_DROP_OLDEST,
+        spill_dir: Optional[Path] = None,
+        block_timeout: Optional[float] = None,
+        callback: Optional[Callable[[bool], None]] = None,
+        upload: Callable[[dict[int, pd.DataFrame]], requests.Response] = NaneosUploadThread.upload,
+        outbox: Optional[NaneosUploadOutbox] = None,
+        max_request_bytes: int = MAX_REQUEST_BYTES,
+        create_payload: Callable[
+            [dict[int, pd.DataFrame]], bytes
+        ] = NaneosUploadThread.create_payload,
+        post: Callable[[bytes], requests.Response] = NaneosUploadThread.post,
+    ) -> None:
+        """
+        Args:
+            max_queue_size (int): Snapshots that can wait for an upload.
+            concurrency (int): Number of uploads that run at the same time.
+            policy (str): Backpressure policy, one of POLICIES.
+            spill_dir (Optional[Path]): Directory for spilled snapshots (policy "spill").
+            block_timeout (Optional[float]): Maximum wait of submit() for policy "block".
+            callback (Optional[Callable[[bool], None]]): Called with the result of every upload.
+            upload (Callable): Uploads one snapshot and returns the response.
+            outbox (Optional[NaneosUploadOutbox]): Durable store, enables retries.
+            max_request_bytes (int): Size limit for merged outbox payloads.
+            create_payload (Callable): Serializes a snapshot for the outbox.
+            post (Callable): Sends a serialized payload and returns the response.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown backpressure policy {policy}, use one of {self.POLICIES}.")
+
+        self._queue: queue.Queue[dict[int, pd.DataFrame]] = queue.Queue(
+            maxsize=max(1, max_queue_size)
+        )
+        self._concurrency = max(1, concurrency)
+        self._policy = policy
+        self._spill_dir = Path(spill_dir) if spill_dir is not None else self.DEFAULT_SPILL_DIR
+        self._block_timeout = block_timeout
+        self._callback = callback
+        self._upload = upload
+        self._outbox = outbox
+        self._max_request_bytes = max_request_bytes
+        self._create_payload = create_payload
+        self._post = post
+
+        self._outbox_event = threading.Event()  # wakes the sender after an append
+        self._retry_delay = 0.0
+        self._next_attempt = 0.0
+        self._send_single = False  # after a rejected merged request
+
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()  # guards the counters, the queue eviction and spill files
+        self._counters = {"submitted": 0, "uploaded": 0, "failed": 0, "dropped": 0, "spilled": 0}
+
+    # == Public Methods ============================================================================
+    def start(self) -> None:
+        if self._policy == self.POLICY_SPILL:
+            self._spill_dir.mkdir(parents=True, exist_ok=True)
+
+        for i in range(self._concurrency):
+            thread = threading.Thread(
+                target=self._run, name=f"naneos-upload-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        if self._outbox is not None:
+            sender = threading.Thread(
+                target=self._run_sender, name="naneos-upload-sender", daemon=True
+            )
+            sender.start()
+            self._threads.append(sender)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the workers after the queued snapshots are uploaded. Spilled snapshots stay on disk
+        for the next start.
+        """
+        self._stop_event.set()
+        self._outbox_event.set()
+        deadline = None if timeout is None else time.time() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.time()))
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+
+        if self._threads:
+            logger.warning(f"{self._queue.qsize()} snapshots not uploaded before shutdown.")
+
+    def submit(self, data: dict[int, pd.DataFrame]) -> bool:
+        """
+        Queues a snapshot for the upload. Never waits on the network.
+
+        Returns:
+            bool: False if the snapshot was dropped.
+        """
+        with self._lock:
+            self._counters["submitted"] += 1
+
+        if self._policy == self.POLICY_BLOCK:
+            try:
+                self._queue.put(data, timeout=self._block_timeout)
+                return True
+            except queue.Full:
+                self._count("dropped")
+                logger.warning("Upload queue full, snapshot dropped.")
+                return False
+
+        with self._lock:
+            try:
+                self._queue.put_nowait(data)
+                return True
+            except queue.Full:
+                pass
+
+            if self._policy == self.POLICY_SPILL:
+                return self._spill(data)
+
+            try:  # drop oldest
+                self._queue.get_nowait()
+                self._counters["dropped"] += 1
+                logger.warning("Upload queue full, oldest snapshot dropped.")
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(data)
+            return True
+
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def get_counters(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def get_pending_count(self) -> int:
+        """Returns the number of queued, spilled and stored snapshots."""
+        stored = self._outbox.get_pending_count() if self._outbox is not None else 0
+        return self._queue.qsize() + len(self._spill_files()) + stored
+
+    # == Worker threads ============================================================================
+    def _run(self) -> None:
+        while True:
+            data = self._next_snapshot()
+            if data is None:
+                if self._stop_event.is_set():
+                    return
+                continue
+
+            self._upload_snapshot(data)
+
+    def _next_snapshot(self) -> Optional[dict[int, pd.DataFrame]]:
+        try:
+            if self._stop_event.is_set():
+                return self._queue.get_nowait()
+            return self._queue.get(timeout=self.POLL_INTERVAL)
+        except queue.Empty:
+            pass
+
+        if self._stop_event.is_set():
+            return None
+        return self._unspill()  # the queue is empty, continue with the spilled snapshots
+
+    def _upload_snapshot(self, data: dict[int, pd.DataFrame]) -> None:
+        if self._outbox is not None:
+            self._store_snapshot(data)
+            return
+
+        success = False
+        try:
+            response = self._upload(data)
+            success = response.status_code == 200
+        except Exception as e:
+            logger.exception(f"Error in upload: {e}")
+
+        self._count("uploaded" if success else "failed")
+        self._notify(success)
+
+    # == Outbox ====================================================================================
+    def _store_snapshot(self, data: dict[int, pd.DataFrame]) -> None:
+        assert self._outbox is not None
+        try:
+            self._outbox.append(self._create_payload(data))
+        except Exception as e:
+            self._count("dropped")
+            logger.exception(f"Could not store snapshot in the outbox: {e}")
+            return
+        self._outbox_event.set()
+
+    def _run_sender(self) -> None:
+        """Delivers the stored payloads in order, waits with backoff after failures."""
+        while True:
+            timeout = max(self.POLL_INTERVAL, self._next_attempt - time.time())
+            self._outbox_event.wait(self.POLL_INTERVAL if self._stop_event.is_set() else timeout)
+            self._outbox_event.clear()
+
+            if self._stop_event.is_set():
+                if any(t.is_alive() for t in self._threads if t is not threading.current_thread()):
+                    continue  # the workers are still storing the queued snapshots
+                if time.time() >= self._next_attempt:
+                    self._flush_outbox()  # last try, the rest stays for the next start
+                return
+
+            if time.time() >= self._next_attempt:
+                self._flush_outbox()
+
+    def _flush_outbox(self) -> None:
+        assert self._outbox is not None
+        while True:
+            ids, payload = self._next_request()
+            if not ids:
+                return
+
+            try:
+                status_code = self._post(payload).status_code
+            except Exception as e:
+                logger.warning(f"Upload failed, retrying later: {e}")
+                status_code = None
+
+            if status_code == 200:
+                self._outbox.remove(ids)
+                self._retry_delay = 0.0
+                self._send_single = False
+                with self._lock:
+                    self._counters["uploaded"] += len(ids)
+                self._notify(True)
+                continue
+
+            self._count("failed")
+            self._notify(False)
+
+            if status_code is not None and self._is_rejected(status_code):
+                if len(ids) > 1:
+                    self._send_single = True  # find the payload the server does not accept
+                    continue
+                logger.error(f"Upload rejected with status {status_code}, payload dropped.")
+                self._outbox.remove(ids)
+                self._count("dropped")
+                continue
+
+            self._retry_delay = min(self.RETRY_MAX_S, max(self.RETRY_MIN_S, self._retry_delay * 2))
+            self._next_attempt = time.time() + self._retry_delay
+            return
+
+    def _next_request(self) -> tuple[list[int], bytes]:
+        """Takes the oldest stored payloads and merges them into one request."""
+        assert self._outbox is not None
+        max_bytes = 0 if self._send_single else self._max_request_bytes
+
+        while True:
+            rows = self._outbox.peek(max_bytes)
+            if not rows:
+                return [], b""
+
+            ids: list[int] = []
+            payloads: list[bytes] = []
+            entries: list[pbScheme.CombinedData] = []
+            for id_, payload in rows:
+                entry = pbScheme.CombinedData()
+                try:
+                    entry.ParseFromString(payload)
+                except Exception as e:
+                    logger.error(f"Dropping corrupt outbox payload: {e}")
+                    self._outbox.remove([id_])
+                    continue
+
+                if not is_mergeable_combined_entry(entry):
+                    if not ids:  # sent on its own
+                        return [id_], payload
+                    break
+                ids.append(id_)
+                payloads.append(payload)
+                entries.append(entry)
+
+            if len(ids) == 1:
+                return ids, payloads[0]
+            if ids:
+                return ids, merge_combined_entries(entries).SerializeToString()
+
+    @staticmethod
+    def _is_rejected(status_code: int) -> bool:
+        """Client errors are not retried, except timeouts and rate limits."""
+        return 400 <= status_code < 500 and status_code not in (408, 429)
+
+    # == Helpers ===================================================================================
+    def _notify(self, success: bool) -> None:
+        if self._callback:
+            try:
+                self._callback(success)
+            except Exception as e:
+                logger.exception(f"Error in upload callback: {e}")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _spill(self, data: dict[int, pd.DataFrame]) -> bool:
+        """Writes the snapshot to the spill directory. Called with the lock held."""
+        path = self._spill_dir / f"{time.time_ns()}{self.SPILL_SUFFIX}"
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f)
+            os.replace(tmp_path, path)  # never leaves a half written snapshot
+        except OSError as e:
+            self._counters["dropped"] += 1
+            logger.error(f"Could not spill snapshot to {self._spill_dir}: {e}")
+            return False
+
+        self._counters["spilled"] += 1
+        return True
+
+    def _unspill(self) -> Optional[dict[int, pd.DataFrame]]:
+        """Takes the oldest spilled snapshot from disk."""
+        with self._lock:
+            files = self._spill_files()
+            if not files:
+                return None
+
+            path = files[0]
+            try:
+                with open(path, "rb") as f:
+                    data = pickle.load(f)
+            except Exception as e:
+                logger.error(f"Could not read spilled snapshot {path}: {e}")
+                data = None
+            path.unlink(missing_ok=True)
+            return data
+
+    def _spill_files(self) -> list[Path]:
+        if self._policy != self.POLICY_SPILL or not self._spill_dir.is_dir():
+            return []
+        return sorted(self._spill_dir.glob(f"*{self.SPILL_SUFFIX}"))
@@ -0,0 +1,141 @@
+import base64
+import datetime
+import gzip
+import json
+import threading
+from typing import Any, ClassVar, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+class NaneosUploader:
+    """
+    Long lived HTTP client for the naneos IoT upload endpoint.
+
+    All requests go through one pooled requests.Session, so the TCP and TLS connection is kept
+    alive between uploads instead of being opened every gathering interval. The JSON envelope is
+    built with json.dumps and can be sent gzip or zstd (needs the zstandard package) compressed,
+    if the endpoint accepts Content-Encoding. get_stats() returns the bytes that were sent and
+    received, for the last upload and in total.
+    """
+
+    URL: ClassVar[str] = "https://hg3zkburji.execute-api.eu-central-1.amazonaws.com/prod/proto/v1"
+    HEADERS: ClassVar[dict] = {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+    GATEWAY: ClassVar[str] = "python_webhook"
+    COMPRESSIONS = (None, "gzip", "zstd")
+    TIMEOUT = 10.0  # seconds
+    POOL_SIZE = 4
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        compression: Optional[str] = None,
+        timeout: float = TIMEOUT,
+    ) -> None:
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression}, use one of {self.COMPRESSIONS}.")
+        if compression == "zstd":
+            self._zstd_compressor()  # fail early if zstandard is missing
+
+        self._url = url or self.URL
+        self._compression = compression
+        self._timeout = timeout
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(self.HEADERS)
+
+        self._lock = threading.Lock()
+        self._last: dict[str, int] = {}
+        self._total = {
+            "requests": 0,
+            "payload_bytes": 0,
+            "body_bytes": 0,
+            "sent_bytes": 0,
+            "received_bytes": 0,
+        }
+
+    # == Public Methods ============================================================================
+    @classmethod
+    def get_body(cls, payload: bytes) -> bytes:
+        """JSON envelope of the base64 encoded protobuf payload."""
+        envelope = {
+            "gateway": cls.GATEWAY,
+            "data": base64.b64encode(payload).decode(),
+            "published_at": datetime.datetime.now().isoformat(),
+        }
+        return json.dumps(envelope, separators=(",", ":")).encode()
+
+    def post(self, payload: bytes) -> requests.Response:
+        """Sends a serialized CombinedData message."""
+        body = self.get_body(payload)
+        data, headers = self._encode(body)
+
+        response = self._session.post(self._url, data=data, headers=headers, timeout=self._timeout)
+        self._record(len(payload), len(body), response)
+        return response
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Returns {"last": ..., "total": ...} with the protobuf payload, JSON body and on the wire
+        sent / received bytes (request and status line, headers and content).
+        """
+        with self._lock:
+            return {"last": dict(self._last), "total": dict(self._total)}
+
+    def close(self) -> None:
+        self._session.close()
+
+    # == Helpers ===================================================================================
+    def _encode(self, body: bytes) -> tuple[bytes, dict[str, str]]:
+        if self._compression == "gzip":
+            return gzip.compress(body, compresslevel=9, mtime=0), {"Content-Encoding": "gzip"}
+        if self._compression == "zstd":
+            return self._zstd_compressor().compress(body), {"Content-Encoding": "zstd"}
+        return body, {}
+
+    @staticmethod
+    def _zstd_compressor() -> Any:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ValueError("zstd compression needs the zstandard package.") from e
+        return zstandard.ZstdCompressor(level=19)
+
+    def _record(self, payload_bytes: int, body_bytes: int, response: requests.Response) -> None:
+        request = response.request
+        sent = len(f"{request.method} {request.path_url} HTTP/1.1\r\n") + _headers_size(
+            request.headers
+        )
+        sent += len(request.body or b"")
+        received = len(f"HTTP/1.1 {response.status_code} {response.reason}\r\n")
+        received += _headers_size(response.headers) + len(response.content)
+
+        last = {
+            "payload_bytes": payload_bytes,
+            "body_bytes": body_bytes,
+            "sent_bytes": sent,
+            "received_bytes": received,
+        }
+        with self._lock:
+            self._last = last
+            self._total["requests"] += 1
+            for key, value in last.items():
+                self._total[key] += value
+
+        logger.debug(f"Upload: {payload_bytes} B payload, {sent} B sent, {received} B received")
+
+
+def _headers_size(headers: Any) -> int:
+    # "name: value\r\n" per header and the empty line
+    return sum(len(name) + len(str(value)) + 4 for name, value in headers.items()) + 2
@@ -1,3 +1,4 @@
 from naneos.manager.naneos_device_manager import NaneosDeviceManager
+from naneos.manager.naneos_history_store import NaneosHistoryStore
 
-__all__ = ["NaneosDeviceManager"]
+__all__ = ["NaneosDeviceManager", "NaneosHistoryStore"]
@@ -3,15 +3,17 @@ import queue
 import signal
 import threading
 import time
+from pathlib import Path
 
 import pandas as pd
 
+from naneos.iotweb.naneos_upload_outbox import NaneosUploadOutbox
 from naneos.iotweb.naneos_upload_thread import NaneosUploadThread
+from naneos.iotweb.naneos_upload_worker import NaneosUploadWorker
+from naneos.iotweb.naneos_uploader import NaneosUploader
 from naneos.logger import LEVEL_WARNING, get_naneos_logger
-from naneos.partector.blueprints._data_structure import (
-    add_to_existing_naneos_data,
-    sort_and_clean_naneos_data,
-)
+from naneos.manager.naneos_history_store import NaneosHistoryStore
+from naneos.partector.blueprints._data_merger import NaneosDataMerger
 from naneos.partector.partector_serial_manager import PartectorSerialManager
 from naneos.partector_ble.partector_ble_manager import PartectorBleManager
 
@@ -22,10 +24,35 @@ class NaneosDeviceManager(threading.Thread):
     """
     NaneosDeviceManager is a class that manages Naneos devices.
     It connects and disconnects automatically.
+
+    Gathered snapshots are handed to a NaneosUploadWorker, the gathering loop never waits for
+    the network. upload_queue_size, upload_concurrency and upload_backpressure ("block",
+    "drop_oldest" or "spill") configure the worker. With upload_outbox_path the snapshots are
+    stored in a NaneosUploadOutbox at this path and retried until they are delivered.
+    All uploads share one keep-alive NaneosUploader, upload_compression ("gzip" or "zstd")
+    compresses the request bodies.
+    With parquet_path every snapshot is also archived in a NaneosParquetSink at this path, the
+    output queue can deliver the snapshots as arrow tables (both need the pyarrow package).
+    With history_path the snapshots are kept in a NaneosHistoryStore at this path (raw rows and
+    1min / 15min / 1h aggregates), see get_history_store().
     """
 
+    UPLOAD_STOP_TIMEOUT = 15.0  # seconds to finish the queued uploads on shutdown
+    SNAPSHOT_FORMATS = ("pandas", "arrow")
+
     def __init__(
-        self, use_serial=True, use_ble=True, upload_active=True, gathering_interval_seconds=30
+        self,
+        use_serial=True,
+        use_ble=True,
+        upload_active=True,
+        gathering_interval_seconds=30,
+        upload_queue_size=4,
+        upload_concurrency=1,
+        upload_backpressure=NaneosUploadWorker.POLICY_DROP_OLDEST,
+        upload_outbox_path: str | Path | None = None,
+        upload_compression: str | None = None,
+        parquet_path: str | Path | None = None,
+        history_path: str | Path | None = None,
     ) -> None:
         super().__init__(daemon=True)
         self._use_serial = use_serial
@@ -35,16 +62,51 @@ class NaneosDeviceManager(threading.Thread):
         self.set_gathering_interval_seconds(gathering_interval_seconds)
 
         self._out_queue: queue.Queue | None = None
+        self._out_queue_format = "pandas"
 
         self._stop_event = threading.Event()
 
         self._manager_serial: PartectorSerialManager | None = None
         self._manager_ble: PartectorBleManager | None = None
 
-        self._data: dict[int, pd.DataFrame] = {}
+        self._data = NaneosDataMerger()
 
         self.upload_blocked_devices: list[int | None] = []
 
+        self._outbox: NaneosUploadOutbox | None = None
+        if upload_outbox_path is not None:
+            try:
+                self._outbox = NaneosUploadOutbox(upload_outbox_path)
+            except Exception as e:
+                logger.error(f"Could not open the upload outbox, uploading without retries: {e}")
+
+        self._parquet_sink = None
+        if parquet_path is not None:
+            try:
+                from naneos.arrow import NaneosParquetSink
+
+                self._parquet_sink = NaneosParquetSink(parquet_path)
+            except Exception as e:
+                logger.error(f"Could not open the parquet archive, not archiving: {e}")
+
+        self._history: NaneosHistoryStore | None = None
+        if history_path is not None:
+            try:
+                self._history = NaneosHistoryStore(history_path)
+            except Exception as e:
+                logger.error(f"Could not open the history store, not keeping history: {e}")
+
+        self._http = NaneosUploader(compression=upload_compression)
+        self._uploader = NaneosUploadWorker(
+            max_queue_size=upload_queue_size,
+            concurrency=upload_concurrency,
+            policy=upload_backpressure,
+            callback=lambda success: logger.info(f"Upload success: {success}"),
+            outbox=self._outbox,
+            upload=lambda data: self._http.post(NaneosUploadThread.create_payload(data)),
+            post=self._http.post,
+        )
+
     def use_serial_connections(self, use: bool) -> None:
         self._use_serial = use
 
@@ -74,13 +136,37 @@ class NaneosDeviceManager(threading.Thread):
         tmp_next_upload_time = time.time() + self._gathering_interval_seconds
         self._next_upload_time = min(self._next_upload_time, tmp_next_upload_time)
 
-    def register_output_queue(self, out_queue: queue.Queue) -> None:
+    def register_output_queue(self, out_queue: queue.Queue, snapshot_format="pandas") -> None:
+        """
+        Puts every snapshot into out_queue, as dict[int, pd.DataFrame] keyed by serial number
+        (snapshot_format="pandas") or as pyarrow.Table with naneos.arrow.NANEOS_ARROW_SCHEMA
+        (snapshot_format="arrow").
+        """
+        if snapshot_format not in self.SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format, use one of {self.SNAPSHOT_FORMATS}.")
+        if snapshot_format == "arrow":
+            import naneos.arrow  # noqa: F401, fail early if pyarrow is missing
+
+        self._out_queue_format = snapshot_format
         self._out_queue = out_queue
 
     def unregister_output_queue(self) -> None:
         self._out_queue = None
 
+    def get_upload_counters(self) -> dict[str, int]:
+        """Returns the submitted, uploaded, failed, dropped and spilled snapshot counts."""
+        return self._uploader.get_counters()
+
+    def get_history_store(self) -> NaneosHistoryStore | None:
+        """Returns the history store to query past data, None without history_path."""
+        return self._history
+
+    def get_upload_stats(self) -> dict:
+        """Returns the uploaded payload and on the wire bytes, see NaneosUploader.get_stats()."""
+        return self._http.get_stats()
+
     def run(self) -> None:
+        self._uploader.start()
         self._loop()
 
         # graceful shutdown in any case
@@ -88,6 +174,15 @@ class NaneosDeviceManager(threading.Thread):
         self._loop_serial_manager()
         self._use_ble = False
         self._loop_ble_manager()
+        self._uploader.stop(timeout=self.UPLOAD_STOP_TIMEOUT)
+        if not self._uploader.is_running():
+            self._http.close()
+            if self._outbox is not None:
+                self._outbox.close()
+        if self._parquet_sink is not None:
+            self._parquet_sink.close()
+        if self._history is not None:
+            self._history.close()
 
     def stop(self) -> None:
         self._stop_event.set()
@@ -125,7 +220,7 @@ class NaneosDeviceManager(threading.Thread):
         ):
             self.upload_blocked_devices = self._manager_serial.get_gain_test_activating_devices()
             data_serial = self._manager_serial.get_data()
-            self._data = add_to_existing_naneos_data(self._data, data_serial)
+            self._data.add(data_serial)
         # starting
         if self._manager_serial is None and self._use_serial:
             logger.info("Starting serial manager...")
@@ -142,7 +237,7 @@ class NaneosDeviceManager(threading.Thread):
         # normal operation
         if isinstance(self._manager_ble, PartectorBleManager) and self._manager_ble.is_alive():
             data_ble = self._manager_ble.get_data()
-            self._data = add_to_existing_naneos_data(self._data, data_ble)
+            self._data.add(data_ble)
         # starting
         if self._manager_ble is None and self._use_ble:
             logger.info("Starting BLE manager...")
@@ -167,8 +262,7 @@ class NaneosDeviceManager(threading.Thread):
 
                 # remove entries from _data that is in upload_blocked_devices
                 for blocked_sn in self.upload_blocked_devices:
-                    if blocked_sn in self._data:
-                        del self._data[blocked_sn]
+                    self._data.discard(blocked_sn)
 
                 if time.time() >= self._next_upload_time:
                     self._next_upload_time = time.time() + self._gathering_interval_seconds
@@ -177,23 +271,44 @@ class NaneosDeviceManager(threading.Thread):
                     if self._use_serial and self._manager_serial is not None:
                         serial_connected_sns = self._manager_serial.get_connected_serial_numbers()
 
-                    upload_data = sort_and_clean_naneos_data(self._data, serial_connected_sns)
-                    self._data = {}
-
-                    if isinstance(self._out_queue, queue.Queue):
-                        self._out_queue.put(upload_data)
+                    upload_data = self._data.drain(serial_connected_sns)
 
+                    # upload first, the drained snapshot must not get lost in the local outputs
                     if self._upload_active:
-                        uploader = NaneosUploadThread(
-                            upload_data,
-                            callback=lambda success: logger.info(f"Upload success: {success}"),
-                        )
-                        uploader.start()
-                        uploader.join()
+                        self._uploader.submit(upload_data)
+                    self._publish_snapshot(upload_data)
 
             except Exception as e:
                 logger.exception(f"DeviceManager loop exception: {e}")
 
+    def _publish_snapshot(self, data: dict[int, pd.DataFrame]) -> None:
+        """Hands the snapshot to the history store, the parquet archive and the output queue."""
+        if self._history is not None:
+            try:
+                self._history.add(data)
+            except Exception as e:
+                logger.error(f"Could not store the snapshot history: {e}")
+
+        table = None
+        if self._parquet_sink is not None or self._out_queue_format == "arrow":
+            from naneos.arrow import create_arrow_snapshot
+
+            try:
+                table = create_arrow_snapshot(data)
+            except Exception as e:
+                logger.error(f"Could not convert the snapshot to arrow: {e}")
+
+        if self._parquet_sink is not None and table is not None:
+            try:
+                self._parquet_sink.write(table)
+            except Exception as e:
+                logger.error(f"Could not archive the snapshot: {e}")
+
+        if isinstance(self._out_queue, queue.Queue):
+            # the pandas snapshot if the arrow conversion failed
+            arrow = self._out_queue_format == "arrow" and table is not None
+            self._out_queue.put(table if arrow else data)
+
 
 def minimal_example() -> None:
     manager = NaneosDeviceManager(
@@ -0,0 +1,321 @@
+import datetime
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+from naneos.partector.blueprints._metric_schema import METRICS
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+Time = Union[datetime.datetime, int]  # datetime or unix timestamp in ms
+
+
+class NaneosHistoryStore:
+    """
+    Embedded SQLite store for the history of the gathered data.
+
+    The raw rows (one per device and second) are kept for raw_retention seconds. Every added row
+    also updates the aggregates of the 1min, 15min and 1h tiers: count, sum, min and max per
+    measured metric and time bucket, so aggregated queries never touch the raw rows. The tiers
+    are kept for tier_retention[tier] seconds (None: forever).
+
+    query() and query_aggregates() read only the rows of one serial number and time range, with
+    the primary key (serial_number, timestamp) as index.
+    """
+
+    DEFAULT_PATH = Path.home() / ".naneos" / "history.sqlite3"
+    RAW_RETENTION = 24 * 3600.0
+    TIERS: dict[str, int] = {"1min": 60_000, "15min": 900_000, "1h": 3_600_000}  # bucket in ms
+    TIER_RETENTION: dict[str, Optional[float]] = {
+        "1min": 30 * 24 * 3600.0,
+        "15min": 365 * 24 * 3600.0,
+        "1h": None,
+    }
+    PRUNE_INTERVAL = 60.0  # seconds
+
+    INDEX_NAME = "unix_timestamp"
+    # raw columns besides the key, all metrics of the schema
+    RAW_COLUMNS: tuple[str, ...] = tuple(
+        metric.name for metric in METRICS if metric.name not in ("unix_timestamp", "serial_number")
+    )
+    # aggregated columns, the measured values
+    AGGREGATED_COLUMNS: tuple[str, ...] = tuple(
+        metric.name for metric in METRICS if metric.dtype.startswith("Float")
+    )
+    AGGREGATES = ("mean", "min", "max", "count")
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_PATH,
+        raw_retention: float = RAW_RETENTION,
+        tier_retention: Optional[dict[str, Optional[float]]] = None,
+    ) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._raw_retention = raw_retention
+        self._tier_retention = {**self.TIER_RETENTION, **(tier_retention or {})}
+        self._next_prune = 0.0
+
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        raw_columns = ", ".join(("serial_number", "ts") + self.RAW_COLUMNS)
+        placeholders = ", ".join("?" * (len(self.RAW_COLUMNS) + 2))
+        self._insert_raw_sql = f"INSERT INTO raw ({raw_columns}) VALUES ({placeholders})"
+
+    # == Public Methods ============================================================================
+    def add(self, data: dict[int, pd.DataFrame]) -> None:
+        """
+        Adds a snapshot (DataFrames indexed by unix_timestamp in ms, keyed by serial number).
+        Rows that are already stored are ignored, also for the aggregates.
+        """
+        with self._lock:
+            with self._con:
+                self._con.execute("BEGIN")
+                for serial, df in data.items():
+                    if serial is None or df.empty:
+                        continue
+                    df = self._new_rows(int(serial), df)
+                    if df.empty:
+                        continue
+
+                    self._con.executemany(self._insert_raw_sql, self._raw_rows(int(serial), df))
+                    self._update_tiers(int(serial), df)
+
+            if time.time() >= self._next_prune:
+                self._next_prune = time.time() + self.PRUNE_INTERVAL
+                self._prune()
+
+    def query(
+        self,
+        serial_number: int,
+        start: Time,
+        end: Time,
+        columns: Optional[list[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the raw rows of serial_number with start <= unix_timestamp < end, with the dtypes
+        of the metric schema. columns limits the returned metrics.
+        """
+        columns = list(columns) if columns is not None else list(self.RAW_COLUMNS)
+        self._check_columns(columns, self.RAW_COLUMNS)
+
+        sql = (
+            f"SELECT ts, {', '.join(columns)} FROM raw "
+            "WHERE serial_number = ? AND ts >= ? AND ts < ? ORDER BY ts"
+        )
+        with self._lock:
+            rows = self._con.execute(sql, (serial_number, _to_ms(start), _to_ms(end))).fetchall()
+
+        df = pd.DataFrame.from_records(rows, columns=[self.INDEX_NAME] + columns)
+        df["serial_number"] = serial_number
+        df = df.set_index(self.INDEX_NAME)
+        df = df[[metric.name for metric in METRICS if metric.name in df.columns]]
+        mapping = {metric.name: metric.dtype for metric in METRICS}
+        df = df.astype({name: mapping[name] for name in df.columns if name != "connection_type"})
+        df.index = df.index.astype(mapping[self.INDEX_NAME])
+        return df
+
+    def query_aggregates(
+        self,
+        serial_number: int,
+        start: Time,
+        end: Time,
+        tier: str = "1min",
+        columns: Optional[list[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the aggregates of serial_number for the buckets start <= bucket < end of tier.
+        The index is the bucket start in ms, the columns are <metric>_mean, _min, _max and _count.
+        """
+        if tier not in self.TIERS:
+            raise ValueError(f"Unknown tier {tier}, use one of {tuple(self.TIERS)}.")
+        columns = list(columns) if columns is not None else list(self.AGGREGATED_COLUMNS)
+        self._check_columns(columns, self.AGGREGATED_COLUMNS)
+
+        selects = []
+        for name in columns:
+            selects += [
+                f"CASE WHEN {name}_count > 0 THEN {name}_sum / {name}_count END",
+                f"{name}_min",
+                f"{name}_max",
+                f"{name}_count",
+            ]
+        sql = (
+            f"SELECT bucket, {', '.join(selects)} FROM agg_{tier} "
+            "WHERE serial_number = ? AND bucket >= ? AND bucket < ? ORDER BY bucket"
+        )
+        with self._lock:
+            rows = self._con.execute(sql, (serial_number, _to_ms(start), _to_ms(end))).fetchall()
+
+        names = [f"{name}_{agg}" for name in columns for agg in self.AGGREGATES]
+        df = pd.DataFrame.from_records(rows, columns=[self.INDEX_NAME] + names)
+        df = df.set_index(self.INDEX_NAME)
+        df = df.astype({name: "Int64" if name.endswith("_count") else "Float64" for name in names})
+        df.index = df.index.astype("Int64")
+        return df
+
+    def get_serial_numbers(self) -> list[int]:
+        """Returns the serial numbers with stored aggregates."""
+        with self._lock:
+            rows = self._con.execute("SELECT DISTINCT serial_number FROM agg_1h").fetchall()
+        return sorted(row[0] for row in rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+    # == Helpers ===================================================================================
+    def _create_tables(self) -> None:
+        sql_types = {metric.name: _sql_type(metric.dtype) for metric in METRICS}
+        sql_types["connection_type"] = "TEXT"
+
+        raw_columns = "".join(f", {name} {sql_types[name]}" for name in self.RAW_COLUMNS)
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS raw (serial_number INTEGER NOT NULL, ts INTEGER NOT NULL"
+            f"{raw_columns}, PRIMARY KEY (serial_number, ts)) WITHOUT ROWID"
+        )
+
+        aggregated_columns = "".join(
+            f", {name}_count INTEGER NOT NULL, {name}_sum REAL NOT NULL, "
+            f"{name}_min REAL, {name}_max REAL"
+            for name in self.AGGREGATED_COLUMNS
+        )
+        for tier in self.TIERS:
+            self._con.execute(
+                f"CREATE TABLE IF NOT EXISTS agg_{tier} (serial_number INTEGER NOT NULL, "
+                f"bucket INTEGER NOT NULL{aggregated_columns}, "
+                "PRIMARY KEY (serial_number, bucket)) WITHOUT ROWID"
+            )
+
+        # merges the aggregates of new rows into an existing bucket
+        updates = []
+        for name in self.AGGREGATED_COLUMNS:
+            updates += [
+                f"{name}_count = {name}_count + excluded.{name}_count",
+                f"{name}_sum = {name}_sum + excluded.{name}_sum",
+                f"{name}_min = min(coalesce({name}_min, excluded.{name}_min), "
+                f"coalesce(excluded.{name}_min, {name}_min))",
+                f"{name}_max = max(coalesce({name}_max, excluded.{name}_max), "
+                f"coalesce(excluded.{name}_max, {name}_max))",
+            ]
+        agg_columns = ["serial_number", "bucket"] + [
+            f"{name}_{agg}"
+            for name in self.AGGREGATED_COLUMNS
+            for agg in ("count", "sum", "min", "max")
+        ]
+        self._upsert_sql = {
+            tier: (
+                f"INSERT INTO agg_{tier} ({', '.join(agg_columns)}) "
+                f"VALUES ({', '.join('?' * len(agg_columns))}) "
+                f"ON CONFLICT (serial_number, bucket) DO UPDATE SET {', '.join(updates)}"
+            )
+            for tier in self.TIERS
+        }
+
+    def _new_rows(self, serial: int, df: pd.DataFrame) -> pd.DataFrame:
+        """Drops the rows that are already stored and duplicated timestamps."""
+        df = df[df.index.notna()]
+        df = df[~df.index.duplicated(keep="last")]
+        if df.empty:
+            return df
+
+        timestamps = df.index.to_numpy(dtype=np.int64)
+        stored = self._con.execute(
+            "SELECT ts FROM raw WHERE serial_number = ? AND ts >= ? AND ts <= ?",
+            (serial, int(timestamps.min()), int(timestamps.max())),
+        ).fetchall()
+        if stored:
+            df = df[~np.isin(timestamps, [row[0] for row in stored])]
+        return df
+
+    def _raw_rows(self, serial: int, df: pd.DataFrame) -> list[tuple]:
+        n = len(df)
+        columns = [[serial] * n, df.index.to_numpy(dtype=np.int64).tolist()]
+        for name in self.RAW_COLUMNS:
+            if name in df.columns:
+                columns.append(_to_list(df[name]))
+            else:
+                columns.append([None] * n)
+        return list(zip(*columns))
+
+    def _update_tiers(self, serial: int, df: pd.DataFrame) -> None:
+        """Merges the aggregates of the rows into the buckets of every tier."""
+        timestamps = df.index.to_numpy(dtype=np.int64)
+        numeric = pd.DataFrame(
+            {
+                name: df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+                if name in df.columns
+                else np.full(len(df), np.nan)
+                for name in self.AGGREGATED_COLUMNS
+            }
+        )
+        for tier, width in self.TIERS.items():
+            self._update_tier(tier, serial, numeric.groupby(timestamps // width * width))
+
+    def _update_tier(self, tier: str, serial: int, grouped: Any) -> None:
+        aggregates = {
+            "count": grouped.count(),
+            "sum": grouped.sum(),
+            "min": grouped.min(),
+            "max": grouped.max(),
+        }
+
+        columns = [
+            [serial] * len(aggregates["count"]),
+            aggregates["count"].index.tolist(),
+        ]
+        for name in self.AGGREGATED_COLUMNS:
+            columns.append(aggregates["count"][name].tolist())
+            columns.append(aggregates["sum"][name].tolist())
+            columns.append(_to_list(aggregates["min"][name]))
+            columns.append(_to_list(aggregates["max"][name]))
+        self._con.executemany(self._upsert_sql[tier], list(zip(*columns)))
+
+    def _prune(self) -> None:
+        """Deletes the raw rows and aggregates older than their retention. Needs the lock."""
+        now_ms = int(time.time() * 1e3)
+        with self._con:
+            self._con.execute("BEGIN")
+            self._con.execute(
+                "DELETE FROM raw WHERE ts < ?", (now_ms - int(self._raw_retention * 1e3),)
+            )
+            for tier, retention in self._tier_retention.items():
+                if retention is not None:
+                    self._con.execute(
+                        f"DELETE FROM agg_{tier} WHERE bucket < ?",
+                        (now_ms - int(retention * 1e3),),
+                    )
+
+    @staticmethod
+    def _check_columns(columns: list[str], allowed: tuple[str, ...]) -> None:
+        unknown = set(columns) - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown columns: {sorted(unknown)}")
+
+
+def _sql_type(dtype: str) -> str:
+    return "INTEGER" if dtype.startswith("Int") else "REAL"
+
+
+def _to_list(series: pd.Series) -> list:
+    """Python values with None for missing values."""
+    if series.dtype == object:
+        return [None if pd.isna(value) else value for value in series.tolist()]
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan).tolist()
+    return [None if value != value else value for value in values]  # NaN != NaN
+
+
+def _to_ms(t: Time) -> int:
+    if isinstance(t, datetime.datetime):
+        return int(t.timestamp() * 1e3)
+    return int(t)
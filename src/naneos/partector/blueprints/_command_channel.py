@@ -0,0 +1,69 @@
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Callable, Optional, Union
+
+
+class PartectorCommandChannel:
+    """
+    Request/response matching for info commands like "N?", "f?", "H?" or custom write_line calls.
+
+    Every request registers a Future together with the expected response length before the
+    command is written. The reading thread passes each info line to resolve(), which completes
+    the Future of the in-flight request as soon as a line with the matching length arrives.
+    The waiting caller wakes up immediately, no polling and no sleeps. Lines that do not match
+    are rejected (resolve() returns False, the caller drops them) and can not overwrite a
+    pending response.
+    Requests of one device are serialized, because the device answers in order.
+    """
+
+    def __init__(self) -> None:
+        self._request_lock = Lock()  # one command in flight per device
+        self._lock = Lock()  # guards _pending between requester and reader
+        self._pending: Optional[tuple[int, Future]] = None
+
+    def request(
+        self, write: Callable[[], None], expected_length: int, timeout: float
+    ) -> list[Union[int, str]]:
+        """
+        Writes a command and waits for its response.
+
+        Args:
+            write (Callable[[], None]): Writes the command to the device.
+            expected_length (int): Length of the response including the timestamp.
+            timeout (float): Seconds to wait for the response.
+
+        Returns:
+            list: The response line as [unix_timestamp, val1, ...].
+
+        Raises:
+            ValueError: If no matching response arrived in time.
+        """
+        with self._request_lock:
+            future: Future = Future()
+            with self._lock:
+                self._pending = (expected_length, future)
+
+            try:
+                write()
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise ValueError(
+                    f"Received no data of length {expected_length} within {timeout} s."
+                ) from None
+            finally:
+                with self._lock:
+                    self._pending = None
+
+    def resolve(self, data: list[Union[int, str]]) -> bool:
+        """Completes the in-flight request with data if the length matches. Returns True if used."""
+        with self._lock:
+            if self._pending is None:
+                return False
+
+            expected_length, future = self._pending
+            if len(data) != expected_length or future.done():
+                return False
+
+            future.set_result(data)
+            return True
@@ -0,0 +1,232 @@
+from typing import Any, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+
+
+class NaneosDeviceDataBuffer:
+    """
+    Preallocated columnar ring buffer for the data points of one device.
+
+    Every column of NaneosDeviceDataPoint is stored in its own typed numpy array together with a
+    presence mask. Appending a point is O(1); once the buffer is full the oldest row gets
+    overwritten. The pandas DataFrame is only built in to_dataframe(), with the dtypes from
+    NaneosDeviceDataPoint.PANDAS_DTYPES_MAPPING.
+    """
+
+    MAX_ROWS = 300
+    INDEX_NAME = "unix_timestamp"
+    COLUMNS: tuple[str, ...] = tuple(
+        name for name in NaneosDeviceDataPoint.FIELD_NAMES if name != "unix_timestamp"
+    )
+    _COLUMN_INDICES: tuple[int, ...] = tuple(
+        NaneosDeviceDataPoint.FIELD_INDEX[name] for name in COLUMNS
+    )
+
+    # == Static helpers for dict[int, NaneosDeviceDataBuffer] =====================================
+    @staticmethod
+    def add_data_point_to_dict(
+        buffers: dict[int, "NaneosDeviceDataBuffer"], data: NaneosDeviceDataPoint
+    ) -> dict[int, "NaneosDeviceDataBuffer"]:
+        """Appends the point to the buffer of its serial number. Creates the buffer if needed."""
+        if data.unix_timestamp is None:
+            return buffers
+
+        buffer = buffers.get(data.serial_number)  # type: ignore[arg-type]
+        if buffer is None:
+            buffer = NaneosDeviceDataBuffer()
+            buffers[data.serial_number] = buffer  # type: ignore[index]
+
+        buffer.append(data)
+        return buffers
+
+    @staticmethod
+    def add_data_points_to_dict(
+        buffers: dict[int, "NaneosDeviceDataBuffer"], points: list[NaneosDeviceDataPoint]
+    ) -> dict[int, "NaneosDeviceDataBuffer"]:
+        """Bulk version of add_data_point_to_dict. Points may belong to different devices."""
+        grouped: dict[int, list[NaneosDeviceDataPoint]] = {}
+        for point in points:
+            grouped.setdefault(point.serial_number, []).append(point)  # type: ignore[arg-type]
+
+        for serial, serial_points in grouped.items():
+            buffer = buffers.get(serial)
+            if buffer is None:
+                buffer = NaneosDeviceDataBuffer()
+                buffers[serial] = buffer
+            buffer.extend(serial_points)
+
+        return buffers
+
+    @staticmethod
+    def add_data_columns_to_dict(
+        buffers: dict[int, "NaneosDeviceDataBuffer"],
+        serial_number: int,
+        index: np.ndarray,
+        columns: Mapping[str, Any],
+    ) -> dict[int, "NaneosDeviceDataBuffer"]:
+        """Column version of add_data_point_to_dict for rows of one device."""
+        if len(index) == 0:
+            return buffers
+
+        buffer = buffers.get(serial_number)
+        if buffer is None:
+            buffer = NaneosDeviceDataBuffer()
+            buffers[serial_number] = buffer
+
+        buffer.extend_columns(index, columns)
+        return buffers
+
+    @staticmethod
+    def to_dataframe_dict(
+        buffers: dict[int, "NaneosDeviceDataBuffer"],
+    ) -> dict[int, pd.DataFrame]:
+        """Converts all non-empty buffers to DataFrames, keyed by serial number."""
+        return {serial: buf.to_dataframe() for serial, buf in buffers.items() if len(buf) > 0}
+
+    # == Lifecycle =================================================================================
+    def __init__(self, max_rows: int = MAX_ROWS) -> None:
+        self._max_rows = max_rows
+        self._start = 0  # position of the oldest row
+        self._size = 0
+
+        self._index = np.zeros(max_rows, dtype=np.int64)
+        self._values: dict[str, np.ndarray] = {}
+        self._present: dict[str, np.ndarray] = {}
+
+        for name in self.COLUMNS:
+            self._values[name] = np.empty(max_rows, dtype=self._numpy_dtype(name))
+            self._present[name] = np.zeros(max_rows, dtype=bool)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # == Public Methods ============================================================================
+    def append(self, data: NaneosDeviceDataPoint) -> None:
+        """Appends one data point. Overwrites the oldest row if the buffer is full."""
+        if data.unix_timestamp is None:
+            return
+
+        if self._size < self._max_rows:
+            pos = (self._start + self._size) % self._max_rows
+            self._size += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self._max_rows
+
+        values = data.to_tuple()
+        self._index[pos] = data.unix_timestamp
+        for name, i in zip(self.COLUMNS, self._COLUMN_INDICES):
+            value = values[i]
+            if value is None:
+                self._present[name][pos] = False
+            else:
+                self._values[name][pos] = value
+                self._present[name][pos] = True
+
+    def extend(self, points: list[NaneosDeviceDataPoint]) -> None:
+        """Appends many data points at once with one vectorized write per column."""
+        columns = NaneosDeviceDataPoint.to_columns(
+            point for point in points if point.unix_timestamp is not None
+        )
+        if not columns:
+            return
+
+        index = np.array(columns.pop(self.INDEX_NAME), dtype=np.int64)
+        self.extend_columns(
+            index, {name: np.array(column, dtype=object) for name, column in columns.items()}
+        )
+
+    def extend_columns(self, index: np.ndarray, columns: Mapping[str, Any]) -> None:
+        """
+        Appends rows given as columns with one vectorized write per column.
+
+        Args:
+            index (np.ndarray): unix_timestamp of every row.
+            columns (Mapping[str, Any]): Field name to numpy array, or to a scalar for columns
+                that are constant over all rows. Object arrays may contain None for missing
+                values. Columns that are not given (or None) are missing.
+        """
+        # only the newest max_rows rows can survive in the buffer
+        skip = max(0, len(index) - self._max_rows)
+        n_new = len(index) - skip
+        if n_new == 0:
+            return
+
+        pos = (self._start + self._size + np.arange(n_new)) % self._max_rows
+        overflow = max(0, self._size + n_new - self._max_rows)
+        self._size = min(self._max_rows, self._size + n_new)
+        self._start = (self._start + overflow) % self._max_rows
+
+        self._index[pos] = index[skip:]
+        for name in self.COLUMNS:
+            column = columns.get(name)
+            if column is None:
+                self._present[name][pos] = False
+            elif not isinstance(column, np.ndarray):
+                self._values[name][pos] = column
+                self._present[name][pos] = True
+            elif column.dtype == object:
+                column = column[skip:]
+                present = np.not_equal(column, None)
+                self._present[name][pos] = present
+                if present.any():
+                    self._values[name][pos[present]] = column[present]
+            else:
+                self._values[name][pos] = column[skip:]
+                self._present[name][pos] = True
+
+    def get_last(self, name: str) -> Optional[Any]:
+        """Returns the newest value of the given column or None if it is missing."""
+        if self._size == 0:
+            return None
+
+        pos = (self._start + self._size - 1) % self._max_rows
+        if not self._present[name][pos]:
+            return None
+
+        value = self._values[name][pos]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Returns the buffered rows (oldest first) as a DataFrame indexed by unix_timestamp."""
+        order = (self._start + np.arange(self._size)) % self._max_rows
+
+        index_dtype = NaneosDeviceDataPoint.PANDAS_DTYPES_MAPPING[self.INDEX_NAME]
+        index = pd.Index(pd.array(self._index[order], dtype=index_dtype), name=self.INDEX_NAME)
+        columns = {name: self._column_array(name, order) for name in self.COLUMNS}
+
+        return pd.DataFrame(columns, index=index)
+
+    # == Helpers ===================================================================================
+    @staticmethod
+    def _numpy_dtype(name: str) -> Any:
+        pandas_dtype = NaneosDeviceDataPoint.PANDAS_DTYPES_MAPPING.get(name)
+        if name == "connection_type" or pandas_dtype is None:
+            return object
+        if pandas_dtype.startswith("Int"):
+            return np.int64
+        return np.float64
+
+    def _column_array(self, name: str, order: np.ndarray) -> Any:
+        values = self._values[name][order]
+        mask = ~self._present[name][order]
+        pandas_dtype = NaneosDeviceDataPoint.PANDAS_DTYPES_MAPPING.get(name)
+
+        if values.dtype == object or pandas_dtype is None:
+            values[mask] = None
+            return values
+
+        if pandas_dtype.startswith("Int"):
+            values[mask] = 0
+            return pd.arrays.IntegerArray(values.astype(pandas_dtype.lower()), mask)
+
+        mask |= np.isnan(values)
+        values[mask] = 0.0
+        return pd.arrays.FloatingArray(values.astype(pandas_dtype.lower()), mask)
@@ -0,0 +1,166 @@
+from bisect import insort
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+
+
+class NaneosDataMerger:
+    """
+    Incremental version of add_to_existing_naneos_data() and sort_and_clean_naneos_data().
+
+    Every serial number gets a store keyed by unix_timestamp, the priority rules are applied when
+    rows are added instead of on every snapshot:
+    - only rows of the best connection type seen are kept: "serial" > "connected" > "advertisement"
+    - P2PRO rows replace the P2 rows of the same serial number
+    - a newer row replaces a stored row with the same timestamp
+    The timestamps are kept sorted, so drain() only gathers the stored rows in order.
+    """
+
+    CONNECTION_PRIORITY: dict[str, int] = {
+        NaneosDeviceDataPoint.CONN_TYPE_SERIAL: 3,
+        NaneosDeviceDataPoint.CONN_TYPE_CONNECTED: 2,
+        NaneosDeviceDataPoint.CONN_TYPE_ADVERTISEMENT: 1,
+    }  # unknown connection types: 0
+
+    def __init__(self) -> None:
+        self._stores: dict[int, _SerialStore] = {}
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def __contains__(self, serial: object) -> bool:
+        return serial in self._stores
+
+    # == Public Methods ============================================================================
+    def add(self, data: dict[int, pd.DataFrame]) -> None:
+        """Adds the DataFrames of data, keyed by serial number."""
+        for serial, df in data.items():
+            if serial is None or df.empty:
+                continue
+
+            store = self._stores.get(serial)
+            if store is None:
+                store = _SerialStore()
+                self._stores[serial] = store
+            store.add(df, self._connection_ranks(df))
+
+    def discard(self, serial: int) -> None:
+        """Forgets all rows of serial."""
+        self._stores.pop(serial, None)
+
+    def drain(self, serial_only: Iterable[Optional[int]] = ()) -> dict[int, pd.DataFrame]:
+        """
+        Returns the merged rows of every serial number sorted by timestamp and clears the stores.
+        Serial numbers in serial_only are only returned with rows of a serial connection.
+        """
+        serial_only = set(serial_only)
+        serial_rank = self.CONNECTION_PRIORITY[NaneosDeviceDataPoint.CONN_TYPE_SERIAL]
+
+        stores, self._stores = self._stores, {}
+        data = {}
+        for serial, store in stores.items():
+            if serial in serial_only and store.rank != serial_rank:
+                continue
+
+            df = store.to_dataframe()
+            if df is not None:
+                data[serial] = df
+
+        return data
+
+    # == Helpers ===================================================================================
+    @classmethod
+    def _connection_ranks(cls, df: pd.DataFrame) -> np.ndarray:
+        if "connection_type" not in df.columns:
+            return np.zeros(len(df), dtype=np.int64)
+
+        ranks = df["connection_type"].map(cls.CONNECTION_PRIORITY)
+        return ranks.fillna(0).to_numpy(dtype=np.int64)
+
+
+class _SerialStore:
+    """Rows of one serial number as (chunk, position, is P2) references to the added frames."""
+
+    __slots__ = ("chunks", "rows", "timestamps", "rank", "has_p2pro")
+
+    def __init__(self) -> None:
+        self.rank = -1  # best connection type
+        self._clear()
+
+    def _clear(self) -> None:
+        self.chunks: list[pd.DataFrame] = []
+        self.rows: dict[Any, tuple[int, int, bool]] = {}
+        self.timestamps: list[Any] = []  # sorted keys of rows
+        self.has_p2pro = False
+
+    def add(self, df: pd.DataFrame, ranks: np.ndarray) -> None:
+        best = int(ranks.max())
+        if best < self.rank:
+            return
+        if best > self.rank:  # rows of a worse connection type are never returned
+            self._clear()
+            self.rank = best
+        keep = (ranks == best) & df.index.notna()
+
+        if "device_type" in df.columns:
+            device_type = df["device_type"]
+            is_p2 = (device_type == NaneosDeviceDataPoint.DEV_TYPE_P2).to_numpy(
+                dtype=bool, na_value=False
+            )
+            is_p2pro = (device_type == NaneosDeviceDataPoint.DEV_TYPE_P2PRO).to_numpy(
+                dtype=bool, na_value=False
+            )
+        else:
+            is_p2 = is_p2pro = np.zeros(len(df), dtype=bool)
+
+        if not self.has_p2pro and (keep & is_p2pro).any():
+            self.has_p2pro = True
+            self._remove_p2_rows()
+        if self.has_p2pro:
+            keep &= ~is_p2
+
+        positions = np.flatnonzero(keep)
+        if len(positions) == 0:
+            return
+
+        chunk = len(self.chunks)
+        self.chunks.append(df)
+
+        rows, timestamps = self.rows, self.timestamps
+        for pos, timestamp, is_p2_row in zip(
+            positions.tolist(), df.index[positions].tolist(), is_p2[positions].tolist()
+        ):
+            if timestamp not in rows:
+                if not timestamps or timestamp > timestamps[-1]:
+                    timestamps.append(timestamp)
+                else:
+                    insort(timestamps, timestamp)
+            rows[timestamp] = (chunk, pos, is_p2_row)
+
+    def to_dataframe(self) -> Optional[pd.DataFrame]:
+        """Gathers the stored rows in timestamp order, None if there are none."""
+        if not self.timestamps:
+            return None
+
+        refs = [self.rows[timestamp] for timestamp in self.timestamps]
+        chunk_ids = np.fromiter((ref[0] for ref in refs), dtype=np.int64, count=len(refs))
+        positions = np.fromiter((ref[1] for ref in refs), dtype=np.int64, count=len(refs))
+
+        # one concat of the referenced chunks and one take in timestamp order
+        used = np.unique(chunk_ids)
+        if len(used) == 1:
+            return self.chunks[int(used[0])].iloc[positions]
+
+        lengths = np.array([len(self.chunks[chunk]) for chunk in used.tolist()], dtype=np.int64)
+        offsets = np.zeros(len(self.chunks), dtype=np.int64)
+        offsets[used] = np.cumsum(lengths) - lengths
+
+        frames = [self.chunks[chunk] for chunk in used.tolist()]
+        return pd.concat(frames).iloc[offsets[chunk_ids] + positions]
+
+    def _remove_p2_rows(self) -> None:
+        self.rows = {t: row for t, row in self.rows.items() if not row[2]}
+        self.timestamps = [t for t in self.timestamps if t in self.rows]
@@ -1,8 +1,11 @@
-from dataclasses import dataclass
-from typing import Optional, Union
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Any, Callable, ClassVar, Iterable, Optional, Union
 
 import pandas as pd
 
+from naneos.partector.blueprints._metric_schema import METRICS
+
 
 def add_to_existing_naneos_data(
     data: dict[int, pd.DataFrame], new_data: dict[int, pd.DataFrame]
@@ -62,8 +65,21 @@ def sort_and_clean_naneos_data(
     return data_return
 
 
-@dataclass
+@dataclass(slots=True)
 class NaneosDeviceDataPoint:
+    """
+    One data point of a naneos device.
+
+    The class uses __slots__ to keep the per-instance memory small, because a new point is created
+    for every serial line, BLE notification batch and advertisement. FIELD_NAMES and FIELD_INDEX
+    are computed once after the class definition and allow fast conversions without iterating
+    over __dataclass_fields__.
+    """
+
+    FIELD_NAMES: ClassVar[tuple[str, ...]]
+    FIELD_INDEX: ClassVar[dict[str, int]]
+    _FIELD_GETTER: ClassVar[Callable[[Any], tuple]]
+
     DEV_TYPE_P2 = 0
     DEV_TYPE_P1 = 1
     DEV_TYPE_P2PRO = 2
@@ -116,66 +132,8 @@ class NaneosDeviceDataPoint:
         "particle_number_300nm",
     }
 
-    PANDAS_DTYPES_MAPPING = {
-        "unix_timestamp": "Int64",
-        "serial_number": "Int32",
-        "connection_type": "Int32",
-        "firmware_version": "Int32",
-        "device_type": "Int32",
-        "device_status": "Int32",
-        "runtime_min": "Int32",
-        "ldsa": "Float32",
-        "particle_number_concentration": "Float32",
-        "average_particle_diameter": "Float32",
-        "particle_mass": "Float32",
-        "particle_surface": "Float32",
-        "diffusion_current": "Float32",
-        "diffusion_current_offset": "Float32",
-        "diffusion_current_average": "Float32",
-        "diffusion_current_stddev": "Float32",
-        "diffusion_current_max": "Float32",
-        "diffusion_current_delay_on": "Float32",
-        "diffusion_current_delay_off": "Float32",
-        "corona_voltage": "Float32",
-        "corona_voltage_onset": "Float32",
-        "hires_adc1": "Float32",
-        "hires_adc2": "Float32",
-        "electrometer_1_amplitude": "Float32",
-        "electrometer_2_amplitude": "Float32",
-        "electrometer_1_gain": "Float32",
-        "electrometer_2_gain": "Float32",
-        "temperature": "Float32",
-        "relative_humidity": "Float32",
-        "deposition_voltage": "Float32",
-        "battery_voltage": "Float32",
-        "flow_from_dp": "Float32",
-        "ambient_pressure": "Float32",
-        "channel_pressure": "Float32",
-        "differential_pressure": "Float32",
-        "pump_voltage": "Float32",
-        "pump_current": "Float32",
-        "pump_pwm": "Float32",
-        "particle_number_10nm": "Float32",
-        "particle_number_16nm": "Float32",
-        "particle_number_26nm": "Float32",
-        "particle_number_43nm": "Float32",
-        "particle_number_70nm": "Float32",
-        "particle_number_114nm": "Float32",
-        "particle_number_185nm": "Float32",
-        "particle_number_300nm": "Float32",
-        "sigma_size_dist": "Float32",
-        "steps_inversion": "Float32",
-        "current_dist_0": "Float32",
-        "current_dist_1": "Float32",
-        "current_dist_2": "Float32",
-        "current_dist_3": "Float32",
-        "current_dist_4": "Float32",
-        "supply_voltage_5V": "Float32",
-        "positive_voltage_3V3": "Float32",
-        "negative_voltage_3V3": "Float32",
-        "usb_cc_voltage": "Float32",
-        "cs_status": "Int32",
-    }
+    # dtype, unit and protobuf encoding of every field are defined in _metric_schema.METRICS
+    PANDAS_DTYPES_MAPPING = {metric.name: metric.dtype for metric in METRICS}
 
     @staticmethod
     def add_data_point_to_dict(
@@ -197,15 +155,32 @@ class NaneosDeviceDataPoint:
 
         return devices
 
+    def to_tuple(self) -> tuple:
+        """Returns all field values in the order of FIELD_NAMES."""
+        return NaneosDeviceDataPoint._FIELD_GETTER(self)
+
     def to_dict(self, remove_nan=True) -> dict[str, Union[int, float]]:
+        values = NaneosDeviceDataPoint._FIELD_GETTER(self)
         if remove_nan:
             return {
-                key: getattr(self, key)
-                for key in self.__dataclass_fields__
-                if getattr(self, key) is not None
+                key: value
+                for key, value in zip(NaneosDeviceDataPoint.FIELD_NAMES, values)
+                if value is not None
             }
         else:
-            return {key: getattr(self, key) for key in self.__dataclass_fields__}
+            return dict(zip(NaneosDeviceDataPoint.FIELD_NAMES, values))
+
+    @staticmethod
+    def to_columns(points: Iterable["NaneosDeviceDataPoint"]) -> dict[str, tuple]:
+        """
+        Converts a list of points into columns keyed by field name.
+        Missing values stay None. Returns an empty dict if no points are given.
+        """
+        rows = [NaneosDeviceDataPoint._FIELD_GETTER(point) for point in points]
+        if not rows:
+            return {}
+
+        return dict(zip(NaneosDeviceDataPoint.FIELD_NAMES, zip(*rows)))
 
     @staticmethod
     def safe_astype(df: pd.DataFrame, mapping: dict[str, str], **kwargs) -> pd.DataFrame:
@@ -287,6 +262,13 @@ class NaneosDeviceDataPoint:
     cs_status: Optional[float] = None  # boolean, true or false
 
 
+NaneosDeviceDataPoint.FIELD_NAMES = tuple(f.name for f in fields(NaneosDeviceDataPoint))
+NaneosDeviceDataPoint.FIELD_INDEX = {
+    name: i for i, name in enumerate(NaneosDeviceDataPoint.FIELD_NAMES)
+}
+NaneosDeviceDataPoint._FIELD_GETTER = attrgetter(*NaneosDeviceDataPoint.FIELD_NAMES)
+
+
 PARTECTOR1_DATA_STRUCTURE_V_LEGACY: dict[str, Union[type[int], type[float]]] = {
     "unix_timestamp": int,
     "runtime_min": float,
@@ -0,0 +1,35 @@
+class SerialLineFramer:
+    """
+    Splits a serial byte stream into lines.
+
+    Received chunks are collected in one reusable bytearray. Complete lines are cut off in one
+    step, "\\r" and "\\x00" are removed in the same pass and the trailing partial line stays in the
+    buffer until the next chunk completes it.
+    """
+
+    DELETE_BYTES = b"\r\x00"
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, chunk: bytes) -> list[str]:
+        """Adds the chunk to the buffer and returns all lines that are complete now."""
+        if not chunk:
+            return []
+
+        self._buffer += chunk
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return []
+
+        complete = self._buffer[:end].translate(None, self.DELETE_BYTES)
+        del self._buffer[: end + 1]  # in place, keeps the allocated buffer
+
+        return [line for line in complete.decode(errors="ignore").split("\n") if line]
+
+    def clear(self) -> None:
+        """Drops the buffered partial line, e.g. after reconnecting."""
+        self._buffer.clear()
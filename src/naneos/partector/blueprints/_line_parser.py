@@ -0,0 +1,118 @@
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Union
+
+import numpy as np
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+class PartectorLineParser:
+    """
+    Precompiled parser for one serial data structure (e.g. PARTECTOR2_DATA_STRUCTURE_V320).
+
+    The parser is built once per layout and converts a batch of queued lines
+    ([unix_timestamp, "val1", "val2", ...]) into typed numpy columns in one vectorized pass.
+    Columns without a field in NaneosDeviceDataPoint (e.g. "surface", "steps") are dropped.
+    """
+
+    INDEX_NAME = "unix_timestamp"
+
+    # == Construction ==============================================================================
+    @staticmethod
+    def compile(
+        data_structure: dict[str, Union[type[int], type[float]]],
+    ) -> "PartectorLineParser":
+        """Returns the parser for the given data structure. Parsers are cached per layout."""
+        return PartectorLineParser._compile_cached(tuple(data_structure.items()))
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _compile_cached(
+        layout: tuple[tuple[str, Union[type[int], type[float]]], ...],
+    ) -> "PartectorLineParser":
+        return PartectorLineParser(layout)
+
+    def __init__(self, layout: tuple[tuple[str, Union[type[int], type[float]]], ...]) -> None:
+        self.line_length = len(layout)
+
+        # (name, position in the line, is_int) for every column that is a data point field
+        self._columns: tuple[tuple[str, int, bool], ...] = tuple(
+            (name, pos, data_type is int)
+            for pos, (name, data_type) in enumerate(layout)
+            if name != self.INDEX_NAME and name in NaneosDeviceDataPoint.FIELD_INDEX
+        )
+        self._int_positions = np.array(
+            [pos - 1 for pos, (_, data_type) in enumerate(layout) if pos > 0 and data_type is int],
+            dtype=np.intp,
+        )
+
+    # == Public Methods ============================================================================
+    @property
+    def column_names(self) -> tuple[str, ...]:
+        return tuple(name for name, _, _ in self._columns)
+
+    def parse(self, lines: list[list[Union[int, str]]]) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """
+        Parses the queued lines into (unix_timestamp index, {field name: column}).
+        Lines that can not be casted are dropped with a warning.
+        """
+        lines = [line for line in lines if len(line) == self.line_length]
+        if not lines or self.line_length < 2:
+            return np.empty(0, dtype=np.int64), {}
+
+        values, parsed = self._parse_values(lines)
+        valid = parsed & self._valid_rows(values)
+
+        if not valid.all():
+            for i in np.flatnonzero(~valid):
+                logger.warning(f"Could not cast data: {lines[i]}")
+            values = values[valid]
+            lines = [line for line, ok in zip(lines, valid) if ok]
+
+        index = np.fromiter((int(line[0]) for line in lines), dtype=np.int64, count=len(lines))
+        columns = {
+            name: values[:, pos - 1].astype(np.int64) if is_int else values[:, pos - 1]
+            for name, pos, is_int in self._columns
+        }
+
+        return index, columns
+
+    # == Helpers ===================================================================================
+    def _parse_values(self, lines: list[list[Union[int, str]]]) -> tuple[np.ndarray, np.ndarray]:
+        """Converts the string part of all lines to float64. Returns (values, parsed mask)."""
+        n_values = self.line_length - 1
+
+        # fast path: parse all lines at once in C
+        try:
+            text = "\t".join(chain.from_iterable(line[1:] for line in lines))  # type: ignore[arg-type]
+            values = np.fromstring(text, sep="\t")
+            if values.size == len(lines) * n_values:
+                return values.reshape(len(lines), n_values), np.ones(len(lines), dtype=bool)
+        except (TypeError, ValueError):
+            pass
+
+        # slow path: find the broken rows one by one
+        values = np.zeros((len(lines), n_values))
+        parsed = np.zeros(len(lines), dtype=bool)
+        for i, line in enumerate(lines):
+            try:
+                values[i] = [float(value) for value in line[1:]]
+                parsed[i] = True
+            except ValueError:
+                pass
+
+        return values, parsed
+
+    def _valid_rows(self, values: np.ndarray) -> Any:
+        """Int columns must hold finite, integral numbers like the int() cast requires."""
+        valid = np.ones(len(values), dtype=bool)
+
+        if len(self._int_positions):
+            ints = values[:, self._int_positions]
+            valid &= np.isfinite(ints).all(axis=1) & (ints == np.floor(ints)).all(axis=1)
+
+        return valid
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# rounding of the fixed point protobuf values
+ROUND = "round"  # round half to even
+TRUNC = "trunc"  # towards zero
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """
+    Description of one NaneosDeviceDataPoint field.
+
+    proto_field is the DevicePoint field the metric is uploaded to (None if it is not uploaded).
+    The uploaded value is the fixed point integer rounding(value * scale), negative values are
+    sent as 0 if clip_negative is set.
+    """
+
+    name: str
+    dtype: str  # pandas dtype
+    unit: Optional[str] = None
+    proto_field: Optional[str] = None
+    scale: float = 1.0
+    rounding: str = ROUND
+    clip_negative: bool = False
+
+
+# same order as the fields of NaneosDeviceDataPoint
+METRICS: tuple[MetricSpec, ...] = (
+    # mandatory
+    MetricSpec("unix_timestamp", "Int64", "s"),
+    MetricSpec("serial_number", "Int32"),
+    MetricSpec("connection_type", "Int32"),  # "serial", "connected", "advertisement"
+    MetricSpec("firmware_version", "Int32", None, "firmware_version", rounding=TRUNC),
+    MetricSpec("device_type", "Int32"),  # 0: P2, 1: P1, 2: P2PRO, 3: P2PRO_CS
+    MetricSpec("device_status", "Int32", "bitmask", "device_status", rounding=TRUNC),
+    # optional
+    MetricSpec("runtime_min", "Int32", "min"),
+    MetricSpec("ldsa", "Float32", "um**2/cm**3", "ldsa", 100.0, TRUNC),
+    MetricSpec(
+        "particle_number_concentration", "Float32", "1/cm**3", "particle_number_concentration"
+    ),
+    MetricSpec("average_particle_diameter", "Float32", "nm", "average_particle_diameter"),
+    MetricSpec("particle_mass", "Float32", "ug/m**3", "particle_mass", 100.0),
+    MetricSpec("particle_surface", "Float32", "um**2/m**3", "particle_surface", 100.0),
+    MetricSpec(
+        "diffusion_current", "Float32", "nA", "diffusion_current", 100.0, clip_negative=True
+    ),
+    MetricSpec("diffusion_current_offset", "Float32", "nA", "diffusion_current_offset", 100.0),
+    MetricSpec("diffusion_current_average", "Float32", "nA"),  # TODO: implement in protobuf
+    MetricSpec("diffusion_current_stddev", "Float32", "nA", "diffusion_current_stddev", 100.0),
+    MetricSpec("diffusion_current_max", "Float32", "nA"),  # TODO: implement in protobuf
+    MetricSpec(
+        "diffusion_current_delay_on",
+        "Float32",
+        "cs",
+        "diffusion_current_delay_on",
+        clip_negative=True,
+    ),
+    MetricSpec(
+        "diffusion_current_delay_off",
+        "Float32",
+        "cs",
+        "diffusion_current_delay_off",
+        clip_negative=True,
+    ),
+    MetricSpec("corona_voltage", "Float32", "V", "corona_voltage"),
+    MetricSpec("corona_voltage_onset", "Float32", "V"),  # TODO: implement in protobuf
+    MetricSpec("hires_adc1", "Float32"),  # momentanwert em 1
+    MetricSpec("hires_adc2", "Float32"),  # momentanwert em 2
+    MetricSpec("electrometer_1_amplitude", "Float32", "mV", "electrometer_1_offset", 10.0),
+    MetricSpec("electrometer_2_amplitude", "Float32", "mV", "electrometer_2_offset", 10.0),
+    MetricSpec("electrometer_1_gain", "Float32", "mV", "electrometer_1_gain", 100.0),
+    MetricSpec("electrometer_2_gain", "Float32", "mV", "electrometer_2_gain", 100.0),
+    MetricSpec("temperature", "Float32", "Celsius", "temperature"),
+    MetricSpec("relative_humidity", "Float32", "%", "relative_humidity"),
+    MetricSpec("deposition_voltage", "Float32", "V", "deposition_voltage"),
+    MetricSpec("battery_voltage", "Float32", "V", "battery_voltage", 100.0),
+    MetricSpec("flow_from_dp", "Float32", "l/min", "flow", 1000.0),
+    MetricSpec("ambient_pressure", "Float32", "hPa", "ambient_pressure", 10.0),
+    MetricSpec("channel_pressure", "Float32", "hPa", "channel_pressure", 10.0),
+    MetricSpec("differential_pressure", "Float32", "Pa", "differential_pressure", 10.0),
+    MetricSpec("pump_voltage", "Float32", "V", "pump_voltage", 100.0),
+    MetricSpec("pump_current", "Float32", "mA", "pump_current", 1000.0),
+    MetricSpec("pump_pwm", "Float32", "%", "pump_pwm"),
+    MetricSpec("particle_number_10nm", "Float32", "1/cm**3/log(d)", "particle_number_10nm"),
+    MetricSpec("particle_number_16nm", "Float32", "1/cm**3/log(d)", "particle_number_16nm"),
+    MetricSpec("particle_number_26nm", "Float32", "1/cm**3/log(d)", "particle_number_26nm"),
+    MetricSpec("particle_number_43nm", "Float32", "1/cm**3/log(d)", "particle_number_43nm"),
+    MetricSpec("particle_number_70nm", "Float32", "1/cm**3/log(d)", "particle_number_70nm"),
+    MetricSpec("particle_number_114nm", "Float32", "1/cm**3/log(d)", "particle_number_114nm"),
+    MetricSpec("particle_number_185nm", "Float32", "1/cm**3/log(d)", "particle_number_185nm"),
+    MetricSpec("particle_number_300nm", "Float32", "1/cm**3/log(d)", "particle_number_300nm"),
+    MetricSpec("sigma_size_dist", "Float32", "gsd", "sigma_size_dist", 100.0),
+    MetricSpec("steps_inversion", "Float32", "steps", "steps_inversion"),
+    MetricSpec("current_dist_0", "Float32", "mV", "current_dist_0", 100000.0),
+    MetricSpec("current_dist_1", "Float32", "mV", "current_dist_1", 100000.0),
+    MetricSpec("current_dist_2", "Float32", "mV", "current_dist_2", 100000.0),
+    MetricSpec("current_dist_3", "Float32", "mV", "current_dist_3", 100000.0),
+    MetricSpec("current_dist_4", "Float32", "mV", "current_dist_4", 100000.0),
+    MetricSpec("supply_voltage_5V", "Float32", "V", "supply_voltage_5V", 10.0),
+    MetricSpec("positive_voltage_3V3", "Float32", "V", "positive_voltage_3V3", 10.0),
+    MetricSpec("negative_voltage_3V3", "Float32", "V", "negative_voltage_3V3", 10.0),
+    MetricSpec("usb_cc_voltage", "Float32", "V", "usb_cc_voltage", 10.0),
+    # Needed for the garagenbox
+    MetricSpec("cs_status", "Int32", "bool", "cs_status", rounding=TRUNC),
+)
+
+METRICS_BY_NAME: dict[str, MetricSpec] = {metric.name: metric for metric in METRICS}
+
+# metrics that are uploaded as DevicePoint fields
+PROTO_METRICS: tuple[MetricSpec, ...] = tuple(m for m in METRICS if m.proto_field is not None)
@@ -5,11 +5,16 @@ from datetime import datetime, timezone
 from threading import Event, Thread
 from typing import Any, Callable, Optional, Union
 
+import numpy as np
 import serial
 
 from naneos.logger import LEVEL_WARNING, get_naneos_logger
+from naneos.partector.blueprints._command_channel import PartectorCommandChannel
 from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+from naneos.partector.blueprints._line_framer import SerialLineFramer
+from naneos.partector.blueprints._line_parser import PartectorLineParser
 from naneos.partector.blueprints._partector_defaults import PartectorDefaults
+from naneos.partector.blueprints._serial_engine import PartectorSerialEngine
 
 logger = get_naneos_logger(__name__, LEVEL_WARNING)
 
@@ -40,9 +45,12 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
         self._sn: Optional[int] = None
         self._port: Optional[str] = None
         self._ser: serial.Serial = serial.Serial()
+        self._line_framer = SerialLineFramer()
         self._time_last_message_received = time.time()
         self._legacy_data_structure: bool = False
         self._wait_with_data_output_until = time.time()
+        # one shared reader thread for all partectors where the OS supports it
+        self._use_serial_engine = PartectorSerialEngine.is_supported()
 
     #########################################
     ### Init methods
@@ -59,11 +67,12 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
         self._init_thread()
         self._init_data_structures()
         self._init_clear_buffers()
-        self.start()  # starts the checker thread
+        self._start_reading()
 
         self._init_get_device_info()
 
         self._init_serial_data_structure()
+        self._compile_data_structure()
         self.set_verbose_freq(verb_freq)
 
         self._init_print_connection_info()
@@ -118,6 +127,7 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
                 self.set_verbose_freq(0)
                 time.sleep(10e-3)
                 self._ser.reset_input_buffer()
+                self._line_framer.clear()
                 break
             self._ser.close()
 
@@ -142,15 +152,18 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
         self.custom_info_size = 0
         # will be declared in child class
         self._data_structure: dict[str, type[Union[int, float]]] = {}
+        self._line_parser = PartectorLineParser.compile(self._data_structure)
         self._queue: deque[list[Union[int, str]]] = deque(maxlen=self.SERIAL_QUEUE_MAXSIZE)
-        self._queue_info: deque[list[Union[int, str]]] = deque(
-            maxlen=self.SERIAL_INFO_QUEUE_MAXSIZE
-        )
+        self._command_channel = PartectorCommandChannel()
 
     @abstractmethod
     def _init_serial_data_structure(self) -> None:
         pass
 
+    def _compile_data_structure(self) -> None:
+        """Compiles the currently selected data structure into the line parser."""
+        self._line_parser = PartectorLineParser.compile(self._data_structure)
+
     def _init_clear_buffers(self) -> None:
         if not self._connected:
             return
@@ -175,6 +188,13 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
         """Closes the serial connection and stops the reading thread."""
         self._close(blocking, shutdown, verbose_reset)
 
+    def _start_reading(self) -> None:
+        """Starts reading the serial port, either in the shared serial engine or in own threads."""
+        if self._use_serial_engine:
+            PartectorSerialEngine.get_instance().register(self)
+        else:
+            self.start()  # starts the reading and the checker thread
+
     def _checker_thread(self) -> None:
         while not self.thread_event.wait(0.5):
             if time.time() - self._time_last_message_received > 10:
@@ -200,6 +220,10 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
 
         checker_thread.join()
 
+        self._finish_reading()
+
+    def _finish_reading(self) -> None:
+        """Last steps after reading stopped: optionally switches the device off, closes the port."""
         if self._shutdown_partector:
             self.write_line("off!", 0)
 
@@ -217,6 +241,7 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
             return
 
         self._set_verbose_freq(freq)
+        self._compile_data_structure()
 
     @abstractmethod
     def _set_verbose_freq(self, freq: int) -> None:
@@ -275,21 +300,33 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
             self._queue = deque([self._queue.pop()], maxlen=self.SERIAL_QUEUE_MAXSIZE)
 
     def get_data(self) -> list[NaneosDeviceDataPoint]:
-        points: list[NaneosDeviceDataPoint] = []
+        """Returns all queued data as NaneosDeviceDataPoints and clears the queue."""
+        index, columns = self.get_data_columns()
+        return self._create_naneos_device_points(index, columns)
+
+    def get_data_columns(self) -> tuple[np.ndarray, dict[str, Any]]:
+        """
+        Returns all queued data as columns and clears the queue.
+        No intermediate NaneosDeviceDataPoint objects are created.
 
+        Returns:
+            tuple: unix_timestamp array and a dict of field name to numpy array. Device constant
+                fields (serial_number, device_type, ...) are given as scalars.
+        """
         serial_data = list(self._queue)[0:-1]
         self.clear_data_cache()
 
-        for line in serial_data:
-            try:
-                data_casted = self._cast_splitted_input_string(line)
-                point = self._create_naneos_device_point(data_casted)
-                points.append(point)
-            except Exception as excep:
-                logger.warning(f"Could not cast data: {excep}")
-                logger.warning(f"Data: {line}")
+        index, parsed = self._line_parser.parse(serial_data)
 
-        return points
+        columns: dict[str, Any] = {
+            "serial_number": self._sn,
+            "connection_type": NaneosDeviceDataPoint.CONN_TYPE_SERIAL,
+            "firmware_version": getattr(self, "_fw", None),
+            "device_type": self.device_type,
+        }
+        columns.update(parsed)
+
+        return index, columns
 
     #########################################
     ### Serial methods (private)
@@ -304,7 +341,10 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
             logger.warning("Could not set verbose frequency to 0!")
         self._shutdown_partector = shutdown
         self.thread_event.set()
-        if blocking:
+        if self._use_serial_engine:
+            PartectorSerialEngine.get_instance().unregister(self)
+            self._finish_reading()
+        elif blocking:
             self.join()
 
     def _run(self) -> None:
@@ -340,18 +380,18 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
         if not self._connected:
             return
 
-        line = self._read_line()
-
-        if not line or line == "":
-            return
+        for line in self._read_lines():
+            self._handle_line(line)
 
+    def _handle_line(self, line: str) -> None:
+        """Handles one received line. Called by the reading thread or the serial engine."""
         unix_timestamp = int(datetime.now(tz=timezone.utc).timestamp() * 1000)
         data = [unix_timestamp] + line.split("\t")
 
         self._notify_message_received()
 
         if not self._data_structure or len(data) < len(self._data_structure):
-            self._queue_info.append(data)
+            self._put_info_line(data)
 
         if time.time() < self._wait_with_data_output_until:
             return  # skip data output until time is over
@@ -362,6 +402,11 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
         elif len(data) > len(self._data_structure) and self._legacy_data_structure:
             self._queue.append(data[0 : len(self._data_structure)])
 
+    def _put_info_line(self, data: list[Union[int, str]]) -> None:
+        """Answers the in-flight command with the line, unrequested info lines are dropped."""
+        if not self._command_channel.resolve(data):
+            logger.debug(f"SN{self._sn} {self._port}: Dropping unrequested info line: {data}")
+
     def _check_device_connection(self) -> bool:
         if self.thread_event.is_set() or not self._ser or not self._ser.is_open:
             return False
@@ -419,50 +464,45 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
             self._ser.write(line.encode())
             # time.sleep(10e-3)
 
-    def _read_line(self) -> str:
+    def _read_lines(self) -> list[str]:
+        """
+        Reads everything that is waiting (at least one byte, blocks up to SERIAL_TIMEOUT) in one
+        call and returns the lines that got complete. Partial lines are kept for the next call.
+        """
         if not self._connected:
-            return ""
+            return []
 
         self._check_serial_connection()
         try:
-            data = ""
+            chunk = b""
             if self._ser:
-                data = self._ser.readline().decode()
+                size = min(max(self._ser.in_waiting, 1), self.SERIAL_READ_CHUNK_SIZE)
+                chunk = self._ser.read(size)
         except Exception as e:
             if self._ser:
                 self._ser.close()
             self._connected = False
             raise Exception(f"Was not able to read from the Serial connection: {e}")
 
-        return data.replace("\r", "").replace("\n", "").replace("\x00", "")
+        return self._line_framer.feed(chunk)
 
-    def _get_and_check_info(self, expected_length: int = 2) -> list[Union[int, str]]:
+    def _request_info(self, line: str, expected_length: int = 2) -> list[Union[int, str]]:
         """
-        Get information from the queue and check its length.
+        Writes the command and waits for the response from the reading thread.
 
         Parameters:
-            expected_length (int): The expected length of the information.
+            line (str): The command to write.
+            expected_length (int): The expected length of the response including the timestamp.
 
         Returns:
-            list: The information from the queue.
+            list: The response.
 
         Raises:
-            ValueError: If the length of the information does not match the expected length.
+            ValueError: If no response with the expected length arrived in time.
         """
-        # info_data = self._queue_info.get(timeout=self.SERIAL_TIMEOUT_INFO)
-        info_data = []
-        start_time = time.time()
-        while time.time() - start_time < self.SERIAL_TIMEOUT_INFO:
-            if len(self._queue_info) > 0:
-                info_data = self._queue_info.popleft()
-                break
-            time.sleep(0.005)
-        self._queue_info.clear()
-
-        if len(info_data) != expected_length:
-            error_msg = f"Received data of length {len(info_data)}, expected {expected_length}. Data: {info_data}"
-            raise ValueError(error_msg)
-        return info_data
+        return self._command_channel.request(
+            lambda: self._write_line(line), expected_length, self.SERIAL_TIMEOUT_INFO
+        )
 
     def _get_serial_number_secure(self) -> Optional[int]:
         if not self._connected:
@@ -475,14 +515,10 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
         raise Exception("Was not able to fetch the serial number (secure)!")
 
     def _get_serial_number(self) -> int:
-        self._queue_info.clear()
-        self._write_line("N?")
-        return int(self._get_and_check_info()[1])
+        return int(self._request_info("N?")[1])
 
     def _get_firmware_version(self) -> Optional[int]:
-        self._queue_info.clear()
-        self._write_line("f?")
-        fw = self._get_and_check_info()[1]
+        fw = self._request_info("f?")[1]
         try:
             fw = int(fw)
             return fw
@@ -491,9 +527,7 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
             return None
 
     def _get_integration_time(self) -> Optional[int]:
-        self._queue_info.clear()
-        self._write_line("H?")
-        it = self._get_and_check_info()[1]
+        it = self._request_info("H?")[1]
         try:
             it = int(it)
             it = int(2 ** (it + 1))  # convert to seconds
@@ -503,39 +537,25 @@ class PartectorBluePrint(Thread, PartectorDefaults, ABC):
             return None
 
     def _custom_info(self) -> list[Union[int, str]]:
-        self._queue_info.clear()
-        self._write_line(self.custom_info_str)
-        return self._get_and_check_info(self.custom_info_size)
+        return self._request_info(self.custom_info_str, self.custom_info_size)
 
-    def _cast_splitted_input_string(self, line: list[Union[int, str]]) -> list[Union[int, float]]:
-        line_parsed: list[Union[int, float]] = []
-
-        for value, data_type in zip(line, self._data_structure.values()):
-            # parsed_value = value if isinstance(value, data_type) else data_type(value)
-            parsed_value = data_type(value)
-
-            line_parsed.append(parsed_value)
-
-        return line_parsed
-
-    def _create_naneos_device_point(self, data: list[Union[int, float]]) -> NaneosDeviceDataPoint:
+    def _create_naneos_device_points(
+        self, index: np.ndarray, columns: dict[str, Any]
+    ) -> list[NaneosDeviceDataPoint]:
         """
-        Creates a NaneosDeviceDataPoint from the given data.
+        Creates NaneosDeviceDataPoints from the parsed columns.
 
         Args:
-            data (list): The data to create the NaneosDeviceDataPoint from.
+            index (np.ndarray): The unix timestamps of the rows.
+            columns (dict): The parsed columns, scalars are used for every row.
 
         Returns:
-            NaneosDeviceDataPoint: The created NaneosDeviceDataPoint.
+            list: The created NaneosDeviceDataPoints.
         """
-        point = NaneosDeviceDataPoint(
-            device_type=self.device_type,
-            serial_number=self._sn,
-            connection_type=NaneosDeviceDataPoint.CONN_TYPE_SERIAL,
-            firmware_version=self._fw,
-        )
-
-        for i, name in enumerate(self._data_structure.keys()):
-            setattr(point, name, data[i])
+        n = len(index)
+        names = ("unix_timestamp", *columns.keys())
+        values = [index.tolist()] + [
+            col.tolist() if isinstance(col, np.ndarray) else [col] * n for col in columns.values()
+        ]
 
-        return point
+        return [NaneosDeviceDataPoint(**dict(zip(names, row))) for row in zip(*values)]
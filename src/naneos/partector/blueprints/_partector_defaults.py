@@ -7,5 +7,5 @@ class PartectorDefaults:
     SERIAL_TIMEOUT = 0.2
     SERIAL_TIMEOUT_INFO = SERIAL_TIMEOUT + 0.05
     SERIAL_BAUDRATE = 9600
+    SERIAL_READ_CHUNK_SIZE = 4096  # bytes
     SERIAL_QUEUE_MAXSIZE = 200
-    SERIAL_INFO_QUEUE_MAXSIZE = 20
@@ -0,0 +1,263 @@
+import os
+import selectors
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+
+if TYPE_CHECKING:
+    from naneos.partector.blueprints._partector_blueprint import PartectorBluePrint
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+class PartectorSerialEngine:
+    """
+    Single reader thread for all serial Partectors.
+
+    Every registered Partector's port is multiplexed with selectors (epoll/kqueue) in one thread.
+    Received bytes are split into lines by the Partector's SerialLineFramer and handed to its
+    _handle_line().
+    The engine also runs the liveness checks that _checker_thread does in threaded mode. Checks
+    block until the device answers, therefore they run in a small thread pool and not in the
+    reader thread.
+
+    Only available on POSIX systems, because Windows serial handles can not be selected.
+    """
+
+    SELECT_TIMEOUT = 0.5  # seconds
+    CHECK_INTERVAL = 0.5  # seconds
+    CHECK_AFTER_SILENCE = 10.0  # seconds without messages until the connection gets checked
+    CHECK_WORKERS = 4
+
+    _instance: Optional["PartectorSerialEngine"] = None
+    _instance_lock = threading.Lock()
+
+    # == Singleton =================================================================================
+    @staticmethod
+    def is_supported() -> bool:
+        return os.name == "posix"
+
+    @classmethod
+    def get_instance(cls) -> "PartectorSerialEngine":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    # == Lifecycle =================================================================================
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._partectors: set["PartectorBluePrint"] = set()
+
+        # only touched by the reader thread
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._registered: dict["PartectorBluePrint", tuple[object, int]] = {}
+        self._wakeup_r = -1
+        self._wakeup_w = -1
+
+        self._checking: set["PartectorBluePrint"] = set()
+        self._checker = ThreadPoolExecutor(
+            max_workers=self.CHECK_WORKERS, thread_name_prefix="naneos-partector-checker"
+        )
+
+    # == Public Methods ============================================================================
+    def register(self, partector: "PartectorBluePrint") -> None:
+        """Starts reading the serial port of the partector. Starts the engine thread if needed."""
+        with self._lock:
+            self._partectors.add(partector)
+            if self._thread is None:
+                self._open_selector()
+                self._thread = threading.Thread(
+                    target=self._run, name="naneos-partector-serial-engine", daemon=True
+                )
+                self._thread.start()
+            else:
+                self._wakeup()
+
+    def unregister(self, partector: "PartectorBluePrint") -> None:
+        """Stops reading the serial port of the partector."""
+        with self._lock:
+            self._partectors.discard(partector)
+            self._wakeup()
+
+    def get_registered_count(self) -> int:
+        with self._lock:
+            return len(self._partectors)
+
+    # == Reader thread =============================================================================
+    def _run(self) -> None:
+        assert self._selector is not None
+        next_check = time.time() + self.CHECK_INTERVAL
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._partectors:
+                        self._close_selector()
+                        return
+                    partectors = set(self._partectors)
+
+                self._sync_registrations(partectors)
+
+                for key, _ in self._selector.select(timeout=self.SELECT_TIMEOUT):
+                    if key.data is None:
+                        self._drain_wakeup()
+                    else:
+                        self._read_port(key.data)
+
+                if time.time() >= next_check:
+                    next_check = time.time() + self.CHECK_INTERVAL
+                    self._check_liveness(partectors)
+        except Exception as e:
+            logger.exception(f"Serial engine stopped unexpectedly: {e}")
+            with self._lock:
+                partectors = set(self._partectors)
+                self._partectors.clear()
+                self._close_selector()
+
+            # nothing reads these ports anymore, the manager reconnects disconnected Partectors
+            # and their register() starts a new reader thread
+            for partector in partectors:
+                logger.warning(f"SN{partector._sn} {partector._port}: Marked disconnected.")
+                self._close_port(partector)
+
+    def _sync_registrations(self, partectors: set["PartectorBluePrint"]) -> None:
+        """Keeps the selector in sync with the currently open serial ports."""
+        assert self._selector is not None
+
+        wanted: dict["PartectorBluePrint", tuple[object, int]] = {}
+        for partector in partectors:
+            ser = partector._ser
+            if partector._connected and ser is not None and ser.is_open:
+                try:
+                    wanted[partector] = (ser, ser.fileno())
+                except Exception:
+                    pass
+
+        # remove stale registrations first, file descriptor numbers can be reused
+        for partector, registration in list(self._registered.items()):
+            if wanted.get(partector) != registration:
+                self._unregister_port(partector)
+
+        for partector, (ser, fd) in wanted.items():
+            if partector in self._registered:
+                continue
+            try:
+                self._selector.register(fd, selectors.EVENT_READ, partector)
+            except (KeyError, ValueError, OSError) as e:
+                logger.warning(f"SN{partector._sn} {partector._port}: Could not register: {e}")
+                continue
+            self._registered[partector] = (ser, fd)
+
+    def _read_port(self, partector: "PartectorBluePrint") -> None:
+        _, fd = self._registered[partector]
+
+        try:
+            chunk = os.read(fd, partector.SERIAL_READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            chunk = b""
+            logger.debug(f"SN{partector._sn} {partector._port}: Read failed: {e}")
+
+        if not chunk:  # readable but no data -> device is gone
+            self._mark_disconnected(partector)
+            return
+
+        for line in partector._line_framer.feed(chunk):
+            try:
+                partector._handle_line(line)
+            except Exception as e:
+                logger.warning(
+                    f"SN{partector._sn} {partector._port} "
+                    f"Exception occured during serial reading: {e}"
+                )
+
+    def _mark_disconnected(self, partector: "PartectorBluePrint") -> None:
+        with self._lock:
+            if partector not in self._partectors:
+                return  # got closed in the meantime
+
+        logger.warning(f"SN{partector._sn} {partector._port}: Serial port lost.")
+        self._unregister_port(partector)
+        self._close_port(partector)
+
+    def _check_liveness(self, partectors: set["PartectorBluePrint"]) -> None:
+        now = time.time()
+        for partector in partectors:
+            if partector in self._checking or partector.thread_event.is_set():
+                continue
+            if now - partector._time_last_message_received <= self.CHECK_AFTER_SILENCE:
+                continue
+
+            self._checking.add(partector)
+            future = self._checker.submit(self._run_liveness_check, partector)
+            future.add_done_callback(lambda _, p=partector: self._checking.discard(p))  # type: ignore[misc]
+
+    @staticmethod
+    def _run_liveness_check(partector: "PartectorBluePrint") -> None:
+        try:
+            logger.info(f"SN{partector._sn} {partector._port}: Checking device connection...")
+            partector._run_check_connection()
+        except Exception as e:
+            logger.error(e)
+        finally:
+            partector._time_last_message_received = time.time()
+
+    # == Helpers ===================================================================================
+    @staticmethod
+    def _close_port(partector: "PartectorBluePrint") -> None:
+        try:
+            partector._ser.close()
+        except Exception:
+            pass
+        partector._connected = False
+
+    def _unregister_port(self, partector: "PartectorBluePrint") -> None:
+        registration = self._registered.pop(partector, None)
+        if registration is None or self._selector is None:
+            return
+
+        try:
+            self._selector.unregister(registration[1])
+        except (KeyError, ValueError):
+            pass
+
+    def _wakeup(self) -> None:
+        if self._wakeup_w < 0:
+            return
+        try:
+            os.write(self._wakeup_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _drain_wakeup(self) -> None:
+        try:
+            while os.read(self._wakeup_r, 512):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _open_selector(self) -> None:
+        """Creates the selector and the wakeup pipe. Called with the lock held."""
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+
+    def _close_selector(self) -> None:
+        """Closes the selector and marks the reader thread as stopped. Called with the lock held."""
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        for fd in (self._wakeup_r, self._wakeup_w):
+            if fd >= 0:
+                os.close(fd)
+        self._wakeup_r = self._wakeup_w = -1
+        self._registered.clear()
+        self._thread = None
@@ -35,15 +35,15 @@ class Partector2(PartectorBluePrint):
         self.device_type = NaneosDeviceDataPoint.DEV_TYPE_P2
 
         if self._fw in [265, 275]:
-            self._data_structure = PARTECTOR2_DATA_STRUCTURE_V265_V275
+            self._data_structure = dict(PARTECTOR2_DATA_STRUCTURE_V265_V275)
             logger.info(f"SN{self._sn} has FW{self._fw}. -> Using V265/275 data structure.")
             logger.info("Contact naneos for a firmware update to get the latest features.")
         elif self._fw in [295, 297, 298]:
-            self._data_structure = PARTECTOR2_DATA_STRUCTURE_V295_V297_V298
+            self._data_structure = dict(PARTECTOR2_DATA_STRUCTURE_V295_V297_V298)
             logger.info(f"SN{self._sn} has FW{self._fw}. -> Using V295/297/298 data structure.")
             logger.info("Contact naneos for a firmware update to get the latest features.")
         elif self._fw >= 320:
-            self._data_structure = PARTECTOR2_DATA_STRUCTURE_V320
+            self._data_structure = dict(PARTECTOR2_DATA_STRUCTURE_V320)
             self._write_line("A0002!")  # activates antispikes
 
             if self._OUTPUT_PULSE_DIAGNOSTICS:
@@ -66,7 +66,7 @@ class Partector2(PartectorBluePrint):
 
             logger.info(f"SN{self._sn} has FW{self._fw}. -> Using V320 data structure.")
         else:
-            self._data_structure = PARTECTOR2_DATA_STRUCTURE_LEGACY
+            self._data_structure = dict(PARTECTOR2_DATA_STRUCTURE_LEGACY)
             self._legacy_data_structure = True
             logger.warning(f"SN{self._sn} has FW{self._fw}. -> Unofficial firmware version.")
             logger.warning("Using legacy data structure. Contact naneos for a FW update.")
@@ -37,7 +37,7 @@ class Partector2Pro(PartectorBluePrint):
             self._write_line("X0000!")
         elif freq in [1, 2, 3]:  # std p2 mode
             if self._fw >= 311:
-                self._data_structure = PARTECTOR2_DATA_STRUCTURE_V320
+                self._data_structure = dict(PARTECTOR2_DATA_STRUCTURE_V320)
 
                 self._write_line("M0000!")  # deactivates size dist mode
                 self._write_line("A0002!")  # activates antispikes
@@ -66,9 +66,9 @@ class Partector2Pro(PartectorBluePrint):
                 raise RuntimeError("Firmware too old for P2 pro mode. Minimum FW is 311.")
         elif freq == 6:  # p2 pro mode
             if self._fw >= 336:
-                self._data_structure = PARTECTOR2_PRO_DATA_STRUCTURE_V336
+                self._data_structure = dict(PARTECTOR2_PRO_DATA_STRUCTURE_V336)
             else:
-                self._data_structure = PARTECTOR2_PRO_DATA_STRUCTURE_V311
+                self._data_structure = dict(PARTECTOR2_PRO_DATA_STRUCTURE_V311)
 
             self._write_line("X0006!")  # activates verbose mode
             self._write_line("M0004!")  # activates size dist mode
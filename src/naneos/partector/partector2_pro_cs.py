@@ -69,12 +69,7 @@ class Partector2ProCs(Partector2Pro):
 
         logger.info(f"Catalyst state set to {state}.")
 
-    def _serial_reading_routine(self) -> None:
-        line = self._read_line()
-
-        if not line or line == "":
-            return
-
+    def _handle_line(self, line: str) -> None:
         if "CS_on" in line:
             self._catalyst_state = self.CS_ON
             if self._callback_catalyst:
@@ -105,7 +100,7 @@ class Partector2ProCs(Partector2Pro):
         self._notify_message_received()
 
         if len(data) != len(self._data_structure):
-            self._queue_info.append(data)
+            self._put_info_line(data)
             return
 
         state: Optional[int] = None
@@ -1,52 +1,58 @@
 import threading
 import time
+from typing import Optional
 
 import pandas as pd
 
 from naneos.logger import LEVEL_WARNING, get_naneos_logger
-from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+from naneos.partector.blueprints._data_buffer import NaneosDeviceDataBuffer
 from naneos.partector.partector1 import Partector1
 from naneos.partector.partector2 import Partector2
 from naneos.partector.partector2_pro import Partector2Pro
-from naneos.partector.scanPartector import scan_for_serial_partectors
+from naneos.partector.scanPartector import SerialPartectorDiscovery
+from naneos.serial_utils import SerialHotplugWatcher
 
 logger = get_naneos_logger(__name__, LEVEL_WARNING)
 
 
 class PartectorSerialManager(threading.Thread):
+    LOOP_INTERVAL_S = 1.0
+    # with hotplug events, ports are still rescanned from time to time as fallback
+    HOTPLUG_RESCAN_S = 30.0
+
     def __init__(self) -> None:
         super().__init__(daemon=True)
         self._stop_event = threading.Event()
 
-        self._data: dict[int, pd.DataFrame] = {}
+        self._data: dict[int, NaneosDeviceDataBuffer] = {}
 
         self._connected_p1: dict[str, Partector1] = {}
         self._connected_p2: dict[str, Partector2] = {}
         self._connected_p2_pro: dict[str, Partector2Pro] = {}
 
+        self._discovery = SerialPartectorDiscovery()
+        self._hotplug: Optional[SerialHotplugWatcher] = None
+
     def get_data(self) -> dict[int, pd.DataFrame]:
         """Fetches the data from all connected devices and returns it."""
         self._fetch_data()
         data = self._data
         self._data = {}
-        return data
+        return NaneosDeviceDataBuffer.to_dataframe_dict(data)
 
     def _fetch_data(self):
-        """Returns the data dictionary and deletes it."""
-        for port in list(self._connected_p1.keys()):
-            points = self._connected_p1[port].get_data()
-            for point in points:
-                self._data = NaneosDeviceDataPoint.add_data_point_to_dict(self._data, point)
-
-        for port in list(self._connected_p2.keys()):
-            points = self._connected_p2[port].get_data()
-            for point in points:
-                self._data = NaneosDeviceDataPoint.add_data_point_to_dict(self._data, point)
-
-        for port in list(self._connected_p2_pro.keys()):
-            points = self._connected_p2_pro[port].get_data()
-            for point in points:
-                self._data = NaneosDeviceDataPoint.add_data_point_to_dict(self._data, point)
+        """Moves the parsed data of all connected devices into the per-device buffers."""
+        partectors = (
+            list(self._connected_p1.values())
+            + list(self._connected_p2.values())
+            + list(self._connected_p2_pro.values())
+        )
+
+        for partector in partectors:
+            index, columns = partector.get_data_columns()
+            self._data = NaneosDeviceDataBuffer.add_data_columns_to_dict(
+                self._data, partector._sn, index, columns
+            )
 
     def stop(self) -> None:
         self._stop_event.set()
@@ -96,23 +102,65 @@ class PartectorSerialManager(threading.Thread):
         return p1_serials + p2_serials + p2_pro_serials
 
     def _manager_loop(self) -> None:
+        self._start_hotplug_watcher()
+        next_scan = 0.0
+
         while not self._stop_event.is_set():
             try:
-                possible_ports = scan_for_serial_partectors(
-                    ports_exclude=self.get_connected_addresses()
+                scan_needed = (
+                    self._hotplug is None
+                    or time.time() >= next_scan
+                    or self._discovery.has_pending_probes()
                 )
+                if scan_needed:
+                    possible_ports = self._discovery.scan(
+                        ports_exclude=self.get_connected_addresses()
+                    )
+                    next_scan = time.time() + self.HOTPLUG_RESCAN_S
 
                 self._disconnect_unplugged_ports()
-                self._connect_to_new_ports(possible_ports)
+                if scan_needed:
+                    self._connect_to_new_ports(possible_ports)
 
                 self._fetch_data()  # Fetch data from all connected devices
 
-                time.sleep(1.0)  # Sleep to avoid busy waiting
+                if self._wait_for_hotplug(self.LOOP_INTERVAL_S):
+                    next_scan = 0.0  # something got plugged in or out -> rescan now
 
             except Exception as e:
                 logger.exception(f"Error in serial manager loop: {e}")
 
         self._close_all_ports()
+        self._discovery.close()
+        if self._hotplug is not None:
+            self._hotplug.close()
+
+    def _start_hotplug_watcher(self) -> None:
+        """Uses hotplug events where available, otherwise ports get polled every loop."""
+        if not SerialHotplugWatcher.is_supported():
+            return
+
+        try:
+            watcher = SerialHotplugWatcher()
+            watcher.start()
+            self._hotplug = watcher
+        except OSError as e:
+            logger.info(f"Hotplug detection not available, polling serial ports: {e}")
+
+    def _wait_for_hotplug(self, timeout: float) -> bool:
+        """Waits for the next loop. Returns True if serial device nodes changed in the meantime."""
+        if self._hotplug is None:
+            time.sleep(timeout)  # Sleep to avoid busy waiting
+            return False
+
+        changed = self._hotplug.wait(timeout)
+        if changed is None:  # events got lost, rescan everything
+            self._discovery.invalidate_all()
+            return True
+
+        for port in changed:
+            self._discovery.invalidate(port)
+        return bool(changed)
 
     def _disconnect_unplugged_ports(self) -> None:
         """Disconnects all ports that are not in the possible_ports dictionary."""
@@ -121,12 +169,14 @@ class PartectorSerialManager(threading.Thread):
             if not self._connected_p1[port]._connected:
                 self._connected_p1[port].close()
                 self._connected_p1.pop(port, None)
+                self._discovery.invalidate(port)
 
         # Disconnect P2 ports
         for port in list(self._connected_p2.keys()):
             if not self._connected_p2[port]._connected:
                 self._connected_p2[port].close()
                 self._connected_p2.pop(port, None)
+                self._discovery.invalidate(port)
 
         # Disconnect P2 Pro ports
         for port in list(self._connected_p2_pro.keys()):
@@ -134,6 +184,7 @@ class PartectorSerialManager(threading.Thread):
                 print(f"Disconnecting P2 Pro port: {port}")
                 self._connected_p2_pro[port].close()
                 self._connected_p2_pro.pop(port, None)
+                self._discovery.invalidate(port)
 
     def _connect_to_new_ports(self, possible_ports: dict[str, dict[int, str]]) -> None:
         p1_ports = possible_ports["P1"].values()
@@ -1,10 +1,15 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from queue import Queue
 from threading import Thread
 from typing import Any, Callable, Optional
 
+from serial.tools.list_ports_common import ListPortInfo
+
 from naneos.logger.custom_logger import get_naneos_logger
 from naneos.partector.blueprints._partector_blueprint import PartectorBluePrint
-from naneos.serial_utils import list_serial_ports
+from naneos.serial_utils import list_dosemet_ports, list_serial_ports
+from naneos.serial_utils.list_serial_ports import _check_port_function
 
 logger = get_naneos_logger(__name__)
 
@@ -118,29 +123,158 @@ def scan_for_serial_partectors(ports_exclude: Optional[list] = None) -> dict:
 
 
 def __scan_port(port: str, q_1: Queue, q_2: Queue, q_2_pro: Queue, q_2_pro_cs: Queue) -> None:
+    result = _probe_port(port)
+    if result is None:
+        return
+
+    queues = {"P1": q_1, "P2": q_2, "P2pro": q_2_pro, "P2proCS": q_2_pro_cs}
+    device_type, serial_number, _ = result
+    queues[device_type].put({serial_number: port})
+
+
+def _probe_port(port: str) -> Optional[tuple[str, int, Optional[int]]]:
+    """Connects to the port and returns (device type, serial number, firmware) or None."""
+    partector: Optional[ScanPartector] = None
+    result: Optional[tuple[str, int, Optional[int]]] = None
+
     try:
         partector = ScanPartector(port=port)
+        sn = partector._sn
+        fw = getattr(partector, "_fw", None)
 
-        if partector._sn is None:
+        if sn is None:
             pass
-        elif partector._sn < 1000:
-            q_1.put({partector._sn: port})
+        elif sn < 1000:
+            result = ("P1", sn, fw)
+        elif fw is None:
+            pass  # firmware query failed, the type is unknown -> probed again later
+        elif fw < 310:
+            result = ("P2", sn, fw)
         else:
-            if partector._fw < 310:
-                q_2.put({partector._sn: port})
-            else:
-                name: str = partector.write_line("name?")[1]
-                if name == "P2":
-                    q_2.put({partector._sn: port})
-                elif name == "P2pro":
-                    q_2_pro.put({partector._sn: port})
-                elif name == "P2proCS":
-                    q_2_pro_cs.put({partector._sn: port})
-
-        partector.close(blocking=True)
+            name: str = partector.write_line("name?")[1]
+            if name in ("P2", "P2pro", "P2proCS"):
+                result = (name, sn, fw)
     except Exception:
+        pass
+
+    try:
         if isinstance(partector, ScanPartector):
             partector.close(blocking=True)
+    except Exception as e:
+        logger.debug(f"Closing {port} after probing failed: {e}")
+
+    return result
+
+
+class SerialPartectorDiscovery:
+    """
+    Cached serial port discovery for repeated scans (e.g. in the PartectorSerialManager loop).
+
+    Ports are identified by the USB identity pyserial already exposes (device, USB serial
+    number, vid/pid and location). The probe result (device type, serial number, firmware) is
+    remembered per identity, so unchanged ports are not opened again. Only newly appeared ports
+    get probed, concurrently and with a bounded wait; probes that take longer keep running in the
+    background and are picked up by a later scan. Ports without a Partector are probed again
+    after NEGATIVE_RETRY_S, e.g. for devices that were still booting.
+    """
+
+    PROBE_TIMEOUT_S = 5.0
+    PROBE_WORKERS = 8
+    NEGATIVE_RETRY_S = 30.0
+
+    def __init__(self) -> None:
+        self._known: dict[tuple, Optional[tuple[str, int, Optional[int]]]] = {}
+        self._negative_since: dict[tuple, float] = {}
+        self._probing: dict[tuple, Future] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.PROBE_WORKERS, thread_name_prefix="naneos-serial-discovery"
+        )
+
+    @staticmethod
+    def port_identity(port: ListPortInfo) -> tuple:
+        return (port.device, port.serial_number, port.vid, port.pid, port.location)
+
+    def scan(self, ports_exclude: Optional[list] = None) -> dict:
+        """Same result as scan_for_serial_partectors, but only new ports get probed."""
+        if ports_exclude is None:
+            ports_exclude = []
+
+        ports = {self.port_identity(port): port.device for port in list_dosemet_ports()}
+        self._forget_vanished_ports(ports)
+
+        for identity, device in ports.items():
+            if device in ports_exclude or identity in self._probing:
+                continue
+            if identity in self._known and not self._should_retry(identity):
+                continue
+            self._probing[identity] = self._executor.submit(_probe_port_checked, device)
+
+        if self._probing:
+            wait(self._probing.values(), timeout=self.PROBE_TIMEOUT_S)
+        self._collect_probes()
+
+        result: dict[str, dict[int, str]] = {"P1": {}, "P2": {}, "P2pro": {}, "P2proCS": {}}
+        for identity, device in ports.items():
+            found = self._known.get(identity)
+            if found is not None and device not in ports_exclude:
+                device_type, serial_number, _ = found
+                result[device_type][serial_number] = device
+
+        return result
+
+    def get_known_devices(self) -> dict[str, tuple[str, int, Optional[int]]]:
+        """Returns {port: (device type, serial number, firmware)} of all cached Partectors."""
+        return {identity[0]: found for identity, found in self._known.items() if found}
+
+    def has_pending_probes(self) -> bool:
+        """True while probes from an earlier scan are still running."""
+        return bool(self._probing)
+
+    def invalidate(self, port: str) -> None:
+        """Forgets the cached result of the port, it gets probed again on the next scan."""
+        for identity in [identity for identity in self._known if identity[0] == port]:
+            self._known.pop(identity, None)
+            self._negative_since.pop(identity, None)
+
+    def invalidate_all(self) -> None:
+        self._known.clear()
+        self._negative_since.clear()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _should_retry(self, identity: tuple) -> bool:
+        since = self._negative_since.get(identity)
+        return since is not None and time.time() - since > self.NEGATIVE_RETRY_S
+
+    def _forget_vanished_ports(self, ports: dict[tuple, str]) -> None:
+        for identity in [identity for identity in self._known if identity not in ports]:
+            self._known.pop(identity, None)
+            self._negative_since.pop(identity, None)
+
+    def _collect_probes(self) -> None:
+        for identity, future in list(self._probing.items()):
+            if not future.done():
+                continue
+            self._probing.pop(identity)
+
+            try:
+                found = future.result()
+            except Exception as e:
+                logger.debug(f"Probing {identity[0]} failed: {e}")
+                found = None
+
+            self._known[identity] = found
+            if found is None:
+                self._negative_since[identity] = time.time()
+            else:
+                self._negative_since.pop(identity, None)
+
+
+def _probe_port_checked(port: str) -> Optional[tuple[str, int, Optional[int]]]:
+    if not _check_port_function([port]):
+        return None
+    return _probe_port(port)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence, Union
+
+import numpy as np
+
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+
+
+@dataclass(frozen=True)
+class BleField:
+    """
+    One value of a BLE payload.
+
+    The payload is read as one little-endian bit field. segments are (bit offset, bit length)
+    pairs, least significant part first, so split values like the std device state
+    (bytes 10-11 plus 7 bits of byte 19) are described by two segments.
+    """
+
+    name: str
+    segments: tuple[tuple[int, int], ...]
+    dtype: type[Union[int, float]] = float
+    factor: Optional[float] = None  # value * factor
+    divisor: Optional[float] = None  # value / divisor
+
+    @staticmethod
+    def bytes(
+        name: str,
+        offset: int,
+        size: int,
+        dtype: type[Union[int, float]] = float,
+        factor: Optional[float] = None,
+        divisor: Optional[float] = None,
+    ) -> "BleField":
+        """Field made of size whole bytes starting at offset."""
+        return BleField(name, ((offset * 8, size * 8),), dtype, factor, divisor)
+
+
+class PartectorBleLayout:
+    """
+    Payload layout that is compiled once into a struct.Struct unpacker.
+
+    The bytes used by the fields are grouped into non overlapping cells. Every cell is read with
+    1/2/4 byte struct codes (a 3 byte value is read as H + B). Each field then takes its bits from
+    the cells with shift and mask. decode_into() runs a generated function that writes the values
+    directly into a NaneosDeviceDataPoint, decode_many() decodes many payloads of the same kind
+    with one numpy frombuffer call over the same compiled plan.
+    """
+
+    _CODES = {4: "I", 2: "H", 1: "B"}
+
+    def __init__(self, fields: Sequence[BleField]) -> None:
+        self.fields = tuple(fields)
+        self.field_names = frozenset(field.name for field in self.fields)
+
+        cells = self._build_cells(self.fields)
+        self._cells = cells
+        fmt, self._cell_sources, numpy_fields = self._build_format(cells)
+        self._struct = struct.Struct(fmt)
+        self.size = self._struct.size
+        self._numpy_fields = numpy_fields
+
+        # per field: (name, dtype, factor, divisor, ((cell, rshift, mask, lshift), ...))
+        self._plans = tuple(
+            (field.name, field.dtype, field.factor, field.divisor, self._plan(field, cells))
+            for field in self.fields
+        )
+
+        self._decode_into = self._compile_decode_into()
+
+    # == Public Methods ============================================================================
+    def decode_into(self, data: bytes, target: NaneosDeviceDataPoint) -> NaneosDeviceDataPoint:
+        """Decodes one payload and writes the fields into target."""
+        self._decode_into(data, target)
+        return target
+
+    def decode(self, data: bytes) -> NaneosDeviceDataPoint:
+        return self.decode_into(data, NaneosDeviceDataPoint())
+
+    def decode_many(self, payloads: Sequence[bytes]) -> dict[str, np.ndarray]:
+        """
+        Decodes many payloads of this layout at once.
+
+        Args:
+            payloads (Sequence[bytes]): Payloads, all of the same length.
+
+        Returns:
+            dict[str, np.ndarray]: Field name to column (float64 or int64), one row per payload.
+        """
+        if not payloads:
+            return {
+                field.name: np.empty(0, dtype=self._numpy_dtype(field)) for field in self.fields
+            }
+
+        length = len(payloads[0])
+        if length < self.size or any(len(payload) != length for payload in payloads):
+            raise ValueError(f"All payloads need the same length of at least {self.size} bytes.")
+
+        dtype = np.dtype({**self._numpy_fields, "itemsize": length})
+        raw = np.frombuffer(b"".join(payloads), dtype=dtype, count=len(payloads))
+        values = [raw[name].astype(np.uint64) for name in self._numpy_fields["names"]]
+        cells = [
+            values[src] if isinstance(src, int) else sum(values[i] << np.uint64(s) for i, s in src)
+            for src in self._cell_sources
+        ]
+
+        columns: dict[str, np.ndarray] = {}
+        for name, dtype_, factor, divisor, plan in self._plans:
+            column = np.zeros(len(payloads), dtype=np.uint64)
+            for cell, rshift, mask, lshift in plan:
+                part = (cells[cell] >> np.uint64(rshift)) & np.uint64(mask)
+                column |= part << np.uint64(lshift)
+
+            result = column.astype(np.float64 if dtype_ is float else np.int64)
+            if factor is not None:
+                result = result * factor
+            if divisor is not None:
+                result = result / divisor
+            columns[name] = result
+
+        return columns
+
+    # == Helpers ===================================================================================
+    @staticmethod
+    def _numpy_dtype(field: BleField) -> type:
+        if field.dtype is float or field.factor is not None or field.divisor is not None:
+            return np.float64
+        return np.int64
+
+    def _compile_decode_into(self) -> Callable[[bytes, NaneosDeviceDataPoint], None]:
+        """
+        Generates the decoder as one Python function (like namedtuple and dataclasses do): a single
+        unpack_from() call followed by one assignment per field, without any per field loop.
+        """
+        cells = [
+            f"v[{src}]"
+            if isinstance(src, int)
+            else " | ".join(f"v[{i}] << {shift}" if shift else f"v[{i}]" for i, shift in src)
+            for src in self._cell_sources
+        ]
+
+        lines = ["def decode_into(data, target):", "    v = unpack_from(data)"]
+        for name, dtype, factor, divisor, plan in self._plans:
+            parts = []
+            for cell, rshift, mask, lshift in plan:
+                part = f"({cells[cell]})"
+                if rshift:
+                    part = f"({part} >> {rshift})"
+                if mask != self._cell_mask(cell):
+                    part = f"({part} & {mask})"
+                if lshift:
+                    part = f"({part} << {lshift})"
+                parts.append(part)
+
+            value = " | ".join(parts)
+            if dtype is float:
+                value = f"float({value})"
+            if factor is not None:
+                value = f"{value} * {factor!r}"
+            if divisor is not None:
+                value = f"{value} / {divisor!r}"
+            lines.append(f"    target.{name} = {value}")
+
+        namespace: dict[str, Any] = {"unpack_from": self._struct.unpack_from}
+        exec("\n".join(lines), namespace)
+        return namespace["decode_into"]
+
+    def _cell_mask(self, cell: int) -> int:
+        start, end = self._cells[cell]
+        return (1 << ((end - start) * 8)) - 1
+
+    @staticmethod
+    def _build_cells(fields: Sequence[BleField]) -> list[tuple[int, int]]:
+        """Merges the byte ranges of all segments into sorted, non overlapping (start, end)."""
+        ranges = sorted(
+            (bit // 8, (bit + length + 7) // 8)
+            for field in fields
+            for bit, length in field.segments
+        )
+
+        cells: list[tuple[int, int]] = []
+        for start, end in ranges:
+            if cells and start < cells[-1][1]:
+                cells[-1] = (cells[-1][0], max(cells[-1][1], end))
+            else:
+                cells.append((start, end))
+        return cells
+
+    @classmethod
+    def _build_format(
+        cls, cells: list[tuple[int, int]]
+    ) -> tuple[str, list[Union[int, tuple[tuple[int, int], ...]]], dict]:
+        """
+        Returns the struct format, how every cell is assembled from the unpacked values
+        (value index or ((value index, left shift), ...)) and the matching numpy field spec.
+        """
+        fmt = "<"
+        sources: list[Union[int, tuple[tuple[int, int], ...]]] = []
+        numpy_fields: dict[str, list] = {"names": [], "formats": [], "offsets": []}
+        position = 0
+        n_values = 0
+
+        for start, end in cells:
+            if start > position:
+                fmt += f"{start - position}x"
+
+            parts = []
+            offset = start
+            while offset < end:
+                size = next(size for size in (4, 2, 1) if size <= end - offset)
+                fmt += cls._CODES[size]
+                numpy_fields["names"].append(f"v{n_values}")
+                numpy_fields["formats"].append(f"<u{size}")
+                numpy_fields["offsets"].append(offset)
+                parts.append((n_values, (offset - start) * 8))
+                n_values += 1
+                offset += size
+
+            sources.append(parts[0][0] if len(parts) == 1 else tuple(parts))
+            position = end
+
+        return fmt, sources, numpy_fields
+
+    @staticmethod
+    def _plan(
+        field: BleField, cells: list[tuple[int, int]]
+    ) -> tuple[tuple[int, int, int, int], ...]:
+        plan = []
+        lshift = 0
+        for bit, length in field.segments:
+            cell = next(i for i, (start, end) in enumerate(cells) if start * 8 <= bit < end * 8)
+            plan.append((cell, bit - cells[cell][0] * 8, (1 << length) - 1, lshift))
+            lshift += length
+        return tuple(plan)
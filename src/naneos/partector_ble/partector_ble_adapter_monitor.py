@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from importlib.metadata import version
+from typing import Any, Callable, Optional
+
+from bleak import BleakScanner
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+BLUEZ_SERVICE = "org.bluez"
+ADAPTER_INTERFACE = "org.bluez.Adapter1"
+OBJECT_MANAGER_INTERFACE = "org.freedesktop.DBus.ObjectManager"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+
+
+class PartectorBleAdapterMonitor:
+    """
+    Caches whether a powered Bluetooth adapter is available.
+
+    On Linux the adapters are read once from the BlueZ D-Bus objects and kept up to date by the
+    InterfacesAdded / InterfacesRemoved and PropertiesChanged (Powered) signals, so checking the
+    state never spawns a process. A restart of bluetoothd (org.bluez changes its owner) reloads
+    the adapters. Without D-Bus (other platforms, no system bus, dbus-fast missing) the adapter
+    is probed every probe_interval seconds instead.
+
+    on_change(available) is called on the event loop whenever the state changes. Can be used
+    with `async with`.
+    """
+
+    PROBE_INTERVAL = 10.0  # seconds
+
+    # == Lifecycle and Context Management ==========================================================
+    def __init__(
+        self,
+        on_change: Optional[Callable[[bool], None]] = None,
+        probe_interval: float = PROBE_INTERVAL,
+    ) -> None:
+        """
+        Args:
+            on_change (Callable[[bool], None], optional): Called with the new state on changes.
+            probe_interval (float): Seconds between two probes if D-Bus is not used.
+        """
+        self._on_change = on_change
+        self._probe_interval = probe_interval
+
+        self._available: Optional[bool] = None  # unknown until the first check
+        self._available_event = asyncio.Event()
+        self._adapters: dict[str, bool] = {}  # D-Bus path -> powered
+
+        self._bus: Any = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> PartectorBleAdapterMonitor:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    # == Public Methods ============================================================================
+    @property
+    def available(self) -> bool:
+        """True if a powered adapter is available, cached."""
+        return bool(self._available)
+
+    @property
+    def uses_dbus(self) -> bool:
+        """True if the state comes from BlueZ D-Bus signals, False if it is probed."""
+        return self._bus is not None
+
+    def get_adapters(self) -> dict[str, bool]:
+        """Returns the BlueZ adapters (D-Bus path -> powered), empty if D-Bus is not used."""
+        return dict(self._adapters)
+
+    def get_adapter_names(self) -> list[Optional[str]]:
+        """
+        Returns the names of the powered adapters (e.g. ["hci0", "hci1"]), [None] (the default
+        adapter) if the adapters are not known from D-Bus but one is available.
+        """
+        if not self.uses_dbus:
+            return [None] if self.available else []
+        return sorted(path.rsplit("/", 1)[-1] for path, on in self._adapters.items() if on)
+
+    async def start(self) -> None:
+        """Reads the current state and starts following the changes."""
+        if self._task is not None or self._bus is not None:
+            logger.warning("PartectorBleAdapterMonitor.start() called, but it is already running.")
+            return
+
+        if sys.platform.startswith("linux") and await self._dbus_start():
+            logger.info("Monitoring the Bluetooth adapters over BlueZ D-Bus.")
+            return
+
+        self._set_available(await self.probe())
+        self._task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        """Stops following the changes."""
+        if self._bus is not None:
+            bus, self._bus = self._bus, None
+            bus.disconnect()
+
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def wait_available(self, timeout: Optional[float] = None) -> bool:
+        """Waits until an adapter is available, returns False after timeout seconds."""
+        try:
+            await asyncio.wait_for(self._available_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    @classmethod
+    async def probe(cls) -> bool:
+        """Checks the adapter once, with bluetoothctl on Linux and a short BleakScanner else."""
+        if sys.platform.startswith("linux"):
+            return await cls._linux_probe()
+        return await cls._bleak_probe()
+
+    # == Helpers ===================================================================================
+    def _set_available(self, available: bool) -> None:
+        if available == self._available:
+            return
+
+        changed = self._available is not None
+        self._available = available
+        if available:
+            self._available_event.set()
+        else:
+            self._available_event.clear()
+
+        logger.info(f"Bluetooth adapter {'available' if available else 'not available'}.")
+        if changed and self._on_change is not None:
+            try:
+                self._on_change(available)
+            except Exception as e:
+                logger.exception(f"Adapter state callback failed: {e}")
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            self._set_available(await self.probe())
+
+    # -- BlueZ D-Bus -------------------------------------------------------------------------------
+    async def _dbus_start(self) -> bool:
+        """Connects to the system bus and subscribes to the adapter signals, False on failure."""
+        try:
+            from dbus_fast import BusType
+            from dbus_fast.aio import MessageBus
+        except ImportError:
+            logger.debug("dbus-fast not installed, probing the Bluetooth adapter.")
+            return False
+
+        bus = None
+        try:
+            bus = await MessageBus(bus_type=BusType.SYSTEM).connect()
+            bus.add_message_handler(self._on_dbus_message)
+
+            for rule in (
+                f"type='signal',interface='{OBJECT_MANAGER_INTERFACE}',"
+                "member='InterfacesAdded',arg0path='/org/bluez/'",
+                f"type='signal',interface='{OBJECT_MANAGER_INTERFACE}',"
+                "member='InterfacesRemoved',arg0path='/org/bluez/'",
+                f"type='signal',interface='{PROPERTIES_INTERFACE}',member='PropertiesChanged',"
+                f"arg0='{ADAPTER_INTERFACE}'",
+                "type='signal',interface='org.freedesktop.DBus',member='NameOwnerChanged',"
+                f"arg0='{BLUEZ_SERVICE}'",
+            ):
+                await _dbus_call(
+                    bus,
+                    "org.freedesktop.DBus",
+                    "/",
+                    "org.freedesktop.DBus",
+                    "AddMatch",
+                    "s",
+                    [rule],
+                )
+
+            self._bus = bus
+            # after subscribing, so no change between reading and subscribing is lost
+            await self._dbus_load_adapters()
+        except Exception as e:
+            logger.debug(f"BlueZ D-Bus not usable, probing the Bluetooth adapter: {e}")
+            self._bus = None
+            if bus is not None:
+                bus.disconnect()
+            return False
+
+        self._task = asyncio.get_running_loop().create_task(self._dbus_watch_disconnect(bus))
+        return True
+
+    async def _dbus_load_adapters(self) -> None:
+        try:
+            reply = await _dbus_call(
+                self._bus, BLUEZ_SERVICE, "/", OBJECT_MANAGER_INTERFACE, "GetManagedObjects"
+            )
+        except RuntimeError as e:  # bluetoothd not running
+            logger.debug(f"Could not read the BlueZ adapters: {e}")
+            self._adapters = {}
+        else:
+            self._adapters = {
+                path: bool(_unpack(interfaces[ADAPTER_INTERFACE].get("Powered", False)))
+                for path, interfaces in reply.body[0].items()
+                if ADAPTER_INTERFACE in interfaces
+            }
+        self._set_available(any(self._adapters.values()))
+
+    async def _dbus_watch_disconnect(self, bus: Any) -> None:
+        """Falls back to probing if the bus connection is lost."""
+        try:
+            await bus.wait_for_disconnect()
+        except Exception as e:
+            logger.debug(f"D-Bus connection lost: {e}")
+
+        if self._bus is bus:  # not stopped
+            logger.warning("D-Bus connection lost, probing the Bluetooth adapter instead.")
+            self._bus = None
+            self._adapters = {}
+            self._set_available(await self.probe())
+            self._task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    def _on_dbus_message(self, message: Any) -> None:
+        member = message.member
+        if member == "InterfacesAdded":
+            path, interfaces = message.body
+            if ADAPTER_INTERFACE in interfaces:
+                powered = interfaces[ADAPTER_INTERFACE].get("Powered", False)
+                self._adapters[path] = bool(_unpack(powered))
+        elif member == "InterfacesRemoved":
+            path, interfaces = message.body
+            if ADAPTER_INTERFACE in interfaces:
+                self._adapters.pop(path, None)
+        elif member == "PropertiesChanged":
+            interface, changed, _ = message.body
+            if interface != ADAPTER_INTERFACE or "Powered" not in changed:
+                return
+            self._adapters[message.path] = bool(_unpack(changed["Powered"]))
+        elif member == "NameOwnerChanged":
+            name, _, new_owner = message.body
+            if name != BLUEZ_SERVICE:
+                return
+            if not new_owner:  # bluetoothd stopped, no InterfacesRemoved are sent
+                self._adapters = {}
+            elif self._bus is not None:
+                asyncio.get_running_loop().create_task(self._dbus_load_adapters())
+                return
+        else:
+            return
+
+        self._set_available(any(self._adapters.values()))
+
+    # -- probes ------------------------------------------------------------------------------------
+    @staticmethod
+    async def _bleak_probe() -> bool:
+        """Check if the Bluetooth adapter is available and powered on."""
+        try:
+            # Try to get adapter info - this will fail if adapter is not available
+            scanner = BleakScanner()
+            # Test if we can discover devices briefly
+            await scanner.start()
+            await scanner.stop()
+            return True
+        except Exception as e:
+            logger.debug(f"Bluetooth adapter not available: {e}")
+            return False
+
+    @staticmethod
+    async def _linux_probe() -> bool:
+        """
+        Uses BlueZ (bluetoothctl show) to check that
+        - a Bluetooth controller exists and
+        - it is powered on ("Powered: yes").
+        """
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "bluetoothctl",
+                "show",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await proc.communicate()
+
+            if proc.returncode != 0:
+                logger.debug(
+                    "bluetoothctl show failed with code %s: %s",
+                    proc.returncode,
+                    stderr.decode(errors="ignore").strip(),
+                )
+                return False
+
+            output = stdout.decode(errors="ignore")
+
+            if "No default controller available" in output:
+                logger.debug("No default Bluetooth controller available (BlueZ).")
+                return False
+
+            for line in output.splitlines():
+                line = line.strip()
+                if line.lower().startswith("powered:"):
+                    return "yes" in line.lower()
+
+            logger.debug("Bluetooth controller found but no 'Powered' field in output.")
+            return False
+
+        except FileNotFoundError:
+            logger.debug("bluetoothctl not found on system.")
+            return False
+
+        except Exception as e:
+            logger.debug(f"Error while checking Bluetooth adapter via bluetoothctl: {e}")
+            return False
+
+
+async def _dbus_call(
+    bus: Any,
+    destination: str,
+    path: str,
+    interface: str,
+    member: str,
+    signature: str = "",
+    body: Optional[list] = None,
+) -> Any:
+    from dbus_fast import Message, MessageType
+
+    reply = await bus.call(
+        Message(
+            destination=destination,
+            path=path,
+            interface=interface,
+            member=member,
+            signature=signature,
+            body=body or [],
+        )
+    )
+    if reply.message_type == MessageType.ERROR:
+        raise RuntimeError(f"{member} failed: {reply.error_name} {reply.body}")
+    return reply
+
+
+def bleak_adapter_kwargs(adapter: Optional[str]) -> dict[str, Any]:
+    """Keyword arguments for BleakScanner / BleakClient to use adapter, {} for the default."""
+    if adapter is None:
+        return {}
+    if int(version("bleak").split(".")[0]) >= 3:  # the adapter keyword is deprecated since 3.0
+        return {"bluez": {"adapter": adapter}}
+    return {"adapter": adapter}
+
+
+def _unpack(value: Any) -> Any:
+    """Value of a dbus_fast Variant."""
+    return getattr(value, "value", value)
+
+
+if __name__ == "__main__":
+
+    async def main() -> None:
+        def on_change(available: bool) -> None:
+            print(f"Adapter available: {available}")
+
+        async with PartectorBleAdapterMonitor(on_change=on_change) as monitor:
+            print(f"Adapter available: {monitor.available}, D-Bus: {monitor.uses_dbus}")
+            print(f"Adapters: {monitor.get_adapters()}")
+            await asyncio.sleep(60)  # toggle the adapter to see the changes
+
+    asyncio.run(main())
@@ -11,10 +11,8 @@ from bleak.exc import BleakDeviceNotFoundError
 
 from naneos.logger import LEVEL_WARNING, get_naneos_logger
 from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
-from naneos.partector_ble.decoder.partectod_ble_decoder_aux_error import PartectorBleDecoderAuxError
-from naneos.partector_ble.decoder.partector_ble_decoder_aux import PartectorBleDecoderAux
-from naneos.partector_ble.decoder.partector_ble_decoder_size import PartectorBleDecoderSize
-from naneos.partector_ble.decoder.partector_ble_decoder_std import PartectorBleDecoderStd
+from naneos.partector_ble.partector_ble_adapter_monitor import bleak_adapter_kwargs
+from naneos.partector_ble.partector_ble_decode_worker import PartectorBleDecodeWorker
 
 logger = get_naneos_logger(__name__, LEVEL_WARNING)
 
@@ -28,6 +26,7 @@ class PartectorBleConnection:
         "read": "e7add783-b042-4876-aae1-112855353cc1",
         "size_dist": "e7add784-b042-4876-aae1-112855353cc1",
     }
+    AUX_TIMEOUT = 60.0  # seconds without aux data until the connection is reset
 
     # static methods ###############################################################################
     @staticmethod
@@ -46,6 +45,8 @@ class PartectorBleConnection:
         loop: asyncio.AbstractEventLoop,
         serial_number: int,
         queue: asyncio.Queue[NaneosDeviceDataPoint],
+        decode_worker: Optional[PartectorBleDecodeWorker] = None,
+        adapter: Optional[str] = None,
     ) -> None:
         """
         Initializes the BLE connection with the given device, event loop, and queue.
@@ -54,24 +55,29 @@ class PartectorBleConnection:
             device (BLEDevice): The BLE device to connect to.
             loop (asyncio.AbstractEventLoop): The event loop to run the connection in.
             serial_number (int): The serial number of the device.
+            queue (asyncio.Queue): The queue for the decoded records.
+            decode_worker (PartectorBleDecodeWorker, optional): Shared decode stage, which emits
+                the records into its own queue. A private one for queue is used if not given.
+            adapter (str, optional): BlueZ adapter to connect with (e.g. "hci1"), the device has
+                to come from a scanner of the same adapter. Default adapter if None.
         """
         self.SERIAL_NUMBER = serial_number
-        self._device_type = NaneosDeviceDataPoint.DEV_TYPE_P2  # Thats the deafault value
-        self._data = NaneosDeviceDataPoint()
-        self._next_ts = 0.0
         self._last_aux_data_ts = time.time()
-        self._queue = queue
 
-        # Decode queue to decouple decoding from BLE callbacks
-        # This prevents blocking the event loop when decoding heavy data
-        self._decode_queue: asyncio.Queue = asyncio.Queue(maxsize=200)
+        # The callbacks only hand the notifications to the decode worker, decoding and emitting
+        # the assembled records happens there for all connections together
+        self._own_decode_worker = decode_worker is None
+        self._decode_worker = decode_worker or PartectorBleDecodeWorker(loop, queue)
 
         self._device = device
         self._loop = loop
         self._task: asyncio.Task | None = None
         self._stop_event = asyncio.Event()
         self._stop_event.set()  # stopped by default
-        self._client = BleakClient(device, self._disconnect_callback, timeout=10)
+        self._wake = asyncio.Event()  # stop() or disconnect
+        self._client = BleakClient(
+            device, self._disconnect_callback, timeout=10, **bleak_adapter_kwargs(adapter)
+        )
 
     async def __aenter__(self) -> PartectorBleConnection:
         self.start()
@@ -92,79 +98,49 @@ class PartectorBleConnection:
     async def stop(self) -> None:
         """Stops the scanner."""
         self._stop_event.set()
+        self._wake.set()
         if self._task and not self._task.done():
             await self._task
         logger.info(f"SN{self.SERIAL_NUMBER}: PartectorBleConnection stopped")
 
     async def _run(self) -> None:
-        waiting_seconds = 0
+        waiting_seconds = 0.0
 
         try:
-            self._next_ts = int(time.time()) + 1.0
-
-            # Create decode task to run in parallel
-            # This prevents decoding from blocking the event loop
-            self._loop.create_task(self._decode_routine())
+            if self._own_decode_worker:
+                self._decode_worker.start()
 
             while not self._stop_event.is_set():
                 try:
-                    if self._last_aux_data_ts + 60 < time.time():
+                    if self._client.is_connected:
+                        # the decode worker emits the records, here we only sleep until stop(),
+                        # a disconnect or the aux timeout
+                        timeout = self._last_aux_data_ts + self.AUX_TIMEOUT - time.time()
+                        if timeout > 0:
+                            await self._wait(timeout)
+                            continue
+
                         logger.info(
-                            f"SN{self.SERIAL_NUMBER}: No aux data received for 60 seconds, disconnecting to reset."
+                            f"SN{self.SERIAL_NUMBER}: No aux data received for "
+                            f"{self.AUX_TIMEOUT:.0f} seconds, disconnecting to reset."
                         )
                         await self._disconnect_gracefully()
-                        self._last_aux_data_ts = time.time()
                         waiting_seconds = 5  # wait 5 seconds before reconnecting
 
-                    waiting_seconds = max(0, waiting_seconds - 1)
-                    wait = self._next_ts - time.time()
-                    if wait > 0:
-                        await asyncio.sleep(wait)
-                        self._next_ts += 1.0
-                    else:
-                        if self._client.is_connected:
-                            logger.info(f"SN{self.SERIAL_NUMBER}: Waiting time negative: {wait}")
-                        self._next_ts = int(time.time()) + 1.0
+                    if waiting_seconds > 0:
+                        await self._wait(waiting_seconds)
+                        waiting_seconds = 0
+                        continue
 
+                    await self._client.connect(timeout=5)  # 5 seconds for windows...
                     if self._client.is_connected:
-                        if (
-                            self._device_type == NaneosDeviceDataPoint.DEV_TYPE_P2PRO
-                            and self._data.particle_number_10nm is None
-                            and self._data.particle_number_16nm is None
-                            and self._data.particle_number_26nm is None
-                            and self._data.particle_number_43nm is None
-                            and self._data.particle_number_70nm is None
-                            and self._data.particle_number_114nm is None
-                            and self._data.particle_number_185nm is None
-                            and self._data.particle_number_300nm is None
-                        ):
-                            self._data.particle_number_concentration = None
-                            self._data.average_particle_diameter = None
-
-                        self._queue.put_nowait(self._data)
-                        self._data = NaneosDeviceDataPoint(
-                            device_type=self._device_type,
-                            serial_number=self.SERIAL_NUMBER,
-                            connection_type=NaneosDeviceDataPoint.CONN_TYPE_CONNECTED,
-                            # TODO: add firware version from device here
+                        self._last_aux_data_ts = time.time()
+                        await self._client.start_notify(self.CHAR_UUIDS["std"], self._callback_std)
+                        await self._client.start_notify(self.CHAR_UUIDS["aux"], self._callback_aux)
+                        await self._client.start_notify(
+                            self.CHAR_UUIDS["size_dist"], self._callback_size_dist
                         )
-                        continue
-
-                    if waiting_seconds == 0:
-                        await self._client.connect(timeout=5)  # 5 seconds for windows...
-                        if self._client.is_connected:
-                            await self._client.start_notify(
-                                self.CHAR_UUIDS["std"], self._callback_std
-                            )
-                            await self._client.start_notify(
-                                self.CHAR_UUIDS["aux"], self._callback_aux
-                            )
-                            await self._client.start_notify(
-                                self.CHAR_UUIDS["size_dist"], self._callback_size_dist
-                            )
-                        logger.info(f"SN{self.SERIAL_NUMBER}: Connected to {self._device.address}")
-
-                    self._next_ts = int(time.time()) + 1.0
+                    logger.info(f"SN{self.SERIAL_NUMBER}: Connected to {self._device.address}")
                 except asyncio.TimeoutError:
                     logger.info(f"SN{self.SERIAL_NUMBER}: Connection timeout.")
                     waiting_seconds = 30
@@ -182,6 +158,7 @@ class PartectorBleConnection:
                         waiting_seconds = 30
                     else:
                         logger.warning(f"SN{self.SERIAL_NUMBER}: Unknown exception: {e}")
+                        waiting_seconds = 1
 
                     await asyncio.sleep(0.5)
         except asyncio.CancelledError:
@@ -190,46 +167,18 @@ class PartectorBleConnection:
             logger.exception(f"SN{self.SERIAL_NUMBER}: _run task failed: {e}")
         finally:
             await self._disconnect_gracefully()
+            if self._own_decode_worker:
+                await self._decode_worker.stop()
 
-    async def _decode_routine(self) -> None:
-        """Asynchronously decodes BLE data from the decode queue.
-
-        This runs in parallel with the main connection loop, preventing
-        decoding from blocking the event loop when handling multiple connections.
-        """
-        while not self._stop_event.is_set():
-            try:
-                # Non-blocking check with timeout to allow graceful shutdown
-                try:
-                    char_type, data = await asyncio.wait_for(self._decode_queue.get(), timeout=0.5)
-                except asyncio.TimeoutError:
-                    continue
-
-                # Update timestamp for all decodings
-                self._data.unix_timestamp = int(time.time() * 1000)
-
-                # Decode based on characteristic type
-                if char_type == "std":
-                    self._data = PartectorBleDecoderStd.decode(data, data_structure=self._data)
-                    logger.debug(f"SN{self.SERIAL_NUMBER}: Decoded std: {data.hex()}")
-
-                elif char_type == "aux":
-                    # Check for aux error data
-                    if len(data) >= 2 and data[0] == 255 and data[1] == 255:
-                        self._data = PartectorBleDecoderAuxError.decode(
-                            data, data_structure=self._data
-                        )
-                    else:
-                        self._data = PartectorBleDecoderAux.decode(data, data_structure=self._data)
-                    logger.debug(f"SN{self.SERIAL_NUMBER}: Decoded aux: {data.hex()}")
-
-                elif char_type == "size_dist":
-                    self._device_type = NaneosDeviceDataPoint.DEV_TYPE_P2PRO
-                    self._data = PartectorBleDecoderSize.decode(data, data_structure=self._data)
-                    logger.debug(f"SN{self.SERIAL_NUMBER}: Decoded size_dist: {data.hex()}")
-
-            except Exception as e:
-                logger.warning(f"SN{self.SERIAL_NUMBER}: Error in decode routine: {e}")
+    async def _wait(self, timeout: float) -> None:
+        """Sleeps up to timeout seconds, returns early on stop() or a disconnect."""
+        self._wake.clear()
+        if self._stop_event.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
 
     async def _disconnect_gracefully(self) -> None:
         if not self._client.is_connected:
@@ -256,40 +205,20 @@ class PartectorBleConnection:
     def _disconnect_callback(self, client: BleakClient) -> None:
         """Callback on disconnect."""
         logger.debug(f"SN{self.SERIAL_NUMBER}: Disconnect callback called")
+        self._loop.call_soon_threadsafe(self._wake.set)
 
     def _callback_std(self, characteristic: BleakGATTCharacteristic, data: bytearray) -> None:
-        """Callback on data received (std characteristic).
-
-        Non-blocking: puts data in decode queue instead of decoding directly.
-        Actual decoding happens asynchronously in _decode_routine().
-        """
-        try:
-            self._decode_queue.put_nowait(("std", bytes(data)))
-        except asyncio.QueueFull:
-            logger.warning(f"SN{self.SERIAL_NUMBER}: Decode queue full, dropping std data")
+        """Callback on data received (std characteristic), decoded by the decode worker."""
+        self._decode_worker.submit(self.SERIAL_NUMBER, "std", bytes(data))
 
     def _callback_aux(self, characteristic: BleakGATTCharacteristic, data: bytearray) -> None:
-        """Callback on data received (aux characteristic).
-
-        Non-blocking: puts data in decode queue instead of decoding directly.
-        Actual decoding happens asynchronously in _decode_routine().
-        """
+        """Callback on data received (aux characteristic), decoded by the decode worker."""
         self._last_aux_data_ts = time.time()
-        try:
-            self._decode_queue.put_nowait(("aux", bytes(data)))
-        except asyncio.QueueFull:
-            logger.warning(f"SN{self.SERIAL_NUMBER}: Decode queue full, dropping aux data")
+        self._decode_worker.submit(self.SERIAL_NUMBER, "aux", bytes(data))
 
     def _callback_size_dist(self, characteristic: BleakGATTCharacteristic, data: bytearray) -> None:
-        """Callback on data received (size_dist characteristic).
-
-        Non-blocking: puts data in decode queue instead of decoding directly.
-        Actual decoding happens asynchronously in _decode_routine().
-        """
-        try:
-            self._decode_queue.put_nowait(("size_dist", bytes(data)))
-        except asyncio.QueueFull:
-            logger.warning(f"SN{self.SERIAL_NUMBER}: Decode queue full, dropping size_dist data")
+        """Callback on data received (size_dist characteristic), decoded by the decode worker."""
+        self._decode_worker.submit(self.SERIAL_NUMBER, "size_dist", bytes(data))
 
 
 async def main():
@@ -311,11 +240,17 @@ async def main():
 
     device_dict = {k: v for k, v in device_dict.items() if k in SNS}
 
-    # start connections for all devices
+    # start connections for all devices, sharing one decode worker
+    decode_worker = PartectorBleDecodeWorker(loop, queue_connection)
+    decode_worker.start()
     for serial_number, device in device_dict.items():
         conn_list.append(
             PartectorBleConnection(
-                device=device, loop=loop, serial_number=serial_number, queue=queue_connection
+                device=device,
+                loop=loop,
+                serial_number=serial_number,
+                queue=queue_connection,
+                decode_worker=decode_worker,
             )
         )
         conn_list[-1].start()
@@ -325,6 +260,8 @@ async def main():
     # stop connections for all devices
     for conn in conn_list:
         await conn.stop()
+    await decode_worker.stop()
+    print(decode_worker.get_counters())
 
     # print the data from the queue
     while not queue_connection.empty():
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Collection, Mapping, Optional
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+@dataclass
+class _Candidate:
+    first_seen: float
+    last_seen: float
+    # adapter -> (BLEDevice of the adapter, RSSI, last advertisement), None is the default adapter
+    heard: dict[Optional[str], tuple[Any, Optional[int], float]] = field(default_factory=dict)
+    adv_seconds: deque = field(default_factory=deque)  # seconds with advertisement data
+    last_good_data: float = 0.0  # last record of a connection
+    failures: int = 0
+    next_attempt: float = 0.0
+
+
+class PartectorBleConnectionScheduler:
+    """
+    Decides which advertising devices get one of the limited BLE links, and on which adapter.
+
+    BlueZ controllers handle only a few concurrent links, connecting everything at once makes
+    the connects time out and thrash. The scheduler keeps at most max_connections links per
+    adapter, starts one connection attempt per adapter at a time and ranks the waiting devices by
+    - device type: P2 Pro first (only a connection gives the size distribution), then devices of
+      unknown type (the type is only known after connecting), then P2
+    - RSSI, in buckets of RSSI_BUCKET dB, so small fluctuations do not reorder the queue
+    - time since the last good data of a connection, the longest waiting first
+    A P2 whose advertisements cover at least ADV_GOOD_RATIO of the last ADV_WINDOW seconds gets
+    the same data from the advertisements and stays on them (or is released if connected).
+    A connection that gives no data within CONNECT_TIMEOUT (new) or STALE_TIMEOUT (established)
+    seconds is released, the device then waits an exponential backoff with jitter.
+    A device is placed on the least loaded adapter that heard it within CANDIDATE_TIMEOUT
+    seconds, the stronger signal wins a tie. set_adapters() forgets what removed adapters heard.
+
+    The scheduler only decides, the manager reports the events (on_advertisement(),
+    on_connection_data(), on_connection_ended()) and asks next_connection() and to_disconnect().
+    """
+
+    MAX_CONNECTIONS = 7  # links per adapter
+    CONNECT_TIMEOUT = 20.0  # seconds until a new connection has to deliver data
+    STALE_TIMEOUT = 30.0  # seconds without data until an established connection is released
+    CANDIDATE_TIMEOUT = 30.0  # seconds without advertisement until a device is forgotten
+    ADV_WINDOW = 30.0  # seconds
+    ADV_GOOD_RATIO = 0.8
+    BACKOFF_BASE = 5.0  # seconds, doubled with every failure
+    BACKOFF_MAX = 300.0
+    BACKOFF_JITTER = 0.25  # +-25 %
+    RSSI_BUCKET = 10  # dB
+
+    def __init__(
+        self, max_connections: int = MAX_CONNECTIONS, rng: Optional[random.Random] = None
+    ) -> None:
+        self._max_connections = max_connections
+        self._rng = rng or random.Random()
+
+        self._candidates: dict[int, _Candidate] = {}
+        self._device_types: dict[int, int] = {}  # known after the first connection record
+        self._adapters: list[Optional[str]] = [None]  # None: the default adapter
+        self._attempts: dict[Optional[str], int] = {}  # adapter -> serial of the running attempt
+        self._connected_since: dict[int, float] = {}
+        self._counters = {"attempts": 0, "connected": 0, "failures": 0, "released": 0}
+
+    # == Public Methods ============================================================================
+    def set_adapters(self, adapters: Collection[Optional[str]]) -> None:
+        """Sets the usable adapters, what a removed adapter heard is forgotten."""
+        self._adapters = list(adapters)
+        for candidate in self._candidates.values():
+            for adapter in [a for a in candidate.heard if a not in self._adapters]:
+                del candidate.heard[adapter]
+        for adapter in [a for a in self._attempts if a not in self._adapters]:
+            del self._attempts[adapter]
+
+    def on_advertisement(
+        self,
+        serial: int,
+        device: Any,
+        rssi: Optional[int] = None,
+        adapter: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """Reports an advertisement with data of serial, received by adapter."""
+        now = time.time() if now is None else now
+        candidate = self._candidates.get(serial)
+        if candidate is None:
+            candidate = self._candidates[serial] = _Candidate(now, now)
+
+        candidate.last_seen = now
+        candidate.heard[adapter] = (device, rssi, now)
+
+        second = int(now)
+        if not candidate.adv_seconds or candidate.adv_seconds[-1] != second:
+            candidate.adv_seconds.append(second)
+        while candidate.adv_seconds[0] <= second - self.ADV_WINDOW:
+            candidate.adv_seconds.popleft()
+
+    def on_connection_data(
+        self, serial: int, device_type: Optional[int] = None, now: Optional[float] = None
+    ) -> None:
+        """Reports a record of the connection of serial."""
+        now = time.time() if now is None else now
+        if device_type is not None:
+            self._device_types[serial] = device_type
+
+        candidate = self._candidates.get(serial)
+        if candidate is None:
+            return
+        candidate.last_good_data = now
+        candidate.failures = 0
+
+        if self._end_attempt(serial):
+            self._counters["connected"] += 1
+            logger.info(f"SN{serial}: Connection established.")
+
+    def on_connection_ended(self, serial: int, now: Optional[float] = None) -> None:
+        """Reports the end of the connection task of serial."""
+        now = time.time() if now is None else now
+        started = self._connected_since.pop(serial, None)
+        self._end_attempt(serial)
+
+        candidate = self._candidates.get(serial)
+        if candidate is None or started is None:
+            return
+        if candidate.last_good_data < max(started, now - self.STALE_TIMEOUT):
+            self._backoff(serial, candidate, now)
+
+    def next_connection(
+        self, connected: Mapping[int, Optional[str]], now: Optional[float] = None
+    ) -> Optional[tuple[int, Any, Optional[str]]]:
+        """
+        Returns the (serial, BLEDevice, adapter) to connect next, None if no adapter that heard a
+        waiting device has a free link without a running attempt.
+
+        Args:
+            connected (Mapping[int, Optional[str]]): Serial number -> adapter of the connections.
+        """
+        now = time.time() if now is None else now
+        self._forget_old(connected, now)
+
+        for adapter, serial in list(self._attempts.items()):
+            if serial not in connected:
+                del self._attempts[adapter]  # the task was removed without on_connection_ended()
+
+        loads = {adapter: 0 for adapter in self._adapters}
+        for adapter in connected.values():
+            if adapter in loads:
+                loads[adapter] += 1
+        free = {
+            adapter
+            for adapter, load in loads.items()
+            if load < self._max_connections and adapter not in self._attempts
+        }
+        if not free:
+            return None
+
+        waiting = []
+        for serial in self._waiting(connected, now):
+            adapters = self._place(self._candidates[serial], free, loads, now)
+            if adapters:
+                waiting.append((serial, adapters[0]))
+        if not waiting:
+            return None
+
+        serial, adapter = min(waiting, key=lambda item: self._rank(item[0], now))
+        device = self._candidates[serial].heard[adapter][0]
+        self._attempts[adapter] = serial
+        self._connected_since[serial] = now
+        self._counters["attempts"] += 1
+        return serial, device, adapter
+
+    def to_disconnect(self, connected: Collection[int], now: Optional[float] = None) -> list[int]:
+        """Returns the connected serials to release: no data in time or good advertisements."""
+        now = time.time() if now is None else now
+
+        release = []
+        for serial in connected:
+            candidate = self._candidates.get(serial)
+            started = self._connected_since.setdefault(serial, now)
+            if candidate is None:
+                continue
+
+            if candidate.last_good_data < started:
+                timed_out = now - started > self.CONNECT_TIMEOUT
+            else:
+                timed_out = now - candidate.last_good_data > self.STALE_TIMEOUT
+
+            if timed_out:
+                logger.info(f"SN{serial}: No connection data, releasing the link.")
+                release.append(serial)
+            elif self._stays_on_advertisements(serial, candidate, now):
+                logger.info(f"SN{serial}: Good advertisements, releasing the link.")
+                self._connected_since.pop(serial, None)
+                release.append(serial)
+
+        self._counters["released"] += len(release)
+        return release
+
+    def get_counters(self) -> dict[str, int]:
+        """Returns the attempts, established connections, failures and released links."""
+        return dict(self._counters)
+
+    # == Helpers ===================================================================================
+    def _waiting(self, connected: Collection[int], now: float) -> list[int]:
+        return [
+            serial
+            for serial, candidate in self._candidates.items()
+            if serial not in connected
+            and candidate.next_attempt <= now
+            and not self._stays_on_advertisements(serial, candidate, now)
+        ]
+
+    def _place(
+        self, candidate: _Candidate, free: set, loads: dict, now: float
+    ) -> list[Optional[str]]:
+        """The free adapters that heard the candidate, least loaded and stronger signal first."""
+        heard = sorted(
+            (loads[adapter], -(rssi if rssi is not None else -127), str(adapter), adapter)
+            for adapter, (_, rssi, seen) in candidate.heard.items()
+            if adapter in free and now - seen <= self.CANDIDATE_TIMEOUT
+        )
+        return [item[-1] for item in heard]
+
+    def _end_attempt(self, serial: int) -> bool:
+        for adapter, attempt in list(self._attempts.items()):
+            if attempt == serial:
+                del self._attempts[adapter]
+                return True
+        return False
+
+    def _rank(self, serial: int, now: float) -> tuple:
+        candidate = self._candidates[serial]
+        device_type = self._device_types.get(serial)
+        if device_type == NaneosDeviceDataPoint.DEV_TYPE_P2PRO:
+            type_rank = 0
+        elif device_type is None:
+            type_rank = 1
+        else:
+            type_rank = 2
+
+        rssi = max(
+            (rssi for _, rssi, _ in candidate.heard.values() if rssi is not None),
+            default=-127,
+        )
+        return (type_rank, -(rssi // self.RSSI_BUCKET), -(now - candidate.last_good_data))
+
+    def _stays_on_advertisements(self, serial: int, candidate: _Candidate, now: float) -> bool:
+        """Known P2 devices with enough advertisements over a full window."""
+        if self._device_types.get(serial) != NaneosDeviceDataPoint.DEV_TYPE_P2:
+            return False
+        if now - candidate.first_seen < self.ADV_WINDOW:
+            return False
+
+        seconds = sum(1 for s in candidate.adv_seconds if s > now - self.ADV_WINDOW)
+        return seconds >= self.ADV_GOOD_RATIO * self.ADV_WINDOW
+
+    def _backoff(self, serial: int, candidate: _Candidate, now: float) -> None:
+        candidate.failures += 1
+        self._counters["failures"] += 1
+
+        delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (candidate.failures - 1))
+        delay *= self._rng.uniform(1 - self.BACKOFF_JITTER, 1 + self.BACKOFF_JITTER)
+        candidate.next_attempt = now + delay
+        logger.info(f"SN{serial}: Connection failed {candidate.failures}x, retry in {delay:.0f} s.")
+
+    def _forget_old(self, connected: Collection[int], now: float) -> None:
+        """Forgets devices that stopped advertising, unless they are connected or backing off."""
+        old = [
+            serial
+            for serial, candidate in self._candidates.items()
+            if serial not in connected
+            and now - candidate.last_seen > self.CANDIDATE_TIMEOUT
+            and candidate.next_attempt <= now
+        ]
+        for serial in old:
+            del self._candidates[serial]
@@ -36,7 +36,15 @@ class PartectorBleDecoder:
         Decode the standard characteristic data from the Partector device.
         """
 
-        adv_bytes = PartectorBleDecoder._get_adv_bytes(adv)
+        return cls.decode_partector_adv_bytes(PartectorBleDecoder._get_adv_bytes(adv))
+
+    @classmethod
+    def decode_partector_adv_bytes(
+        cls, adv_bytes: bytes
+    ) -> Optional[tuple[bytes, Optional[bytes]]]:
+        """
+        Same as decode_partector_advertisement, for the bytes returned by _get_adv_bytes.
+        """
         if not cls._check_data_format(adv_bytes):
             return None
 
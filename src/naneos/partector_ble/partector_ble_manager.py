@@ -1,17 +1,25 @@
 import asyncio
-import sys
 import threading
 import time
+from collections import deque
+from typing import Optional
 
 import pandas as pd
-from bleak import BleakScanner
 from bleak.backends.device import BLEDevice
 
 from naneos.logger import LEVEL_WARNING, get_naneos_logger
+from naneos.partector.blueprints._data_buffer import NaneosDeviceDataBuffer
 from naneos.partector.blueprints._data_structure import (
     NaneosDeviceDataPoint,
 )
+from naneos.partector_ble.partector_ble_adapter_monitor import (
+    PartectorBleAdapterMonitor,
+)
 from naneos.partector_ble.partector_ble_connection import PartectorBleConnection
+from naneos.partector_ble.partector_ble_connection_scheduler import (
+    PartectorBleConnectionScheduler,
+)
+from naneos.partector_ble.partector_ble_decode_worker import PartectorBleDecodeWorker
 from naneos.partector_ble.partector_ble_scanner import PartectorBleScanner
 
 pd.set_option("future.no_silent_downcasting", True)
@@ -20,22 +28,36 @@ logger = get_naneos_logger(__name__, LEVEL_WARNING)
 
 
 class PartectorBleManager(threading.Thread):
-    def __init__(self) -> None:
+    ADV_DEDUP_KEYS = 4096  # recent (serial_number, unix_timestamp) keys, minutes of ~50 devices
+
+    def __init__(
+        self, max_connections: int = PartectorBleConnectionScheduler.MAX_CONNECTIONS
+    ) -> None:
         super().__init__(daemon=True)
         self._stop_event = threading.Event()
         self._task_stop_event = asyncio.Event()
 
-        self._queue_scanner = PartectorBleScanner.create_scanner_queue()
         self._queue_connection = PartectorBleConnection.create_connection_queue()
         self._connections: dict[int, tuple[asyncio.Task, int]] = {}  # key: serial_number
+        self._connection_adapters: dict[int, Optional[str]] = {}  # serial_number -> adapter
+        # decides which advertising devices get one of the limited links, on which adapter
+        self._scheduler = PartectorBleConnectionScheduler(max_connections=max_connections)
 
-        self._data: dict[int, pd.DataFrame] = {}
+        # one scanner with its own queue per adapter (None: default adapter), the advertisements
+        # are merged and de-duplicated in _scanner_queue_routine()
+        self._scanners: dict[Optional[str], tuple[PartectorBleScanner, asyncio.Queue]] = {}
+        # (serial_number, unix_timestamp) of the recently accepted advertisements, oldest first
+        self._adv_keys: set[tuple[int, int]] = set()
+        self._adv_keys_order: deque[tuple[int, int]] = deque()
+
+        self._data: dict[int, NaneosDeviceDataBuffer] = {}
+        self._adapter_monitor = PartectorBleAdapterMonitor(on_change=self._on_adapter_state_changed)
 
     def get_data(self) -> dict[int, pd.DataFrame]:
         """Returns the data dictionary and deletes it."""
         data = self._data
         self._data = {}
-        return data
+        return NaneosDeviceDataBuffer.to_dataframe_dict(data)
 
     def stop(self) -> None:
         self._task_stop_event.set()
@@ -68,100 +90,43 @@ class PartectorBleManager(threading.Thread):
         """Returns a list of connected serial numbers."""
         return list(self._connections.keys())
 
-    async def _bleak_is_bluetooth_adapter_available(self) -> bool:
-        """Check if the Bluetooth adapter is available and powered on."""
-        try:
-            # Try to get adapter info - this will fail if adapter is not available
-            scanner = BleakScanner()
-            # Test if we can discover devices briefly
-            await scanner.start()
-            await scanner.stop()
-            return True
-        except Exception as e:
-            logger.debug(f"Bluetooth adapter not available: {e}")
-            return False
-
-    async def _linux_is_bluetooth_adapter_available(self) -> bool:
-        """
-        Nutzt BlueZ (bluetoothctl show), um zu prüfen, ob
-        - ein Bluetooth-Controller existiert und
-        - er eingeschaltet ("Powered: yes") ist.
-        """
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                "bluetoothctl",
-                "show",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await proc.communicate()
-
-            if proc.returncode != 0:
-                logger.debug(
-                    "bluetoothctl show failed with code %s: %s",
-                    proc.returncode,
-                    stderr.decode(errors="ignore").strip(),
-                )
-                return False
-
-            output = stdout.decode(errors="ignore")
-
-            if "No default controller available" in output:
-                logger.debug("No default Bluetooth controller available (BlueZ).")
-                return False
-
-            powered = None
-            for line in output.splitlines():
-                line = line.strip()
-                if line.lower().startswith("powered:"):
-                    powered = "yes" in line.lower()
-                    break
-
-            if powered is not None:
-                return powered
-
-            logger.debug("Bluetooth controller found but no 'Powered' field in output.")
-            return False
-
-        except FileNotFoundError:
-            logger.debug("bluetoothctl not found on system.")
-            return False
-
-        except Exception as e:
-            logger.debug(f"Error while checking Bluetooth adapter via bluetoothctl: {e}")
-            return False
-
-    async def _is_bluetooth_adapter_available(self) -> bool:
-        if sys.platform.startswith("linux"):
-            return await self._linux_is_bluetooth_adapter_available()
-        else:
-            return await self._bleak_is_bluetooth_adapter_available()
-
     async def _wait_for_bluetooth_adapter(self) -> None:
         """Wait for the Bluetooth adapter to become available."""
-        adapter_check_interval = 3.0  # seconds
+        adapter_check_interval = 3.0  # seconds, only to notice stop()
 
         while not self._stop_event.is_set():
-            if await self._is_bluetooth_adapter_available():
+            if await self._adapter_monitor.wait_available(timeout=adapter_check_interval):
                 logger.info("Bluetooth adapter is available and ready.")
                 return
 
-            logger.info(
-                f"Bluetooth adapter not available. Retrying in {adapter_check_interval} seconds..."
-            )
-            await asyncio.sleep(adapter_check_interval)
+            logger.info("Bluetooth adapter not available. Waiting...")
+
+    def _on_adapter_state_changed(self, available: bool) -> None:
+        """Called by the adapter monitor, the connections of a lost adapter are torn down."""
+        if available:
+            logger.info("Bluetooth adapter is back, restarting scanner and connections.")
+        else:
+            logger.warning("Bluetooth adapter lost. Stopping all connections...")
+            self._task_stop_event.set()
 
     async def _async_run(self):
         self._loop = asyncio.get_event_loop()
+        # one decode stage for the notifications of all connections
+        self._decode_worker = PartectorBleDecodeWorker(self._loop, self._queue_connection)
+        async with self._adapter_monitor, self._decode_worker:
+            await self._run_while_adapter_available()
+
+    async def _run_while_adapter_available(self) -> None:
         while not self._stop_event.is_set():
             try:
                 # Wait for Bluetooth adapter to become available
                 await self._wait_for_bluetooth_adapter()
                 self._task_stop_event.clear()
 
-                async with PartectorBleScanner(loop=self._loop, queue=self._queue_scanner):
-                    logger.info("Scanner started.")
+                try:
                     await self._manager_loop()
+                finally:
+                    await self._stop_scanners()
                 await self._kill_all_connections()  # just to be safe
             except asyncio.CancelledError:
                 logger.info("BLEManager cancelled.")
@@ -171,17 +136,18 @@ class PartectorBleManager(threading.Thread):
     async def _manager_loop(self) -> None:
         while not self._stop_event.is_set():
             try:
-                if not await self._is_bluetooth_adapter_available():
-                    logger.warning("Bluetooth adapter lost. Stopping all connections...")
+                if not self._adapter_monitor.available:  # cached, no probe per iteration
                     await self._kill_all_connections()
                     return
 
+                await self._sync_adapters()
                 await asyncio.sleep(0.3)
 
                 await self._scanner_queue_routine()
                 await self._connection_queue_routine()
                 await self._check_device_types()
                 await self._remove_done_tasks()
+                await self._schedule_connections()
 
             except asyncio.TimeoutError:
                 continue
@@ -197,7 +163,7 @@ class PartectorBleManager(threading.Thread):
             if not self._connections[serial][0].done():
                 logger.info(f"Cancelling connection task {serial}.")
                 self._connections[serial][0].cancel()
-            self._connections.pop(serial, None)
+            self._pop_connection(serial)
             logger.info(f"{serial}: Connection task cancelled and popped.")
 
     async def _finish_all_connections_blocking(self) -> None:
@@ -207,7 +173,7 @@ class PartectorBleManager(threading.Thread):
             if not self._connections[serial][0].done():
                 await asyncio.sleep(1)
             else:
-                self._connections.pop(serial, None)
+                self._pop_connection(serial)
 
     async def _finish_all_connections(self) -> None:
         self._task_stop_event.set()
@@ -227,16 +193,58 @@ class PartectorBleManager(threading.Thread):
                 # logger.info(f"Waiting for connection task {serial} to finish.")
                 # await self._connections[serial]
 
-            self._connections.pop(serial, None)
+            self._pop_connection(serial)
             logger.info(f"{serial}: Connection task finished and popped.")
 
-    async def _task_connection(self, device: BLEDevice, serial: int) -> None:
+    def _pop_connection(self, serial: int) -> None:
+        self._connections.pop(serial, None)
+        self._connection_adapters.pop(serial, None)
+
+    async def _sync_adapters(self) -> None:
+        """Runs one scanner per usable adapter, the connections of a lost adapter are moved."""
+        adapters = self._adapter_monitor.get_adapter_names()
+        if set(adapters) == set(self._scanners):
+            return
+        self._scheduler.set_adapters(adapters)
+
+        for adapter in [a for a in self._scanners if a not in adapters]:
+            logger.warning(f"Bluetooth adapter {adapter} lost, moving its connections.")
+            scanner, _ = self._scanners.pop(adapter)
+            await scanner.stop()
+
+            # the scheduler places the devices again on the adapters that can hear them
+            for serial in [s for s, a in self._connection_adapters.items() if a == adapter]:
+                task = self._connections[serial][0]
+                if not task.done():
+                    task.cancel()
+                self._pop_connection(serial)
+                self._scheduler.on_connection_ended(serial)
+
+        for adapter in [a for a in adapters if a not in self._scanners]:
+            queue = PartectorBleScanner.create_scanner_queue()
+            scanner = PartectorBleScanner(loop=self._loop, queue=queue, adapter=adapter)
+            scanner.start()
+            self._scanners[adapter] = (scanner, queue)
+            logger.info(f"Scanner started on adapter {adapter or 'default'}.")
+
+    async def _stop_scanners(self) -> None:
+        scanners, self._scanners = self._scanners, {}
+        for scanner, _ in scanners.values():
+            await scanner.stop()
+
+    async def _task_connection(
+        self, device: BLEDevice, serial: int, adapter: Optional[str] = None
+    ) -> None:
         try:
             async with PartectorBleConnection(
-                device=device, loop=self._loop, serial_number=serial, queue=self._queue_connection
+                device=device,
+                loop=self._loop,
+                serial_number=serial,
+                queue=self._queue_connection,
+                decode_worker=self._decode_worker,
+                adapter=adapter,
             ):
-                while not self._task_stop_event.is_set():
-                    await asyncio.sleep(0.5)
+                await self._task_stop_event.wait()
 
         except asyncio.CancelledError:
             logger.info(f"{serial}: Connection task cancelled.")
@@ -246,45 +254,81 @@ class PartectorBleManager(threading.Thread):
             logger.info(f"{serial}: Connection task finished.")
 
     async def _scanner_queue_routine(self) -> None:
-        """Process scanner queue with batch collection to reduce DataFrame operations.
+        """Process the scanner queues of all adapters with batch collection.
 
-        Instead of calling add_data_point_to_dict for each item (expensive),
-        collect all items first, then add them in bulk.
+        All available items are collected first and then appended to the per-device buffers.
+        An advertisement second heard by several adapters is only added once, the first adapter
+        reporting it wins. The adapters are drained one after the other, so an adapter can report
+        an older second than the others, the merged batch is sorted by timestamp.
         """
-        to_check: dict[int, BLEDevice] = {}
         batch_data: list[NaneosDeviceDataPoint] = []
 
-        # Collect all available items from queue (non-blocking batch)
-        while not self._queue_scanner.empty():
-            try:
-                device, decoded = self._queue_scanner.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        for adapter, (scanner, queue) in self._scanners.items():
+            to_check: dict[int, BLEDevice] = {}
 
-            if not decoded.serial_number:
-                continue
+            # Collect all available items from queue (non-blocking batch)
+            while not queue.empty():
+                try:
+                    device, decoded = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+
+                serial = decoded.serial_number
+                if not serial:
+                    continue
 
-            batch_data.append(decoded)
-            to_check[decoded.serial_number] = device
+                to_check[serial] = device
+                if self._is_duplicate_advertisement(serial, decoded.unix_timestamp or 0):
+                    continue  # already heard by another adapter
+                batch_data.append(decoded)
 
-        # Add all data points at once (more efficient than individual additions)
-        for decoded in batch_data:
-            self._data = NaneosDeviceDataPoint.add_data_point_to_dict(self._data, decoded)
+            # connections are started by _schedule_connections()
+            for serial, device in to_check.items():
+                rssi = scanner.get_rssi(device.address)
+                self._scheduler.on_advertisement(serial, device, rssi, adapter)
 
-        # check for new devices
-        for serial, device in to_check.items():
-            if serial in self._connections:
-                continue  # already connected
+        # Append all data points to the columnar per-device buffers in one go
+        batch_data.sort(key=lambda point: point.unix_timestamp or 0)
+        self._data = NaneosDeviceDataBuffer.add_data_points_to_dict(self._data, batch_data)
+
+    def _is_duplicate_advertisement(self, serial: int, timestamp: int) -> bool:
+        """Remembers the advertisement key, True if it was accepted before."""
+        key = (serial, timestamp)
+        if key in self._adv_keys:
+            return True
 
-            logger.info(f"New device detected: serial={serial}, address={device.address}")
-            task = self._loop.create_task(self._task_connection(device, serial))
-            self._connections[serial] = (task, NaneosDeviceDataPoint.DEV_TYPE_P2)
+        self._adv_keys.add(key)
+        self._adv_keys_order.append(key)
+        if len(self._adv_keys_order) > self.ADV_DEDUP_KEYS:
+            self._adv_keys.discard(self._adv_keys_order.popleft())
+        return False
+
+    async def _schedule_connections(self) -> None:
+        """Releases the links the scheduler gives up and starts at most one new connection."""
+        for serial in self._scheduler.to_disconnect(self._connection_adapters):
+            task = self._connections[serial][0]
+            if not task.done():
+                task.cancel()
+            self._pop_connection(serial)
+            self._scheduler.on_connection_ended(serial)
+            logger.info(f"{serial}: Connection released by the scheduler.")
+
+        candidate = self._scheduler.next_connection(self._connection_adapters)
+        if candidate is None:
+            return
+
+        serial, device, adapter = candidate
+        logger.info(
+            f"Connecting device: serial={serial}, address={device.address}, adapter={adapter}"
+        )
+        task = self._loop.create_task(self._task_connection(device, serial, adapter))
+        self._connections[serial] = (task, NaneosDeviceDataPoint.DEV_TYPE_P2)
+        self._connection_adapters[serial] = adapter
 
     async def _connection_queue_routine(self) -> None:
-        """Process connection queue with batch collection to reduce DataFrame operations.
+        """Process connection queue with batch collection.
 
-        Instead of calling add_data_point_to_dict for each item (expensive),
-        collect all items first, then add them in bulk.
+        All available items are collected first and then appended to the per-device buffers.
         """
         batch_data: list[NaneosDeviceDataPoint] = []
 
@@ -296,10 +340,11 @@ class PartectorBleManager(threading.Thread):
                 break
 
             batch_data.append(data)
+            if data.serial_number is not None:
+                self._scheduler.on_connection_data(data.serial_number, data.device_type)
 
-        # Add all data points at once (more efficient than individual additions)
-        for data in batch_data:
-            self._data = NaneosDeviceDataPoint.add_data_point_to_dict(self._data, data)
+        # Append all data points to the columnar per-device buffers in one go
+        self._data = NaneosDeviceDataBuffer.add_data_points_to_dict(self._data, batch_data)
 
     async def _check_device_types(self) -> None:
         for serial in self._data.keys():
@@ -307,12 +352,11 @@ class PartectorBleManager(threading.Thread):
                 continue
 
             current_type = self._connections[serial][1]
-            data_points = self._data[serial]
 
             # get last value of device_type column
-            if data_points.empty:
+            last_device_type = self._data[serial].get_last("device_type")
+            if last_device_type is None:
                 continue
-            last_device_type = data_points["device_type"].iloc[-1]
             if last_device_type != current_type:
                 self._connections[serial] = (
                     self._connections[serial][0],
@@ -323,7 +367,8 @@ class PartectorBleManager(threading.Thread):
         """Remove completed tasks from the connections dictionary."""
         for serial in list(self._connections.keys()):
             if self._connections[serial][0].done():
-                self._connections.pop(serial, None)
+                self._pop_connection(serial)
+                self._scheduler.on_connection_ended(serial)
                 logger.info(f"{serial}: Connection task finished and popped.")
 
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import time
+from dataclasses import replace
 
 from bleak import BleakScanner
 from bleak.backends.device import BLEDevice
@@ -11,6 +12,7 @@ from naneos.logger import LEVEL_WARNING, get_naneos_logger
 from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
 from naneos.partector_ble.decoder.partector_ble_decoder_aux import PartectorBleDecoderAux
 from naneos.partector_ble.decoder.partector_ble_decoder_std import PartectorBleDecoderStd
+from naneos.partector_ble.partector_ble_adapter_monitor import bleak_adapter_kwargs
 from naneos.partector_ble.partector_ble_decoder import PartectorBleDecoder
 
 logger = get_naneos_logger(__name__, LEVEL_WARNING)
@@ -24,6 +26,12 @@ class PartectorBleScanner:
     from BLE devices named "P2" or "PartectorBT". Decoded advertisement payloads are
     pushed into an asyncio.Queue for further processing. Can be used with `async with`
     for automatic startup and cleanup.
+
+    BlueZ reports the same advertisement several times per second. At most one advertisement per
+    device and second (the resolution of unix_timestamp) is emitted, the others are counted as
+    duplicate (same raw payload as before) or coalesced (new payload) and dropped before
+    decoding. A repeated payload in a new second reuses the cached decoded data.
+    get_counters() returns the received, duplicate, coalesced, emitted and dropped counts.
     """
 
     SCAN_INTERVAL = 0.8  # seconds
@@ -46,6 +54,7 @@ class PartectorBleScanner:
         self,
         loop: asyncio.AbstractEventLoop,
         queue: asyncio.Queue[tuple[BLEDevice, NaneosDeviceDataPoint]],
+        adapter: str | None = None,
     ) -> None:
         """
         Initializes the scanner with the given event loop and queue.
@@ -53,12 +62,22 @@ class PartectorBleScanner:
         Args:
             loop (asyncio.AbstractEventLoop): The event loop to run the scanner in.
             queue (asyncio.Queue): The queue to store the scanned data.
+            adapter (str, optional): BlueZ adapter to scan with (e.g. "hci1"), default adapter
+                if None.
         """
         self._loop = loop
         self._queue = queue
+        self.ADAPTER = adapter
 
         self._task: asyncio.Task | None = None
 
+        # per BLE address: last raw manufacturer payload with its decoded data and the second of
+        # the last emitted advertisement
+        self._last_adv: dict[str, tuple[bytes, NaneosDeviceDataPoint]] = {}
+        self._last_emitted_second: dict[str, int] = {}
+        self._counters = {"received": 0, "duplicate": 0, "coalesced": 0, "emitted": 0, "dropped": 0}
+        self._rssi: dict[str, int] = {}  # per BLE address: RSSI of the last advertisement
+
         self._stop_event = asyncio.Event()
         self._stop_event.set()  # stopped by default
 
@@ -80,6 +99,14 @@ class PartectorBleScanner:
         self._stop_event.clear()
         self._task = self._loop.create_task(self.scan())
 
+    def get_counters(self) -> dict[str, int]:
+        """Returns the advertisement counters since the scanner was created."""
+        return dict(self._counters)
+
+    def get_rssi(self, address: str) -> int | None:
+        """Returns the RSSI of the last advertisement of address, None if never seen."""
+        return self._rssi.get(address)
+
     async def stop(self) -> None:
         """Stops the scanner."""
         logger.debug("Stopping PartectorBleScanner...")
@@ -100,17 +127,39 @@ class PartectorBleScanner:
         if not device.name or device.name not in self.BLE_NAMES_NANEOS:
             return
 
-        adv_data = PartectorBleDecoder.decode_partector_advertisement(adv)
-        if not adv_data:
+        self._counters["received"] += 1
+        self._rssi[device.address] = adv.rssi
+        if not adv.manufacturer_data:
             return
 
-        decoded = PartectorBleDecoderStd.decode(adv_data[0], data_structure=None)
-        if not decoded.serial_number:
+        second = int(time.time())
+        adv_bytes = PartectorBleDecoder._get_adv_bytes(adv)
+        last = self._last_adv.get(device.address)
+        duplicate = last is not None and last[0] == adv_bytes
+
+        if self._last_emitted_second.get(device.address) == second:
+            self._counters["duplicate" if duplicate else "coalesced"] += 1
             return
-        if adv_data[1]:
-            decoded = PartectorBleDecoderAux.decode(adv_data[1], data_structure=decoded)
-        decoded.unix_timestamp = int(time.time()) * 1000
-        decoded.connection_type = NaneosDeviceDataPoint.CONN_TYPE_ADVERTISEMENT
+
+        if duplicate:
+            # same payload in a new second: reuse the decoded data instead of decoding again
+            self._counters["duplicate"] += 1
+            decoded = replace(last[1], unix_timestamp=second * 1000)  # type: ignore[index]
+        else:
+            adv_data = PartectorBleDecoder.decode_partector_adv_bytes(adv_bytes)
+            if not adv_data:
+                return
+
+            decoded = PartectorBleDecoderStd.decode(adv_data[0], data_structure=None)
+            if not decoded.serial_number:
+                return
+            if adv_data[1]:
+                decoded = PartectorBleDecoderAux.decode(adv_data[1], data_structure=decoded)
+            decoded.unix_timestamp = second * 1000
+            decoded.connection_type = NaneosDeviceDataPoint.CONN_TYPE_ADVERTISEMENT
+            self._last_adv[device.address] = (adv_bytes, decoded)
+
+        self._last_emitted_second[device.address] = second
 
         # Non-blocking put with overflow handling: drop oldest item if queue is full
         # This prevents callbacks from being delayed by queue operations
@@ -118,16 +167,19 @@ class PartectorBleScanner:
             if self._queue.full():
                 try:
                     self._queue.get_nowait()  # Remove oldest item
+                    self._counters["dropped"] += 1
                 except asyncio.QueueEmpty:
                     pass
             self._queue.put_nowait((device, decoded))
+            self._counters["emitted"] += 1
         except asyncio.QueueFull:
+            self._counters["dropped"] += 1
             logger.debug(f"Scanner queue full, dropping advertisement from {device.address}")
 
     async def scan(self) -> None:
         """Scans for BLE devices and calls the _detection_callback method for each device found."""
 
-        scanner = BleakScanner(self._detection_callback)
+        scanner = BleakScanner(self._detection_callback, **bleak_adapter_kwargs(self.ADAPTER))
 
         while not self._stop_event.is_set():
             try:
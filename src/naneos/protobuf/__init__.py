@@ -1,3 +1,23 @@
-from naneos.protobuf.protobuf import create_combined_entry, create_proto_device
+from naneos.protobuf.columnar import (
+    create_columnar_device,
+    create_columnar_entry,
+    create_data_from_columnar_entry,
+    create_dataframe_from_columnar_device,
+)
+from naneos.protobuf.protobuf import (
+    create_combined_entry,
+    create_data_from_combined_entry,
+    create_dataframe_from_proto_device,
+    create_proto_device,
+)
 
-__all__ = ["create_combined_entry", "create_proto_device"]
+__all__ = [
+    "create_combined_entry",
+    "create_proto_device",
+    "create_dataframe_from_proto_device",
+    "create_data_from_combined_entry",
+    "create_columnar_entry",
+    "create_columnar_device",
+    "create_dataframe_from_columnar_device",
+    "create_data_from_columnar_entry",
+]
@@ -0,0 +1,170 @@
+"""
+Columnar alternative to the DevicePoint messages of CombinedData.
+
+A DeviceSeries holds the same fixed point integers as the DevicePoints of create_proto_device(),
+but stored per DevicePoint field instead of per point. Every column is delta encoded against the
+previous present value and sent as packed zigzag varints (sint64), so static values like
+firmware_version cost one byte per point and slowly changing values like temperature stay small.
+Missing values are marked in a presence bitmap, which is left empty if every point has a value.
+"""
+
+import numpy as np
+import pandas as pd
+
+import naneos.protobuf.protoColumnarV1_pb2 as pbColumnar
+from naneos.partector.blueprints._data_structure import add_to_existing_naneos_data
+from naneos.protobuf.protobuf import (
+    _DEVICE_POINT_FIELDS,
+    _device_type,
+    _prepare_device_columns,
+    _to_pandas_array,
+)
+from naneos.protobuf.protoV1_pb2 import DevicePoint
+
+# DevicePoint field name <-> field number, the columns are identified by the number
+_FIELD_NUMBERS: dict[str, int] = {
+    field.name: field.number for field in DevicePoint.DESCRIPTOR.fields
+}
+_COLUMNS_BY_NUMBER: dict[int, tuple[str, float]] = {
+    _FIELD_NUMBERS[field]: (column, scale) for column, field, scale, _, _ in _DEVICE_POINT_FIELDS
+}
+
+
+def create_columnar_entry(
+    devices: list[pbColumnar.DeviceSeries], abs_timestamp: int
+) -> pbColumnar.ColumnarData:
+    columnar = pbColumnar.ColumnarData()
+    columnar.abs_timestamp = abs_timestamp
+
+    columnar.devices.extend(devices)
+
+    return columnar
+
+
+def create_columnar_device(sn: int, abs_time: int, df: pd.DataFrame) -> pbColumnar.DeviceSeries:
+    """
+    Encodes df like create_proto_device(), with the same scaling, rounding and dropped rows,
+    but as delta encoded columns.
+    """
+    device = pbColumnar.DeviceSeries()
+    device.type = _device_type(df)
+    device.serial_number = sn
+
+    timestamps, rows, columns = _prepare_device_columns(df, abs_time)
+    device.timestamps.extend(_deltas(timestamps[rows]))
+
+    for field, values, present in columns:
+        present = present[rows]
+        if not present.any():
+            continue
+
+        column = device.columns.add(field_number=_FIELD_NUMBERS[field])
+        if not present.all():
+            column.presence = np.packbits(present, bitorder="little").tobytes()
+        column.values.extend(_deltas(values[rows][present]))
+
+    return device
+
+
+def create_dataframe_from_columnar_device(
+    device: pbColumnar.DeviceSeries, abs_time: int
+) -> pd.DataFrame:
+    """
+    Decodes device into a DataFrame with the columns and dtypes of the metric schema, indexed
+    by unix_timestamp. Same result as create_dataframe_from_proto_device() for the DevicePoints
+    of the same data.
+    """
+    timestamps = np.cumsum(np.array(device.timestamps, dtype=np.int64))
+    n = len(timestamps)
+
+    index = pd.Index(
+        _to_pandas_array(abs_time - timestamps, None, "unix_timestamp"), name="unix_timestamp"
+    )
+    columns = {
+        "serial_number": _to_pandas_array(np.full(n, device.serial_number), None, "serial_number"),
+        "device_type": _to_pandas_array(np.full(n, device.type), None, "device_type"),
+    }
+
+    decoded: dict[str, np.ndarray] = {}
+    masks: dict[str, np.ndarray] = {}
+    for column in device.columns:
+        if column.field_number not in _COLUMNS_BY_NUMBER:
+            continue  # field of a newer schema
+        name, scale = _COLUMNS_BY_NUMBER[column.field_number]
+
+        if column.presence:
+            bits = np.frombuffer(column.presence, dtype=np.uint8)
+            present = np.unpackbits(bits, count=n, bitorder="little").astype(bool)
+        else:
+            present = np.ones(n, dtype=bool)
+
+        values = np.zeros(n, dtype=np.float64)
+        values[present] = np.cumsum(np.array(column.values, dtype=np.int64))
+        decoded[name] = values / scale
+        masks[name] = ~present
+
+    # same column order as create_dataframe_from_proto_device()
+    for name, _, _, _, _ in _DEVICE_POINT_FIELDS:
+        if name in decoded:
+            columns[name] = _to_pandas_array(decoded[name], masks[name], name)
+
+    return pd.DataFrame(columns, index=index)
+
+
+def create_data_from_columnar_entry(
+    columnar: pbColumnar.ColumnarData,
+) -> dict[int, pd.DataFrame]:
+    """Decodes all devices of columnar, see create_dataframe_from_columnar_device()."""
+    data: dict[int, pd.DataFrame] = {}
+    for device in columnar.devices:
+        df = create_dataframe_from_columnar_device(device, columnar.abs_timestamp)
+        data = add_to_existing_naneos_data(data, {device.serial_number: df})
+    return data
+
+
+def _deltas(values: np.ndarray) -> list[int]:
+    return np.diff(values, prepend=0).tolist()
+
+
+if __name__ == "__main__":
+    import gzip
+    import sys
+    import timeit
+    from pathlib import Path
+
+    from naneos.protobuf.protobuf import create_combined_entry, create_proto_device
+
+    # compares the payload of recorded data: python -m naneos.protobuf.columnar [pickles...]
+    paths = [Path(p) for p in sys.argv[1:]] or [Path("partector_data.pkl")]
+
+    for path in paths:
+        data = pd.read_pickle(path)
+        if isinstance(data, pd.DataFrame):
+            data = {0: data}
+
+        frames = {}
+        for sn, df in data.items():
+            df = df.select_dtypes(exclude="object")
+            if df.index[0] > 1e12:  # ms, like NaneosUploadThread
+                df.index = (df.index / 1e3).astype(int)
+            frames[int(sn)] = df
+        abs_time = max(int(df.index.max()) for df in frames.values())
+        points = sum(len(df) for df in frames.values())
+
+        def encode_points() -> bytes:
+            devices = [create_proto_device(sn, abs_time, df) for sn, df in frames.items()]
+            return create_combined_entry(devices, abs_time).SerializeToString()
+
+        def encode_columnar() -> bytes:
+            devices = [create_columnar_device(sn, abs_time, df) for sn, df in frames.items()]
+            return create_columnar_entry(devices, abs_time).SerializeToString()
+
+        print(f"{path}: {len(frames)} devices, {points} points")
+        for name, encode in (("DevicePoint", encode_points), ("columnar", encode_columnar)):
+            payload = encode()
+            runs = 20
+            ms = timeit.timeit(encode, number=runs) / runs * 1e3
+            print(
+                f"  {name:<12} {len(payload):>8} B  {len(gzip.compress(payload)):>8} B gzip"
+                f"  {ms:8.2f} ms"
+            )
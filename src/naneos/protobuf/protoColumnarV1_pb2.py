@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: protoColumnarV1.proto
+# Protobuf Python Version: 6.32.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    32,
+    1,
+    '',
+    'protoColumnarV1.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15protoColumnarV1.proto\"E\n\x0c\x43olumnarData\x12\x15\n\rabs_timestamp\x18\x01 \x01(\r\x12\x1e\n\x07\x64\x65vices\x18\x02 \x03(\x0b\x32\r.DeviceSeries\"a\n\x0c\x44\x65viceSeries\x12\x0c\n\x04type\x18\x01 \x01(\r\x12\x15\n\rserial_number\x18\x02 \x01(\r\x12\x12\n\ntimestamps\x18\x03 \x03(\x12\x12\x18\n\x07\x63olumns\x18\x04 \x03(\x0b\x32\x07.Column\"@\n\x06\x43olumn\x12\x14\n\x0c\x66ield_number\x18\x01 \x01(\r\x12\x10\n\x08presence\x18\x02 \x01(\x0c\x12\x0e\n\x06values\x18\x03 \x03(\x12\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protoColumnarV1_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_COLUMNARDATA']._serialized_start=25
+  _globals['_COLUMNARDATA']._serialized_end=94
+  _globals['_DEVICESERIES']._serialized_start=96
+  _globals['_DEVICESERIES']._serialized_end=193
+  _globals['_COLUMN']._serialized_start=195
+  _globals['_COLUMN']._serialized_end=259
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,37 @@
+from google.protobuf.internal import containers as _containers
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from collections.abc import Iterable as _Iterable, Mapping as _Mapping
+from typing import ClassVar as _ClassVar, Optional as _Optional, Union as _Union
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class ColumnarData(_message.Message):
+    __slots__ = ("abs_timestamp", "devices")
+    ABS_TIMESTAMP_FIELD_NUMBER: _ClassVar[int]
+    DEVICES_FIELD_NUMBER: _ClassVar[int]
+    abs_timestamp: int
+    devices: _containers.RepeatedCompositeFieldContainer[DeviceSeries]
+    def __init__(self, abs_timestamp: _Optional[int] = ..., devices: _Optional[_Iterable[_Union[DeviceSeries, _Mapping]]] = ...) -> None: ...
+
+class DeviceSeries(_message.Message):
+    __slots__ = ("type", "serial_number", "timestamps", "columns")
+    TYPE_FIELD_NUMBER: _ClassVar[int]
+    SERIAL_NUMBER_FIELD_NUMBER: _ClassVar[int]
+    TIMESTAMPS_FIELD_NUMBER: _ClassVar[int]
+    COLUMNS_FIELD_NUMBER: _ClassVar[int]
+    type: int
+    serial_number: int
+    timestamps: _containers.RepeatedScalarFieldContainer[int]
+    columns: _containers.RepeatedCompositeFieldContainer[Column]
+    def __init__(self, type: _Optional[int] = ..., serial_number: _Optional[int] = ..., timestamps: _Optional[_Iterable[int]] = ..., columns: _Optional[_Iterable[_Union[Column, _Mapping]]] = ...) -> None: ...
+
+class Column(_message.Message):
+    __slots__ = ("field_number", "presence", "values")
+    FIELD_NUMBER_FIELD_NUMBER: _ClassVar[int]
+    PRESENCE_FIELD_NUMBER: _ClassVar[int]
+    VALUES_FIELD_NUMBER: _ClassVar[int]
+    field_number: int
+    presence: bytes
+    values: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, field_number: _Optional[int] = ..., presence: _Optional[bytes] = ..., values: _Optional[_Iterable[int]] = ...) -> None: ...
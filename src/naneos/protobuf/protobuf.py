@@ -1,9 +1,20 @@
-from typing import Optional
+from typing import Any, Optional
 
+import numpy as np
 import pandas as pd
+from google.protobuf.descriptor import FieldDescriptor
+from pandas.api.types import is_integer_dtype
 
 import naneos.protobuf.protoV1_pb2 as pbScheme
-from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+from naneos.partector.blueprints._data_structure import (
+    NaneosDeviceDataPoint,
+    add_to_existing_naneos_data,
+)
+from naneos.partector.blueprints._metric_schema import (
+    METRICS_BY_NAME,
+    PROTO_METRICS,
+    TRUNC,
+)
 
 
 def create_combined_entry(
@@ -32,155 +43,207 @@ def create_combined_entry(
 
 def create_proto_device(sn: int, abs_time: int, df: pd.DataFrame) -> pbScheme.Device:
     device = pbScheme.Device()
-    device.type = (
+    device.type = _device_type(df)
+    device.serial_number = sn
+
+    device.device_points.extend(_create_device_points(df, abs_time))
+
+    return device
+
+
+def _device_type(df: pd.DataFrame) -> int:
+    return (
         int(df["device_type"].iloc[-1])
         if "device_type" in df
         else NaneosDeviceDataPoint.DEV_TYPE_P2
     )
-    device.serial_number = sn
 
-    device_points = df.apply(_create_device_point, axis=1, abs_time=abs_time).to_list()  # type: ignore
-    device_points = [x for x in device_points if x is not None]
 
-    device.device_points.extend(device_points)
+# (DataFrame column, DevicePoint field, scale, truncate, clip negative), from the metric schema
+_DEVICE_POINT_FIELDS: tuple[tuple[str, str, float, bool, bool], ...] = tuple(
+    (metric.name, metric.proto_field, metric.scale, metric.rounding == TRUNC, metric.clip_negative)
+    for metric in PROTO_METRICS
+    if metric.proto_field is not None
+)
+
+_UINT32_MAX = 2**32 - 1
+_FIELD_RANGES: dict[str, tuple[int, int]] = {
+    field.name: (-(2**31), 2**31 - 1)
+    if field.type == FieldDescriptor.TYPE_INT32
+    else (0, _UINT32_MAX)
+    for field in pbScheme.DevicePoint.DESCRIPTOR.fields
+}
+
+
+def _create_device_points(df: pd.DataFrame, abs_time: int) -> list[pbScheme.DevicePoint]:
+    """
+    Encodes every row of df as DevicePoint.
+
+    Missing values are left out of the DevicePoint, rows with a value that does not fit its
+    protobuf field (or a timestamp that is not an int) are dropped.
+    """
+    timestamps, rows, columns = _prepare_device_columns(df, abs_time)
+
+    timestamp_list = timestamps[rows].tolist()
+    column_lists = [
+        (field, values[rows].tolist(), present[rows].tolist()) for field, values, present in columns
+    ]
+    return [
+        pbScheme.DevicePoint(
+            timestamp=timestamp_list[i],
+            **{field: values[i] for field, values, present in column_lists if present[i]},
+        )
+        for i in range(len(rows))
+    ]
+
+
+def _prepare_device_columns(
+    df: pd.DataFrame, abs_time: int
+) -> tuple[np.ndarray, np.ndarray, list[tuple[str, np.ndarray, np.ndarray]]]:
+    """
+    Scales, rounds and range checks the DevicePoint columns of df, once per column with numpy.
+
+    Returns the relative timestamps, the positions of the valid rows and per DevicePoint field
+    (field, int64 fixed point values, present mask) over all rows of df.
+    """
+    timestamps, valid = _relative_timestamps(df.index, abs_time)
+
+    # like a row of the DataFrame: float32 math only if every column is float32
+    float_dtype = np.float32 if all(_is_float32(dtype) for dtype in df.dtypes) else np.float64
+
+    columns: list[tuple[str, np.ndarray, np.ndarray]] = []
+    for column, field, scale, truncate, clip_negative in _DEVICE_POINT_FIELDS:
+        if column not in df.columns:
+            continue
+
+        numeric = pd.to_numeric(df[column], errors="coerce")
+        values = numeric.to_numpy(dtype=float_dtype, na_value=np.nan)
+        present = df[column].notna().to_numpy()  # non numeric values stay present as NaN
+
+        if clip_negative:
+            values = np.maximum(values, 0)
+        if scale != 1.0:
+            values = values * scale
+        values = np.trunc(values) if truncate else np.rint(values)
+
+        low, high = _FIELD_RANGES[field]
+        in_range = (values >= low) & (values <= high)
+        valid &= in_range | ~present
+
+        values = np.where(in_range, values, 0).astype(np.int64)
+        columns.append((field, values, present & in_range))
+
+    rows = np.flatnonzero(valid)
+    if len(rows) < len(df):
+        print(f"Error in _create_device_points: dropped {len(df) - len(rows)} invalid rows")
+
+    return timestamps, rows, columns
+
+
+def _relative_timestamps(index: pd.Index, abs_time: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns abs_time - index and which of them are valid uint32 timestamps."""
+    if is_integer_dtype(index.dtype):
+        names = index.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:  # e.g. object index, only int entries are timestamps
+        names = np.array([x if isinstance(x, int) else np.nan for x in index], dtype=np.float64)
+
+    timestamps = abs_time - names
+    valid = (timestamps >= 0) & (timestamps <= _UINT32_MAX)
+    return np.where(valid, timestamps, 0).astype(np.int64), valid
+
+
+def _is_float32(dtype: object) -> bool:
+    return dtype == np.float32 or isinstance(dtype, pd.Float32Dtype)
+
+
+def create_dataframe_from_proto_device(device: pbScheme.Device, abs_time: int) -> pd.DataFrame:
+    """
+    Decodes the DevicePoints of device into a DataFrame with the columns and dtypes of the metric
+    schema, indexed by unix_timestamp. Inverse of create_proto_device up to the fixed point
+    resolution, e.g. for replaying stored payloads locally.
+    """
+    points = device.device_points
+    n = len(points)
+
+    index = pd.Index(
+        pd.array(
+            [abs_time - point.timestamp for point in points],
+            dtype=METRICS_BY_NAME["unix_timestamp"].dtype,
+        ),
+        name="unix_timestamp",
+    )
+    columns = {
+        "serial_number": _to_pandas_array(np.full(n, device.serial_number), None, "serial_number"),
+        "device_type": _to_pandas_array(np.full(n, device.type), None, "device_type"),
+    }
 
-    return device
+    for column, field, scale, _, _ in _DEVICE_POINT_FIELDS:
+        present = np.fromiter((point.HasField(field) for point in points), dtype=bool, count=n)
+        if not present.any():
+            continue
+
+        raw = np.fromiter((getattr(point, field) for point in points), dtype=np.float64, count=n)
+        columns[column] = _to_pandas_array(raw / scale, ~present, column)
+
+    return pd.DataFrame(columns, index=index)
+
+
+def create_data_from_combined_entry(combined: pbScheme.CombinedData) -> dict[int, pd.DataFrame]:
+    """Decodes all devices of combined, see create_dataframe_from_proto_device()."""
+    data: dict[int, pd.DataFrame] = {}
+    for device in combined.devices:
+        df = create_dataframe_from_proto_device(device, combined.abs_timestamp)
+        data = add_to_existing_naneos_data(data, {device.serial_number: df})
+    return data
+
+
+def _to_pandas_array(values: np.ndarray, mask: Optional[np.ndarray], column: str) -> Any:
+    dtype = METRICS_BY_NAME[column].dtype
+    if mask is None:
+        mask = np.zeros(len(values), dtype=bool)
+
+    values = np.where(mask, 0, values)
+    if dtype.startswith("Int"):
+        return pd.arrays.IntegerArray(np.rint(values).astype(dtype.lower()), mask)
+    return pd.arrays.FloatingArray(values.astype(dtype.lower()), mask)
+
+
+def merge_combined_entries(entries: list[pbScheme.CombinedData]) -> pbScheme.CombinedData:
+    """
+    Merges several CombinedData messages into one.
+
+    Point timestamps are relative to abs_timestamp, therefore they are shifted to the newest
+    abs_timestamp of the entries. DevicePoints of the same device end up in one Device.
+    Entries with uplink or ui_curve data can not be merged.
+    """
+    if any(not is_mergeable_combined_entry(entry) for entry in entries):
+        raise ValueError("Entries with uplink or ui_curve data can not be merged.")
+
+    abs_timestamp = max((entry.abs_timestamp for entry in entries), default=0)
+    merged = pbScheme.CombinedData(abs_timestamp=abs_timestamp)
+    devices: dict[tuple[int, int], pbScheme.Device] = {}
+
+    for entry in entries:
+        shift = abs_timestamp - entry.abs_timestamp
+
+        for device in entry.devices:
+            key = (device.serial_number, device.type)
+            if key not in devices:
+                devices[key] = merged.devices.add(
+                    type=device.type, serial_number=device.serial_number
+                )
+            for point in device.device_points:
+                devices[key].device_points.append(point)
+                devices[key].device_points[-1].timestamp += shift
+
+        for name in ("gateway_points_legacy", "position_points", "wind_points"):
+            target = getattr(merged, name)
+            for point in getattr(entry, name):
+                target.append(point)
+                target[-1].timestamp += shift
+
+    return merged
 
 
-def _create_device_point(ser: pd.Series, abs_time: int) -> Optional[pbScheme.DevicePoint]:
-    try:
-        device_point = pbScheme.DevicePoint()
-
-        ser = ser.dropna()
-
-        # mandatory fields
-        if isinstance(ser.name, int):
-            timestamp = ser.name
-        else:
-            raise ValueError("Timestamp is not an int!")
-        device_point.timestamp = abs_time - timestamp
-        if "device_status" in ser:
-            device_point.device_status = int(ser["device_status"])
-        if "firmware_version" in ser:
-            device_point.firmware_version = int(ser["firmware_version"])
-
-        if "ldsa" in ser:
-            device_point.ldsa = int(ser["ldsa"] * 100.0)
-        if "particle_number_concentration" in ser:
-            device_point.particle_number_concentration = int(
-                round(ser["particle_number_concentration"])
-            )
-        if "average_particle_diameter" in ser:
-            device_point.average_particle_diameter = int(round(ser["average_particle_diameter"]))
-        if "particle_mass" in ser:
-            device_point.particle_mass = int(round(ser["particle_mass"] * 100.0))
-        if "particle_surface" in ser:
-            device_point.particle_surface = int(round(ser["particle_surface"] * 100.0))
-        if "diffusion_current" in ser:
-            idiff_tmp = ser["diffusion_current"] if ser["diffusion_current"] > 0 else 0
-            device_point.diffusion_current = int(round(idiff_tmp * 100.0))
-        if "diffusion_current_offset" in ser:
-            device_point.diffusion_current_offset = int(
-                round(ser["diffusion_current_offset"] * 100.0)
-            )
-        if "diffusion_current_stddev" in ser:
-            device_point.diffusion_current_stddev = int(
-                round(ser["diffusion_current_stddev"] * 100.0)
-            )
-        # TODO: implement in protobuf
-        # if "diffusion_current_average" in ser:
-        #     device_point.diffusion_current_average = int(
-        #         round(ser["diffusion_current_average"] * 100.0)
-        #     )
-        # if "diffusion_current_max" in ser:
-        #     device_point.diffusion_current_max = int(round(ser["diffusion_current_max"] * 100.0))
-        if "diffusion_current_delay_on" in ser:
-            delay_on_tmp = max(ser["diffusion_current_delay_on"], 0)
-            device_point.diffusion_current_delay_on = int(round(delay_on_tmp))
-        if "diffusion_current_delay_off" in ser:
-            delay_off_tmp = max(ser["diffusion_current_delay_off"], 0)
-            device_point.diffusion_current_delay_off = int(round(delay_off_tmp))
-        if "corona_voltage" in ser:
-            device_point.corona_voltage = int(round(ser["corona_voltage"]))
-        # TODO: implement in protobuf
-        # if "corona_voltage_onset" in ser:
-        #     device_point.corona_voltage_onset = int(round(ser["corona_voltage_onset"]))
-        if "electrometer_1_amplitude" in ser:
-            device_point.electrometer_1_offset = int(round(ser["electrometer_1_amplitude"] * 10.0))
-        if "electrometer_2_amplitude" in ser:
-            device_point.electrometer_2_offset = int(round(ser["electrometer_2_amplitude"] * 10.0))
-        if "electrometer_1_gain" in ser:
-            device_point.electrometer_1_gain = int(round(ser["electrometer_1_gain"] * 100.0))
-        if "electrometer_2_gain" in ser:
-            device_point.electrometer_2_gain = int(round(ser["electrometer_2_gain"] * 100.0))
-        if "temperature" in ser:
-            device_point.temperature = int(round(ser["temperature"]))
-        if "relative_humidity" in ser:
-            device_point.relative_humidity = int(round(ser["relative_humidity"]))
-        if "flow_from_dp" in ser:
-            device_point.flow = int(round(ser["flow_from_dp"] * 1000.0))
-        if "deposition_voltage" in ser:
-            device_point.deposition_voltage = int(round(ser["deposition_voltage"]))
-        if "battery_voltage" in ser:
-            device_point.battery_voltage = int(round(ser["battery_voltage"] * 100.0))
-        if "ambient_pressure" in ser:
-            device_point.ambient_pressure = int(round(ser["ambient_pressure"] * 10.0))
-        if "channel_pressure" in ser:
-            device_point.channel_pressure = int(round(ser["channel_pressure"] * 10.0))
-        if "differential_pressure" in ser:
-            device_point.differential_pressure = int(round(ser["differential_pressure"] * 10.0))
-        if "pump_voltage" in ser:
-            device_point.pump_voltage = int(round(ser["pump_voltage"] * 100.0))
-        if "pump_current" in ser:
-            device_point.pump_current = int(round(ser["pump_current"] * 1000.0))
-        if "pump_pwm" in ser:
-            device_point.pump_pwm = int(round(ser["pump_pwm"]))
-        if "particle_number_10nm" in ser:
-            device_point.particle_number_10nm = int(round(ser["particle_number_10nm"]))
-        if "particle_number_16nm" in ser:
-            device_point.particle_number_16nm = int(round(ser["particle_number_16nm"]))
-        if "particle_number_26nm" in ser:
-            device_point.particle_number_26nm = int(round(ser["particle_number_26nm"]))
-        if "particle_number_43nm" in ser:
-            device_point.particle_number_43nm = int(round(ser["particle_number_43nm"]))
-        if "particle_number_70nm" in ser:
-            device_point.particle_number_70nm = int(round(ser["particle_number_70nm"]))
-        if "particle_number_114nm" in ser:
-            device_point.particle_number_114nm = int(round(ser["particle_number_114nm"]))
-        if "particle_number_185nm" in ser:
-            device_point.particle_number_185nm = int(round(ser["particle_number_185nm"]))
-        if "particle_number_300nm" in ser:
-            device_point.particle_number_300nm = int(round(ser["particle_number_300nm"]))
-        if "sigma_size_dist" in ser:
-            device_point.sigma_size_dist = int(round(ser["sigma_size_dist"] * 100.0))
-        if "steps_inversion" in ser:
-            device_point.steps_inversion = int(round(ser["steps_inversion"]))
-        if "current_dist_0" in ser:
-            device_point.current_dist_0 = int(round(ser["current_dist_0"] * 100000.0))
-        if "current_dist_1" in ser:
-            device_point.current_dist_1 = int(round(ser["current_dist_1"] * 100000.0))
-        if "current_dist_2" in ser:
-            device_point.current_dist_2 = int(round(ser["current_dist_2"] * 100000.0))
-        if "current_dist_3" in ser:
-            device_point.current_dist_3 = int(round(ser["current_dist_3"] * 100000.0))
-        if "current_dist_4" in ser:
-            device_point.current_dist_4 = int(round(ser["current_dist_4"] * 100000.0))
-
-        if "supply_voltage_5V" in ser:
-            device_point.supply_voltage_5V = int(round(ser["supply_voltage_5V"] * 10.0))
-        if "positive_voltage_3V3" in ser:
-            device_point.positive_voltage_3V3 = int(round(ser["positive_voltage_3V3"] * 10.0))
-        if "negative_voltage_3V3" in ser:
-            device_point.negative_voltage_3V3 = int(round(ser["negative_voltage_3V3"] * 10.0))
-        if " usb_cc_voltage" in ser:
-            device_point.usb_cc_voltage = int(round(ser[" usb_cc_voltage"] * 10.0))
-
-        # Needed for the garagenbox
-        if "cs_status" in ser:
-            device_point.cs_status = int(ser["cs_status"])
-
-    except Exception as e:
-        print(f"Error in _create_device_Point: {e}")
-        return None
-
-    return device_point
+def is_mergeable_combined_entry(entry: pbScheme.CombinedData) -> bool:
+    return not entry.HasField("uplink") and not any(len(d.ui_curve) for d in entry.devices)
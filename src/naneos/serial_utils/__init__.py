@@ -1,3 +1,4 @@
-from naneos.serial_utils.list_serial_ports import list_serial_ports
+from naneos.serial_utils.hotplug import SerialHotplugWatcher
+from naneos.serial_utils.list_serial_ports import list_dosemet_ports, list_serial_ports
 
-__all__ = ["list_serial_ports"]
+__all__ = ["list_serial_ports", "list_dosemet_ports", "SerialHotplugWatcher"]
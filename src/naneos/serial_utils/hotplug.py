@@ -0,0 +1,133 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from naneos.logger import LEVEL_WARNING, get_naneos_logger
+
+logger = get_naneos_logger(__name__, LEVEL_WARNING)
+
+
+class SerialHotplugWatcher:
+    """
+    Event driven detection of added and removed serial device nodes (Linux only, inotify).
+
+    Watches /dev (and /dev/serial/by-id if present) for tty nodes that get created, deleted or
+    changed (udev sets the permissions right after creating a node). wait() blocks until
+    something changed and returns the affected device paths, so rescans only happen on hotplug.
+    On other platforms is_supported() is False and the caller keeps polling.
+    """
+
+    WATCH_PATHS = ("/dev", "/dev/serial/by-id")
+    NAME_PREFIX = "tty"
+    SETTLE_S = 0.1  # collect the burst of events udev creates for one device
+
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    WATCH_MASK = IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    _EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    @staticmethod
+    def is_supported() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            return hasattr(SerialHotplugWatcher._libc(), "inotify_init1")
+        except OSError:
+            return False
+
+    @staticmethod
+    def _libc() -> ctypes.CDLL:
+        return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+    def __init__(self, watch_paths: tuple[str, ...] = WATCH_PATHS) -> None:
+        self._watch_paths = watch_paths
+        self._fd = -1
+        self._watches: dict[int, Path] = {}
+
+    def start(self) -> None:
+        """Creates the inotify instance and adds the watches. Raises OSError on failure."""
+        libc = self._libc()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+
+        for path in self._watch_paths:
+            if not os.path.isdir(path):
+                continue
+            wd = libc.inotify_add_watch(fd, path.encode(), self.WATCH_MASK)
+            if wd < 0:
+                logger.warning(f"Could not watch {path}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._watches[wd] = Path(path)
+
+        if not self._watches:
+            self.close()
+            raise OSError("No hotplug path could be watched.")
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = -1
+        self._watches.clear()
+
+    def wait(self, timeout: float) -> Optional[set[str]]:
+        """
+        Waits up to timeout seconds for hotplug events.
+
+        Returns:
+            Optional[set[str]]: Changed device paths (may be empty), or None if the kernel event
+                queue overflowed and everything has to be rescanned.
+        """
+        if self._fd < 0:
+            time.sleep(timeout)
+            return set()
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        time.sleep(self.SETTLE_S)
+        return self._read_events()
+
+    def _read_events(self) -> Optional[set[str]]:
+        changed: set[str] = set()
+        overflow = False
+
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset + self._EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0").decode(errors="ignore")
+                offset += length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                elif wd in self._watches and self._is_relevant(self._watches[wd], name):
+                    # by-id links point to the real node, e.g. /dev/ttyACM0
+                    changed.add(os.path.realpath(self._watches[wd] / name))
+
+        return None if overflow else changed
+
+    def _is_relevant(self, directory: Path, name: str) -> bool:
+        # /dev/serial/by-id only contains serial links, /dev contains everything
+        return directory.name == "by-id" or name.startswith(self.NAME_PREFIX)
@@ -1,8 +1,10 @@
 import sys
 from pathlib import Path
+from typing import Optional
 
 import serial
 import serial.tools.list_ports as ls
+from serial.tools.list_ports_common import ListPortInfo
 
 
 def list_serial_ports(ports_exclude: list = []) -> list[str]:
@@ -21,18 +23,28 @@ def list_serial_ports(ports_exclude: list = []) -> list[str]:
     return ports
 
 
-def _get_all_dosemet_ports(ports_exclude: list) -> list[str]:
-    ports: list[str] = []
+def list_dosemet_ports(ports_exclude: Optional[list] = None) -> list[ListPortInfo]:
+    """Returns the port infos of all naneos (dosemet) USB serial ports without opening them.
+
+    Returns:
+        list[ListPortInfo]: pyserial port infos with device, serial_number, vid, pid and location.
+    """
+    if ports_exclude is None:
+        ports_exclude = []
 
-    all_ports = ls.comports()
-    all_ports = [port for port in all_ports if port.device not in ports_exclude]
-    for port in all_ports:
-        if (port.pid == 5 and port.vid == 65535) or (
-            port.serial_number and "dosemet" in port.serial_number.lower()
-        ):
-            ports.append(port.device)
+    return [
+        port
+        for port in ls.comports()
+        if port.device not in ports_exclude
+        and (
+            (port.pid == 5 and port.vid == 65535)
+            or (port.serial_number and "dosemet" in port.serial_number.lower())
+        )
+    ]
 
-    return ports
+
+def _get_all_dosemet_ports(ports_exclude: list) -> list[str]:
+    return [port.device for port in list_dosemet_ports(ports_exclude)]
 
 
 def _get_all_open_ports() -> list[str]:
@@ -1,5 +1,6 @@
 import asyncio
 import warnings
+from types import SimpleNamespace
 
 from bleak.backends.device import BLEDevice
 
@@ -48,3 +49,50 @@ def test_scanner() -> None:
 def test_scanner_with_context_manager() -> None:
     """Test the scanner functionality with context manager."""
     asyncio.run(async_test_scanner(with_context_manager=True))
+
+
+def _advertisement(serial_number: int, ldsa_raw: int) -> SimpleNamespace:
+    std = bytearray(20)
+    std[0:3] = ldsa_raw.to_bytes(3, "little")
+    std[14:16] = serial_number.to_bytes(2, "little")
+    adv_bytes = b"X" + bytes(std) + b"F"
+
+    # the first two advertisement bytes are sent as manufacturer id
+    manufacturer_id = int.from_bytes(adv_bytes[:2], "little")
+    return SimpleNamespace(manufacturer_data={manufacturer_id: adv_bytes[2:]}, rssi=-60)
+
+
+def test_scanner_drops_duplicate_advertisements(monkeypatch) -> None:
+    """Offline: same payloads are not decoded again and one advertisement per second is emitted."""
+    import naneos.partector_ble.partector_ble_scanner as scanner_module
+
+    now = [1_700_000_000.1]
+    monkeypatch.setattr(scanner_module.time, "time", lambda: now[0])
+
+    async def run() -> None:
+        queue = PartectorBleScanner.create_scanner_queue()
+        scanner = PartectorBleScanner(loop=asyncio.get_running_loop(), queue=queue)
+        device = SimpleNamespace(name="P2", address="AA:BB")
+
+        await scanner._detection_callback(device, _advertisement(8617, 100))  # emitted
+        await scanner._detection_callback(device, _advertisement(8617, 100))  # duplicate
+        await scanner._detection_callback(device, _advertisement(8617, 200))  # coalesced
+        now[0] += 1.0
+        await scanner._detection_callback(device, _advertisement(8617, 100))  # cached, emitted
+
+        assert scanner.get_counters() == {
+            "received": 4,
+            "duplicate": 2,
+            "coalesced": 1,
+            "emitted": 2,
+            "dropped": 0,
+        }
+        assert scanner.get_rssi("AA:BB") == -60
+
+        first = (await queue.get())[1]
+        second = (await queue.get())[1]
+        assert first.serial_number == second.serial_number == 8617
+        assert first.ldsa == second.ldsa == 1.0
+        assert second.unix_timestamp - first.unix_timestamp == 1000
+
+    asyncio.run(run())
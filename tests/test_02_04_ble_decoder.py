@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+from naneos.partector_ble.decoder.partectod_ble_decoder_aux_error import PartectorBleDecoderAuxError
+from naneos.partector_ble.decoder.partector_ble_decoder_aux import PartectorBleDecoderAux
+from naneos.partector_ble.decoder.partector_ble_decoder_size import PartectorBleDecoderSize
+from naneos.partector_ble.decoder.partector_ble_decoder_std import PartectorBleDecoderStd
+
+DECODERS = [
+    (PartectorBleDecoderStd, NaneosDeviceDataPoint.BLE_STD_FIELD_NAMES),
+    (PartectorBleDecoderAux, NaneosDeviceDataPoint.BLE_AUX_FIELD_NAMES),
+    (PartectorBleDecoderAuxError, NaneosDeviceDataPoint.BLE_AUX_ERROR_FIELD_NAMES),
+    (PartectorBleDecoderSize, NaneosDeviceDataPoint.BLE_SIZE_DIST_FIELD_NAMES),
+]
+
+
+def _le(data: bytes) -> int:
+    return int.from_bytes(data, byteorder="little")
+
+
+def test_std_decoder_fields() -> None:
+    data = bytes(range(1, 21))
+    decoded = PartectorBleDecoderStd.decode(data)
+
+    assert decoded.ldsa == float(_le(data[0:3])) * 0.01
+    assert decoded.particle_number_concentration == float(_le(data[5:8]))
+    assert decoded.device_status == _le(data[10:12]) + (((data[19] >> 1) & 0x7F) << 16)
+    assert decoded.battery_voltage == float(_le(data[12:14])) * 0.01
+    assert (
+        decoded.serial_number == _le(data[14:16]) == PartectorBleDecoderStd.get_serial_number(data)
+    )
+    assert isinstance(decoded.serial_number, int) and isinstance(decoded.ldsa, float)
+
+
+def test_aux_decoders_fields() -> None:
+    data = bytes(range(100, 120))
+
+    aux = PartectorBleDecoderAux.decode(data)
+    assert aux.diffusion_current == float(_le(data[2:4])) * 0.01
+    assert aux.flow_from_dp == float(_le(data[6:8])) / 1000.0
+
+    error = PartectorBleDecoderAuxError.decode(b"\xff\xff" + data[2:])
+    assert error.device_status == _le(data[2:6])
+    assert error.diffusion_current_average == _le(data[8:10]) * 0.01
+    assert error.corona_voltage_onset == _le(data[14:16])
+
+
+def test_size_decoder_nibble_packed_fields() -> None:
+    data = bytes(range(200, 220))
+    decoded = PartectorBleDecoderSize.decode(data)
+
+    assert decoded.particle_number_10nm == float(_le(bytes([data[0], data[1], data[2] & 0x0F])))
+    assert decoded.particle_number_16nm == float(
+        _le(bytes([data[2] & 0xF0, data[3], data[4]])) >> 4
+    )
+    assert decoded.particle_number_300nm == float(
+        _le(bytes([data[17] & 0xF0, data[18], data[19]])) >> 4
+    )
+
+
+@pytest.mark.parametrize("decoder, field_names", DECODERS)
+def test_decoder_fills_target_and_bulk_matches(decoder, field_names) -> None:
+    random.seed(4)
+    payloads = [bytes(random.getrandbits(8) for _ in range(20)) for _ in range(50)]
+    assert decoder.LAYOUT.field_names == field_names
+
+    target = NaneosDeviceDataPoint(unix_timestamp=1, serial_number=8617)
+    assert decoder.decode(payloads[0], data_structure=target) is target
+    assert target.unix_timestamp == 1
+
+    columns = decoder.decode_many(payloads)
+    for i, payload in enumerate(payloads):
+        decoded = decoder.decode(payload)
+        for name in field_names:
+            assert columns[name][i] == getattr(decoded, name), name
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+from naneos.partector_ble.partector_ble_adapter_monitor import (
+    ADAPTER_INTERFACE,
+    PartectorBleAdapterMonitor,
+)
+
+
+def _signal(member: str, body: list, path: str = "/") -> SimpleNamespace:
+    return SimpleNamespace(member=member, body=body, path=path)
+
+
+def _variant(value: object) -> SimpleNamespace:
+    return SimpleNamespace(value=value)
+
+
+def test_adapter_monitor_dbus_signals() -> None:
+    async def run() -> list[bool]:
+        changes: list[bool] = []
+        monitor = PartectorBleAdapterMonitor(on_change=changes.append)
+        monitor._set_available(False)  # initial state, no callback
+
+        monitor._on_dbus_message(
+            _signal(
+                "InterfacesAdded",
+                ["/org/bluez/hci0", {ADAPTER_INTERFACE: {"Powered": _variant(False)}}],
+            )
+        )
+        assert not monitor.available
+        assert monitor.get_adapters() == {"/org/bluez/hci0": False}
+
+        # unrelated properties and interfaces are ignored
+        monitor._on_dbus_message(
+            _signal("PropertiesChanged", [ADAPTER_INTERFACE, {"Discovering": True}, []], "/a")
+        )
+        monitor._on_dbus_message(_signal("InterfacesAdded", ["/org/bluez/hci0/dev_1", {}]))
+
+        monitor._on_dbus_message(
+            _signal(
+                "PropertiesChanged",
+                [ADAPTER_INTERFACE, {"Powered": _variant(True)}, []],
+                "/org/bluez/hci0",
+            )
+        )
+        assert monitor.available
+        assert await monitor.wait_available(timeout=0.1)
+
+        monitor._on_dbus_message(
+            _signal("InterfacesRemoved", ["/org/bluez/hci0", [ADAPTER_INTERFACE]])
+        )
+        assert not monitor.available
+        assert not await monitor.wait_available(timeout=0.01)
+
+        monitor._on_dbus_message(
+            _signal("InterfacesAdded", ["/org/bluez/hci1", {ADAPTER_INTERFACE: {"Powered": True}}])
+        )
+        # bluetoothd stopped
+        monitor._on_dbus_message(_signal("NameOwnerChanged", ["org.bluez", ":1.5", ""]))
+        assert monitor.get_adapters() == {}
+
+        return changes
+
+    assert asyncio.run(run()) == [True, False, True, False]
+
+
+def test_adapter_monitor_probe_fallback(monkeypatch) -> None:
+    states = iter([False, False, True, True, False])
+    probes = []
+
+    async def probe() -> bool:
+        probes.append(1)
+        return next(states, False)
+
+    async def no_dbus(self) -> bool:
+        return False
+
+    monkeypatch.setattr(PartectorBleAdapterMonitor, "probe", staticmethod(probe))
+    monkeypatch.setattr(PartectorBleAdapterMonitor, "_dbus_start", no_dbus)
+
+    async def run() -> list[bool]:
+        changes: list[bool] = []
+        async with PartectorBleAdapterMonitor(on_change=changes.append, probe_interval=0.01) as m:
+            assert not m.uses_dbus
+            assert not m.available
+            assert await m.wait_available(timeout=1.0)
+            while m.available:
+                await asyncio.sleep(0.01)
+        return changes
+
+    assert asyncio.run(run()) == [True, False]
+    assert len(probes) == 5
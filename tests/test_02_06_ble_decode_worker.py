@@ -0,0 +1,150 @@
+import asyncio
+import random
+
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+from naneos.partector_ble.decoder.partectod_ble_decoder_aux_error import PartectorBleDecoderAuxError
+from naneos.partector_ble.decoder.partector_ble_decoder_aux import PartectorBleDecoderAux
+from naneos.partector_ble.decoder.partector_ble_decoder_size import PartectorBleDecoderSize
+from naneos.partector_ble.decoder.partector_ble_decoder_std import PartectorBleDecoderStd
+from naneos.partector_ble.partector_ble_decode_worker import PartectorBleDecodeWorker
+
+
+def _payload() -> bytes:
+    return bytes(random.getrandbits(8) for _ in range(20))
+
+
+def _rounds() -> list[list[tuple[int, str, bytes]]]:
+    """Five measurements of three devices, the parts of every measurement in random order."""
+    random.seed(7)
+    rounds = []
+    for i in range(5):
+        notifications = []
+        for serial in (8112, 8617, 8150):
+            notifications.append((serial, "std", _payload()))
+            if serial == 8150 and i == 4:
+                notifications.append((serial, "aux", b"\xff\xff" + _payload()[2:]))  # aux error
+            else:
+                notifications.append((serial, "aux", _payload()))
+            if serial == 8617:
+                notifications.append((serial, "size_dist", _payload()))
+        random.shuffle(notifications)
+        rounds.append(notifications)
+    return rounds
+
+
+def _decode_sequential(notifications) -> dict[int, NaneosDeviceDataPoint]:
+    """Reference: the decoding of the former per connection decode routine."""
+    records: dict[int, NaneosDeviceDataPoint] = {}
+    for serial, char_type, data in notifications:
+        record = records.setdefault(serial, NaneosDeviceDataPoint())
+        if char_type == "std":
+            PartectorBleDecoderStd.decode(data, data_structure=record)
+        elif char_type == "aux" and data[:2] == b"\xff\xff":
+            PartectorBleDecoderAuxError.decode(data, data_structure=record)
+        elif char_type == "aux":
+            PartectorBleDecoderAux.decode(data, data_structure=record)
+        else:
+            PartectorBleDecoderSize.decode(data, data_structure=record)
+    return records
+
+
+_FIELDS = [
+    name
+    for name in NaneosDeviceDataPoint.FIELD_NAMES
+    if name not in {"unix_timestamp", "serial_number", "device_type", "connection_type"}
+]
+
+
+def test_decode_worker_assembles_per_measurement() -> None:
+    rounds = _rounds()
+    # the first notification tells that 8617 is a P2 Pro, the worker would not wait for
+    # size_dist before
+    first = next(n for n in rounds[0] if n[0] == 8617 and n[1] == "size_dist")
+    rounds[0].remove(first)
+    rounds[0].insert(0, first)
+
+    async def run() -> tuple[list[NaneosDeviceDataPoint], PartectorBleDecodeWorker]:
+        queue = asyncio.Queue()
+        worker = PartectorBleDecodeWorker(asyncio.get_running_loop(), queue)
+        for notifications in rounds:
+            for notification in notifications:
+                worker.submit(*notification)
+        worker.submit(8112, "std", b"\x01\x02")  # too short
+        await worker.stop()  # one batch, complete records were emitted while applying it
+        return [queue.get_nowait() for _ in range(queue.qsize())], worker
+
+    records, worker = asyncio.run(run())
+
+    for serial in (8112, 8617, 8150):
+        emitted = [record for record in records if record.serial_number == serial]
+        assert len(emitted) == len(rounds)  # one record per measurement, none split or merged
+        for record, notifications in zip(emitted, rounds):
+            reference = _decode_sequential(notifications)[serial]
+            assert record.connection_type == NaneosDeviceDataPoint.CONN_TYPE_CONNECTED
+            assert record.unix_timestamp is not None
+            for name in _FIELDS:
+                assert getattr(record, name) == getattr(reference, name), name
+
+    assert worker.get_device_type(8617) == NaneosDeviceDataPoint.DEV_TYPE_P2PRO
+    assert worker.get_device_type(8112) == NaneosDeviceDataPoint.DEV_TYPE_P2
+    counters = worker.get_counters()
+    n = sum(len(notifications) for notifications in rounds)
+    assert counters["received"] == n + 1
+    assert counters["decoded"] == n
+    assert counters["failed"] == 1
+    assert counters["batches"] == 1
+    assert counters["emitted"] == 3 * len(rounds)
+    assert counters["incomplete"] == 0
+
+
+def test_decode_worker_emits_complete_records_at_once() -> None:
+    random.seed(3)
+
+    async def run() -> None:
+        queue = asyncio.Queue()
+        async with PartectorBleDecodeWorker(asyncio.get_running_loop(), queue) as worker:
+            # P2: std and aux complete the record
+            worker.submit(8112, "aux", _payload())
+            worker.submit(8112, "std", _payload())
+            record = await asyncio.wait_for(queue.get(), timeout=0.2)  # no whole second tick
+            assert record.serial_number == 8112
+            assert record.device_type == NaneosDeviceDataPoint.DEV_TYPE_P2
+
+            # P2 Pro: the record waits for size_dist once the type is known
+            worker.submit(8617, "size_dist", bytes(20))
+            worker.submit(8617, "std", _payload())
+            worker.submit(8617, "aux", _payload())
+            record = await asyncio.wait_for(queue.get(), timeout=0.2)
+            assert record.particle_number_10nm == 0.0
+            worker.submit(8617, "std", _payload())
+            worker.submit(8617, "aux", _payload())
+            await asyncio.sleep(0.05)
+            assert queue.empty()
+            worker.submit(8617, "size_dist", bytes(20))
+            record = await asyncio.wait_for(queue.get(), timeout=0.2)
+            assert record.device_type == NaneosDeviceDataPoint.DEV_TYPE_P2PRO
+            assert worker.get_counters()["incomplete"] == 0
+
+    asyncio.run(run())
+
+
+def test_decode_worker_emits_incomplete_after_timeout() -> None:
+    random.seed(5)
+
+    async def run() -> tuple[NaneosDeviceDataPoint, float, dict[str, int]]:
+        queue = asyncio.Queue()
+        async with PartectorBleDecodeWorker(asyncio.get_running_loop(), queue) as worker:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            worker.submit(8150, "std", _payload())  # aux never arrives
+            record = await asyncio.wait_for(queue.get(), timeout=2.0)
+            waited = loop.time() - start
+            counters = worker.get_counters()
+        return record, waited, counters
+
+    record, waited, counters = asyncio.run(run())
+    assert record.serial_number == 8150
+    assert record.ldsa is not None and record.corona_voltage is None
+    assert PartectorBleDecodeWorker.ASSEMBLY_TIMEOUT * 0.9 <= waited < 1.5
+    assert counters["emitted"] == 1
+    assert counters["incomplete"] == 1
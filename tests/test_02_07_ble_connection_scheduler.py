@@ -0,0 +1,174 @@
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+from naneos.partector_ble.partector_ble_connection_scheduler import (
+    PartectorBleConnectionScheduler,
+)
+from naneos.partector_ble.partector_ble_manager import PartectorBleManager
+
+P2 = NaneosDeviceDataPoint.DEV_TYPE_P2
+P2PRO = NaneosDeviceDataPoint.DEV_TYPE_P2PRO
+
+
+def _connect_all(scheduler, connected: dict, now: float) -> list[int]:
+    """Connects one device after the other, every connection delivers data at once."""
+    order = []
+    while (candidate := scheduler.next_connection(connected, now=now)) is not None:
+        serial, _, adapter = candidate
+        connected[serial] = adapter
+        scheduler.on_connection_data(serial, now=now)
+        order.append(serial)
+    return order
+
+
+def test_scheduler_caps_and_ranks() -> None:
+    scheduler = PartectorBleConnectionScheduler(max_connections=3, rng=random.Random(1))
+    now = 1000.0
+
+    # known types from earlier connections
+    scheduler.on_connection_data(1, P2PRO, now=now)
+    scheduler.on_connection_data(2, P2, now=now)
+    for serial, rssi in ((1, -90), (2, -40), (3, -60), (4, -45), (5, -80)):
+        scheduler.on_advertisement(serial, f"dev{serial}", rssi, now=now)
+
+    connected: dict = {}
+    # P2 Pro first despite the weak signal, then unknown types by RSSI
+    assert _connect_all(scheduler, connected, now) == [1, 4, 3]
+    assert scheduler.next_connection(connected, now=now) is None  # all links used
+
+    counters = scheduler.get_counters()
+    assert counters["attempts"] == 3
+    assert counters["connected"] == 3
+
+
+def test_scheduler_serializes_and_backs_off() -> None:
+    scheduler = PartectorBleConnectionScheduler(rng=random.Random(2))
+    now = 1000.0
+    for serial in (10, 11):
+        scheduler.on_advertisement(serial, f"dev{serial}", -50, now=now)
+
+    serial, device, adapter = scheduler.next_connection({}, now=now)
+    assert device == f"dev{serial}" and adapter is None
+    # one attempt at a time
+    assert scheduler.next_connection({serial: None}, now=now + 1) is None
+
+    # no data within CONNECT_TIMEOUT: released and backed off
+    later = now + scheduler.CONNECT_TIMEOUT + 1
+    assert scheduler.to_disconnect({serial}, now=later) == [serial]
+    scheduler.on_connection_ended(serial, now=later)
+
+    other, _, _ = scheduler.next_connection({}, now=later)
+    assert other != serial
+    scheduler.on_connection_data(other, now=later)
+
+    # the failed device waits BACKOFF_BASE +- jitter, then it is the next candidate
+    for t in range(1, 10):
+        scheduler.on_advertisement(serial, f"dev{serial}", -50, now=later + t)
+    low = scheduler.BACKOFF_BASE * (1 - scheduler.BACKOFF_JITTER)
+    high = scheduler.BACKOFF_BASE * (1 + scheduler.BACKOFF_JITTER)
+    assert scheduler.next_connection({other: None}, now=later + low - 0.1) is None
+    assert scheduler.next_connection({other: None}, now=later + high + 0.1) == (
+        serial,
+        f"dev{serial}",
+        None,
+    )
+    assert scheduler.get_counters()["failures"] == 1
+
+
+def test_scheduler_keeps_good_p2_on_advertisements() -> None:
+    scheduler = PartectorBleConnectionScheduler(rng=random.Random(3))
+    window = int(scheduler.ADV_WINDOW)
+
+    for t in range(window + 1):
+        scheduler.on_advertisement(20, "good", -50, now=1000.0 + t)  # every second
+        if t % 3 == 0:
+            scheduler.on_advertisement(21, "poor", -50, now=1000.0 + t)  # every third second
+    now = 1000.0 + window
+
+    # both connected once, which shows they are P2
+    connected = {20: None, 21: None}
+    scheduler.on_connection_data(20, P2, now=now)
+    scheduler.on_connection_data(21, P2, now=now)
+
+    assert scheduler.to_disconnect(connected, now=now) == [20]
+    del connected[20]
+    scheduler.on_connection_ended(20, now=now)
+    assert scheduler.get_counters()["failures"] == 0  # released, not failed
+    assert scheduler.next_connection(connected, now=now) is None  # stays on advertisements
+
+
+def test_scheduler_places_on_least_loaded_adapter() -> None:
+    scheduler = PartectorBleConnectionScheduler(max_connections=2, rng=random.Random(4))
+    scheduler.set_adapters(["hci0", "hci1"])
+    now = 1000.0
+
+    # 1-3 are heard by both adapters, 4 only by hci0 and 5 by neither of the usable ones
+    for serial in (1, 2, 3):
+        scheduler.on_advertisement(serial, f"hci0/dev{serial}", -50, "hci0", now=now)
+        scheduler.on_advertisement(serial, f"hci1/dev{serial}", -60, "hci1", now=now)
+    scheduler.on_advertisement(4, "hci0/dev4", -40, "hci0", now=now)
+    scheduler.on_advertisement(5, "hci2/dev5", -40, "hci2", now=now)
+
+    connected: dict = {}
+    placed = []
+    while (candidate := scheduler.next_connection(connected, now=now)) is not None:
+        serial, device, adapter = candidate
+        assert device == f"{adapter}/dev{serial}"  # the BLEDevice of the chosen adapter
+        connected[serial] = adapter
+        scheduler.on_connection_data(serial, now=now)
+        placed.append((serial, adapter))
+
+    assert placed[0] == (4, "hci0")  # strongest signal first
+    assert sorted(connected.values()) == ["hci0", "hci0", "hci1", "hci1"]
+    assert 5 not in connected
+
+    # hci1 drops out: its devices are placed on the remaining adapter once links are free
+    scheduler.set_adapters(["hci0"])
+    for serial in [s for s, a in connected.items() if a == "hci1"]:
+        del connected[serial]
+        scheduler.on_connection_ended(serial, now=now)
+    assert scheduler.get_counters()["failures"] == 0
+    assert scheduler.next_connection(connected, now=now) is None  # hci0 is full
+
+    released = next(s for s, a in connected.items() if a == "hci0" and s != 4)
+    del connected[released]
+    scheduler.on_connection_ended(released, now=now)
+    serial, _, adapter = scheduler.next_connection(connected, now=now)
+    assert adapter == "hci0"
+
+
+def test_manager_merges_adapters_without_duplicates() -> None:
+    manager = PartectorBleManager()
+    manager._scheduler.set_adapters(["hci0", "hci1"])
+
+    async def run() -> None:
+        for adapter in ("hci0", "hci1"):
+            queue = asyncio.Queue()
+            scanner = SimpleNamespace(get_rssi=lambda address: -50)
+            manager._scanners[adapter] = (scanner, queue)
+            for second in range(1000, 1004):
+                if adapter == "hci0" and second == 1000:
+                    continue  # only hci1, drained after hci0, heard the first advertisement
+                if adapter == "hci1" and second == 1003:
+                    continue  # hci1 missed the last advertisement
+                point = NaneosDeviceDataPoint(
+                    unix_timestamp=second * 1000,
+                    serial_number=8112,
+                    connection_type=NaneosDeviceDataPoint.CONN_TYPE_ADVERTISEMENT,
+                    ldsa=float(second),
+                )
+                queue.put_nowait((SimpleNamespace(address=f"{adapter}/dev"), point))
+        await manager._scanner_queue_routine()
+
+    asyncio.run(run())
+    df = manager.get_data()[8112]
+    assert df.index.tolist() == [1000_000, 1001_000, 1002_000, 1003_000]
+
+    # both adapters heard the device, each with its own BLEDevice
+    candidate = manager._scheduler.next_connection({}, now=time.time())
+    assert candidate is not None
+    serial, device, adapter = candidate
+    assert serial == 8112 and device.address == f"{adapter}/dev"
@@ -0,0 +1,226 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from naneos.partector.blueprints._command_channel import PartectorCommandChannel
+from naneos.partector.blueprints._data_buffer import NaneosDeviceDataBuffer
+from naneos.partector.blueprints._data_merger import NaneosDataMerger
+from naneos.partector.blueprints._data_structure import (
+    PARTECTOR2_DATA_STRUCTURE_V320,
+    PARTECTOR2_GAIN_TEST_ADDITIONAL_DATA_STRUCTURE,
+    PARTECTOR2_OUTPUT_PULSE_DIAGNOSTIC_ADDITIONAL_DATA_STRUCTURE,
+    NaneosDeviceDataPoint,
+    add_to_existing_naneos_data,
+    sort_and_clean_naneos_data,
+)
+from naneos.partector.blueprints._line_framer import SerialLineFramer
+from naneos.partector.blueprints._line_parser import PartectorLineParser
+
+
+def _create_points(n: int, serial_number: int = 8617) -> list[NaneosDeviceDataPoint]:
+    return [
+        NaneosDeviceDataPoint(
+            unix_timestamp=1_700_000_000_000 + i * 1000,
+            serial_number=serial_number,
+            connection_type=NaneosDeviceDataPoint.CONN_TYPE_SERIAL,
+            device_type=NaneosDeviceDataPoint.DEV_TYPE_P2,
+            device_status=i,
+            ldsa=10.5 + i,
+            particle_number_concentration=1000 + i if i % 2 else None,
+        )
+        for i in range(n)
+    ]
+
+
+def test_data_buffer_matches_dataframe_path() -> None:
+    """The columnar buffer has to produce the same DataFrame as the row-by-row concat."""
+    data_df: dict[int, pd.DataFrame] = {}
+    data_buf: dict[int, NaneosDeviceDataBuffer] = {}
+
+    for point in _create_points(20):
+        data_df = NaneosDeviceDataPoint.add_data_point_to_dict(data_df, point)
+        data_buf = NaneosDeviceDataBuffer.add_data_point_to_dict(data_buf, point)
+
+    df_buf = NaneosDeviceDataBuffer.to_dataframe_dict(data_buf)[8617]
+    pd.testing.assert_frame_equal(data_df[8617], df_buf)
+
+
+def test_data_buffer_evicts_oldest_rows() -> None:
+    buffer = NaneosDeviceDataBuffer(max_rows=5)
+    points = _create_points(12)
+    for point in points:
+        buffer.append(point)
+
+    df = buffer.to_dataframe()
+    assert len(df) == 5
+    assert list(df.index) == [p.unix_timestamp for p in points[-5:]]
+    assert buffer.get_last("device_status") == 11
+
+
+def test_data_buffer_skips_points_without_timestamp() -> None:
+    data_buf: dict[int, NaneosDeviceDataBuffer] = {}
+    data_buf = NaneosDeviceDataBuffer.add_data_point_to_dict(
+        data_buf, NaneosDeviceDataPoint(serial_number=1)
+    )
+    assert NaneosDeviceDataBuffer.to_dataframe_dict(data_buf) == {}
+
+
+def test_data_buffer_extend_matches_append() -> None:
+    points = _create_points(9)
+
+    buffer_append = NaneosDeviceDataBuffer(max_rows=4)
+    for point in points:
+        buffer_append.append(point)
+
+    buffer_extend = NaneosDeviceDataBuffer(max_rows=4)
+    buffer_extend.extend(points[:3])
+    buffer_extend.extend(points[3:])
+
+    pd.testing.assert_frame_equal(buffer_append.to_dataframe(), buffer_extend.to_dataframe())
+
+
+def test_data_point_to_columns() -> None:
+    points = _create_points(3)
+    columns = NaneosDeviceDataPoint.to_columns(points)
+
+    assert tuple(columns) == NaneosDeviceDataPoint.FIELD_NAMES
+    assert columns["ldsa"] == (10.5, 11.5, 12.5)
+    assert columns["particle_number_concentration"] == (None, 1001, None)
+    assert points[0].to_dict() == {k: v[0] for k, v in columns.items() if v[0] is not None}
+
+
+def _create_frame(
+    serial_number: int,
+    seconds: list[int],
+    connection_type: str,
+    device_type: int = NaneosDeviceDataPoint.DEV_TYPE_P2,
+) -> dict[int, pd.DataFrame]:
+    """Manager output with one row per second, ldsa encodes the row for the assertions."""
+    points = [
+        NaneosDeviceDataPoint(
+            unix_timestamp=1_700_000_000_000 + s * 1000,
+            serial_number=serial_number,
+            connection_type=connection_type,
+            device_type=device_type,
+            ldsa=s + device_type / 10,
+        )
+        for s in seconds
+    ]
+    buffers = NaneosDeviceDataBuffer.add_data_points_to_dict({}, points)
+    return NaneosDeviceDataBuffer.to_dataframe_dict(buffers)
+
+
+def test_data_merger_matches_sort_and_clean() -> None:
+    adv = NaneosDeviceDataPoint.CONN_TYPE_ADVERTISEMENT
+    con = NaneosDeviceDataPoint.CONN_TYPE_CONNECTED
+    ser = NaneosDeviceDataPoint.CONN_TYPE_SERIAL
+    p2pro = NaneosDeviceDataPoint.DEV_TYPE_P2PRO
+    frames = [
+        _create_frame(1, [0, 1, 2], adv),
+        _create_frame(2, [5, 6], ser),
+        _create_frame(1, [3, 4], con),  # drops the advertisements of 1
+        _create_frame(2, [0, 1, 2], con),
+        _create_frame(1, [0], adv),
+        _create_frame(3, [8, 9], con),
+        _create_frame(3, [3, 4], con, p2pro),  # drops the P2 rows of 3
+        _create_frame(3, [10], con),
+        _create_frame(1, [1, 2], con),  # out of order
+        _create_frame(4, [1, 2], con),  # serial only without serial rows
+        _create_frame(5, [3], adv),
+    ]
+
+    merger = NaneosDataMerger()
+    data: dict[int, pd.DataFrame] = {}
+    for frame in frames:
+        merger.add(frame)
+        data = add_to_existing_naneos_data(data, frame)
+
+    expected = sort_and_clean_naneos_data(data, [4])
+    merged = merger.drain([4])
+
+    assert list(merged) == [1, 2, 3, 5]
+    assert sorted(expected) == sorted(merged)
+    for serial, df in expected.items():
+        pd.testing.assert_frame_equal(merged[serial], df)
+    assert merged[1]["ldsa"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert merger.drain() == {}
+
+
+def test_data_merger_resolves_equal_timestamps() -> None:
+    con = NaneosDeviceDataPoint.CONN_TYPE_CONNECTED
+    p2pro = NaneosDeviceDataPoint.DEV_TYPE_P2PRO
+
+    merger = NaneosDataMerger()
+    merger.add(_create_frame(1, [0, 1], con))
+    merger.add(_create_frame(1, [1, 2], con, p2pro))
+    merger.add(_create_frame(1, [2, 3], con))  # P2 rows after P2PRO rows are ignored
+    merger.add(_create_frame(1, [3], con, p2pro))
+    merger.add(_create_frame(2, [0], con))
+    merger.discard(2)
+
+    merged = merger.drain()
+    assert list(merged) == [1]
+    assert merged[1]["ldsa"].tolist() == pytest.approx([1.2, 2.2, 3.2])
+
+
+def test_line_parser_matches_type_cast() -> None:
+    """The compiled parser has to give the same values as casting every value on its own."""
+    data_structure = dict(PARTECTOR2_DATA_STRUCTURE_V320)
+    data_structure.update(PARTECTOR2_OUTPUT_PULSE_DIAGNOSTIC_ADDITIONAL_DATA_STRUCTURE)
+    data_structure.update(PARTECTOR2_GAIN_TEST_ADDITIONAL_DATA_STRUCTURE)
+    types = list(data_structure.values())
+
+    lines: list[list] = [
+        [1_700_000_000_000 + i]
+        + [str(i + j) if t is int else f"{(i + j) * 1.25:.2f}" for j, t in enumerate(types[1:])]
+        for i in range(10)
+    ]
+    lines[4][3] = "x"  # broken value -> line gets dropped
+    lines[6][-1] = ""  # missing value -> line gets dropped
+    lines.append(lines[0][:-1])  # wrong length -> line gets dropped
+
+    parser = PartectorLineParser.compile(data_structure)
+    index, columns = parser.parse(lines)
+
+    expected = [
+        [t(v) for v, t in zip(line, types)] for i, line in enumerate(lines) if i not in (4, 6, 10)
+    ]
+
+    assert index.tolist() == [row[0] for row in expected]
+    for pos, name in enumerate(data_structure):
+        if name in columns:
+            assert columns[name].tolist() == [row[pos] for row in expected], name
+    assert parser is PartectorLineParser.compile(dict(data_structure))
+
+
+def test_line_framer_keeps_partial_lines() -> None:
+    framer = SerialLineFramer()
+
+    assert framer.feed(b"1\t2.5\r") == []
+    assert framer.feed(b"\n3\t4") == ["1\t2.5"]
+    assert framer.feed(b".5\x00\r\n\r\n5\t6\n7") == ["3\t4.5", "5\t6"]
+    assert len(framer) == 1
+
+    framer.clear()
+    assert framer.feed(b"8\n") == ["8"]
+
+
+def test_command_channel_matches_response_length() -> None:
+    channel = PartectorCommandChannel()
+    unmatched: list[list] = []
+
+    def reader() -> None:
+        for data in ([1, "a", "b"], [2, "8617"]):  # unrelated info line first
+            if not channel.resolve(data):
+                unmatched.append(data)
+
+    def write() -> None:
+        threading.Thread(target=reader).start()
+
+    assert channel.request(write, expected_length=2, timeout=1.0) == [2, "8617"]
+    assert unmatched == [[1, "a", "b"]]
+    assert channel.resolve([3, "late"]) is False
+
+    with pytest.raises(ValueError):
+        channel.request(lambda: None, expected_length=2, timeout=0.01)
@@ -0,0 +1,59 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import naneos.partector.scanPartector as scan_module
+from naneos.partector.scanPartector import SerialPartectorDiscovery
+from naneos.serial_utils import SerialHotplugWatcher
+
+
+@pytest.mark.skipif(not SerialHotplugWatcher.is_supported(), reason="inotify not available")
+def test_hotplug_watcher_reports_tty_nodes(tmp_path) -> None:
+    watcher = SerialHotplugWatcher(watch_paths=(str(tmp_path),))
+    watcher.start()
+    try:
+        assert watcher.wait(0.01) == set()
+
+        (tmp_path / "ttyACM7").touch()
+        (tmp_path / "null7").touch()  # not a tty -> ignored
+        assert watcher.wait(1.0) == {os.path.realpath(tmp_path / "ttyACM7")}
+
+        (tmp_path / "ttyACM7").unlink()
+        assert watcher.wait(1.0) == {os.path.realpath(tmp_path / "ttyACM7")}
+    finally:
+        watcher.close()
+
+
+def test_discovery_retries_port_without_firmware(monkeypatch) -> None:
+    """A Partector whose firmware query failed is not cached as P2, it gets probed again."""
+    replies: list[dict] = [{"_sn": 8617}, {"_sn": 8617, "_fw": 320}]
+
+    class FakeScanPartector:
+        def __init__(self, port: str) -> None:
+            self.__dict__.update(replies.pop(0))
+
+        def write_line(self, line: str) -> list:
+            assert line == "name?"
+            return [0, "P2pro"]
+
+        def close(self, blocking: bool = False) -> None:
+            pass
+
+    port = SimpleNamespace(device="/dev/ttyACM0", serial_number="x", vid=1, pid=2, location="1")
+    now = [1000.0]
+    monkeypatch.setattr(scan_module, "ScanPartector", FakeScanPartector)
+    monkeypatch.setattr(scan_module, "list_dosemet_ports", lambda: [port])
+    monkeypatch.setattr(scan_module, "_check_port_function", lambda ports: True)
+    monkeypatch.setattr(scan_module.time, "time", lambda: now[0])
+
+    discovery = SerialPartectorDiscovery()
+    try:
+        assert discovery.scan()["P2"] == {}  # f? timed out: unknown, not P2
+
+        now[0] += SerialPartectorDiscovery.NEGATIVE_RETRY_S + 1
+        result = discovery.scan()
+        assert result["P2"] == {}
+        assert result["P2pro"] == {8617: "/dev/ttyACM0"}
+    finally:
+        discovery.close()
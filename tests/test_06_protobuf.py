@@ -0,0 +1,240 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import naneos.protobuf.protoV1_pb2 as pbScheme
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+from naneos.partector.blueprints._metric_schema import METRICS, PROTO_METRICS
+from naneos.protobuf.columnar import (
+    create_columnar_device,
+    create_columnar_entry,
+    create_data_from_columnar_entry,
+    create_dataframe_from_columnar_device,
+)
+from naneos.protobuf.protobuf import (
+    create_combined_entry,
+    create_data_from_combined_entry,
+    create_dataframe_from_proto_device,
+    create_proto_device,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+ABS_TIME = 1_720_000_000
+
+# old column names of the test pickles -> current names
+LEGACY_COLUMNS = {
+    "number": "particle_number_concentration",
+    "diameter": "average_particle_diameter",
+    "LDSA": "ldsa",
+    "surface": "particle_surface",
+    "sigma": "sigma_size_dist",
+    "idiff_global": "diffusion_current",
+    "ucor_global": "corona_voltage",
+    "T": "temperature",
+    "RHcorr": "relative_humidity",
+    "P_average": "ambient_pressure",
+    "batt_voltage": "battery_voltage",
+    "steps": "steps_inversion",
+    "current_0": "current_dist_0",
+    "current_1": "current_dist_1",
+    "current_2": "current_dist_2",
+    "current_3": "current_dist_3",
+    "current_4": "current_dist_4",
+    "em_gain1": "electrometer_1_gain",
+    "em_gain2": "electrometer_2_gain",
+    "EM_amplitude1": "electrometer_1_amplitude",
+    "EM_amplitude2": "electrometer_2_amplitude",
+    "dP": "differential_pressure",
+}
+
+
+def _load_pickle(name: str, rename: bool) -> pd.DataFrame:
+    """Loads a test pickle and prepares it like NaneosUploadThread.upload()."""
+    df = pd.read_pickle(os.path.join(DATA_DIR, name))
+    if rename:
+        df = df.rename(columns=LEGACY_COLUMNS)
+
+    df = df.replace([float("inf"), -float("inf")], 0)
+    if df.index[0] > 1e12:
+        df.index = df.index / 1e3
+        df.index = df.index.astype(int)
+    return df
+
+
+def _edge_case_frame() -> pd.DataFrame:
+    """Rounding, clipping, missing and out of range values."""
+    index = pd.Index([ABS_TIME - 10 + i for i in range(8)] + [ABS_TIME + 5], dtype="int64")
+    nan = np.nan
+    return pd.DataFrame(
+        {
+            "device_status": [3.7, 1, nan, 0, 2**32, 5, 6, 7, 8],
+            "firmware_version": [20240101, nan, 1, 2, 3, 4, 5, 6, 7],
+            "ldsa": [12.345, 0.005, -1.0, nan, 1e3, 2.675, 0.125, 7.0, 1.0],
+            "particle_number_concentration": [2.5, 3.5, 1e9, nan, 0.5, 1.5, 4.5, 0, 1],
+            "diffusion_current": [-0.5, 0.015, 1.005, nan, 2.0, -1e12, 0.0, 3.3, 1],
+            "diffusion_current_offset": [-1.234, 0.5, nan, -0.005, 1, 2, 3, 4, 5],
+            "diffusion_current_stddev": [0.123, nan, 0.335, 1, 2, 3, 4, 5, 6],
+            "diffusion_current_delay_on": [-3.0, 2.5, nan, 1.5, 0, 1, 2, 3, 4],
+            "diffusion_current_delay_off": [4.5, -0.4, 5.5, nan, 0, 1, 2, 3, 4],
+            "electrometer_1_amplitude": [-12.34, 0.05, 0.15, nan, 1, 2, 3, 4, 5],
+            "electrometer_2_amplitude": [1.25, -0.25, nan, 3, 4, 5, 6, 7, 8],
+            "temperature": [-5.5, 21.5, 22.5, nan, 1, 2, 3, 4, 5],
+            "flow_from_dp": [1.0005, 0.9995, nan, 1.2345, 1, 1, 1, 1, 1],
+            "ambient_pressure": [965.25, nan, 1013.35, 1000, 1, 2, 3, 4, 5],
+            "pump_current": [0.0125, 0.0135, nan, 1, 2, 3, 4, 5, 6],
+            "current_dist_0": [0.000125, -0.00001, nan, 1, 2, 3, 4, 5, 6],
+            "sigma_size_dist": [1.625, nan, 1.635, 1, 2, 3, 4, 5, 6],
+            "supply_voltage_5V": [5.05, 4.95, nan, 5, 5, 5, 5, 5, 5],
+            " usb_cc_voltage": [0.85, nan, 0.95, 1, 2, 3, 4, 5, 6],
+            "usb_cc_voltage": [9.0, 9.0, 9.0, 9.0, 9.0, 9.0, 9.0, 9.0, 9.0],
+            "cs_status": [1, 0, -1.9, nan, 2, 3, 4, 5, 6],
+            "pump_voltage": [nan, 12.345, 5.005, 1, 2, 3, np.inf, 5, 6],
+            "not_a_device_point_field": ["a", "b", "c", "d", "e", "f", "g", "h", "i"],
+        },
+        index=index,
+    )
+
+
+def _buffer_frame() -> pd.DataFrame:
+    """
+    Frame with the nullable dtypes of the data point buffer. The row wise encoder dropped all rows
+    of such frames (numpy.int64 row names), the golden file is its output for the object frame.
+    """
+    return pd.DataFrame(
+        {
+            "device_type": pd.array([1, 1, 1, 1], dtype="Int32"),
+            "device_status": pd.array([0, None, 4, 1], dtype="Int32"),
+            "ldsa": pd.array([12.3, None, 0.7, 3.21], dtype="Float32"),
+            "particle_number_concentration": pd.array([1234.5, 2.5, None, 10], dtype="Float32"),
+            "average_particle_diameter": pd.array([45.5, 46.5, 47.1, None], dtype="Float32"),
+            "diffusion_current": pd.array([0.123, -0.2, None, 0.335], dtype="Float32"),
+            "battery_voltage": pd.array([3.915, 4.005, 3.3, None], dtype="Float32"),
+            "temperature": pd.array([21.5, None, -3.5, 22.5], dtype="Float32"),
+        },
+        index=pd.Index([ABS_TIME - 4, ABS_TIME - 3, ABS_TIME - 2, ABS_TIME - 1], dtype="int64"),
+    )
+
+
+def _float32_frame() -> pd.DataFrame:
+    """Only float32 columns, rows are evaluated in float32 arithmetic."""
+    return pd.DataFrame(
+        {
+            "ldsa": np.array([12.345, 0.005, 1.1], dtype=np.float32),
+            "particle_mass": np.array([1.115, 2.225, np.nan], dtype=np.float32),
+            "ambient_pressure": np.array([965.25, 1013.35, 999.95], dtype=np.float32),
+        },
+        index=pd.Index([ABS_TIME - 3, ABS_TIME - 2, ABS_TIME - 1], dtype="uint32"),
+    )
+
+
+GOLDEN_FRAMES = {
+    "p2_pro": lambda: _load_pickle("p2_pro_test_data.pkl", rename=False),
+    "p2_pro_renamed": lambda: _load_pickle("p2_pro_test_data.pkl", rename=True),
+    "p2": lambda: _load_pickle("p2_test_data.pkl", rename=False),
+    "p2_renamed": lambda: _load_pickle("p2_test_data.pkl", rename=True),
+    "edge_cases": _edge_case_frame,
+    "buffer": _buffer_frame,
+    "float32": _float32_frame,
+}
+
+
+def _golden_path(name: str) -> str:
+    return os.path.join(DATA_DIR, f"proto_device_{name}.bin")
+
+
+@pytest.mark.parametrize("name", sorted(GOLDEN_FRAMES))
+def test_create_proto_device_golden(name: str) -> None:
+    device = create_proto_device(777, ABS_TIME, GOLDEN_FRAMES[name]())
+
+    with open(_golden_path(name), "rb") as f:
+        assert device.SerializeToString() == f.read()
+
+
+def test_create_proto_device_drops_invalid_rows() -> None:
+    device = create_proto_device(777, ABS_TIME, _edge_case_frame())
+
+    # negative uint32 (rows 1, 2), device_status > uint32 (4), inf (6) and future timestamp (8)
+    assert [point.timestamp for point in device.device_points] == [10, 7, 5, 3]
+    assert device.device_points[0].diffusion_current == 0
+    assert not device.device_points[0].HasField("pump_voltage")
+    assert device.device_points[0].usb_cc_voltage == 90  # " usb_cc_voltage" is not a metric
+
+
+def test_create_proto_device_nullable_index() -> None:
+    df = _buffer_frame()
+    df.index = df.index.astype("Int64")
+
+    device = create_proto_device(777, ABS_TIME, df)
+    assert [point.timestamp for point in device.device_points] == [4, 3, 2, 1]
+
+
+def test_metric_schema_matches_data_point_and_protobuf() -> None:
+    assert tuple(metric.name for metric in METRICS) == NaneosDeviceDataPoint.FIELD_NAMES
+
+    proto_fields = set(pbScheme.DevicePoint.DESCRIPTOR.fields_by_name)
+    assert {metric.proto_field for metric in PROTO_METRICS} <= proto_fields
+
+
+def test_decode_proto_device_round_trip() -> None:
+    df = _buffer_frame()
+    device = create_proto_device(777, ABS_TIME, df)
+
+    decoded = create_dataframe_from_proto_device(device, ABS_TIME)
+    assert decoded.index.tolist() == df.index.tolist()
+    assert (decoded["serial_number"] == 777).all()
+    assert str(decoded["ldsa"].dtype) == "Float32"
+    assert decoded["device_status"].tolist() == [0, pd.NA, 4, 1]
+    assert decoded["diffusion_current"].tolist()[1] == 0.0  # negative values are sent as 0
+    assert decoded["battery_voltage"].tolist()[:3] == pytest.approx([3.91, 4.01, 3.3], abs=1e-6)
+    assert decoded["temperature"].isna().tolist() == [False, True, False, False]
+
+    # decoded values encode to the same fixed point values (ldsa is truncated, not rounded)
+    reencoded = create_proto_device(777, ABS_TIME, decoded.drop(columns=["ldsa"]))
+    expected = create_proto_device(777, ABS_TIME, df.drop(columns=["ldsa"]))
+    assert reencoded.SerializeToString() == expected.SerializeToString()
+
+    combined = create_combined_entry([device], ABS_TIME)
+    data = create_data_from_combined_entry(combined)
+    assert list(data) == [777]
+    pd.testing.assert_frame_equal(data[777], decoded)
+
+
+@pytest.mark.parametrize("name", sorted(GOLDEN_FRAMES))
+def test_columnar_device_decodes_like_proto_device(name: str) -> None:
+    df = GOLDEN_FRAMES[name]()
+    device = create_proto_device(777, ABS_TIME, df)
+    series = create_columnar_device(777, ABS_TIME, df)
+
+    expected = create_dataframe_from_proto_device(device, ABS_TIME)
+    decoded = create_dataframe_from_columnar_device(series, ABS_TIME)
+    pd.testing.assert_frame_equal(decoded, expected)
+
+
+def test_columnar_device_deltas_and_presence() -> None:
+    df = _buffer_frame()
+    series = create_columnar_device(777, ABS_TIME, df)
+
+    assert list(series.timestamps) == [4, -1, -1, -1]
+    columns = {column.field_number: column for column in series.columns}
+
+    device_status = columns[pbScheme.DevicePoint.DESCRIPTOR.fields_by_name["device_status"].number]
+    assert device_status.presence == bytes([0b1101])
+    assert list(device_status.values) == [0, 4, -3]
+
+    temperature = columns[pbScheme.DevicePoint.DESCRIPTOR.fields_by_name["temperature"].number]
+    assert list(temperature.values) == [22, -26, 26]  # rounded half to even: 22, -4, 22
+
+
+def test_columnar_entry_round_trip() -> None:
+    df = _buffer_frame()
+    columnar = create_columnar_entry([create_columnar_device(777, ABS_TIME, df)], ABS_TIME)
+
+    parsed = type(columnar).FromString(columnar.SerializeToString())
+    data = create_data_from_columnar_entry(parsed)
+
+    combined = create_combined_entry([create_proto_device(777, ABS_TIME, df)], ABS_TIME)
+    expected = create_data_from_combined_entry(combined)
+    assert list(data) == [777]
+    pd.testing.assert_frame_equal(data[777], expected[777])
@@ -0,0 +1,110 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from naneos.iotweb.naneos_upload_worker import NaneosUploadWorker
+
+
+class FakeUpload:
+    """Records the uploaded snapshots, blocks until release() if gated."""
+
+    def __init__(self, gated: bool = False, status_code: int = 200) -> None:
+        self.uploaded: list[int] = []
+        self.status_code = status_code
+        self._gate = threading.Event()
+        if not gated:
+            self._gate.set()
+
+    def release(self) -> None:
+        self._gate.set()
+
+    def __call__(self, data: dict[int, pd.DataFrame]) -> SimpleNamespace:
+        self._gate.wait(5)
+        self.uploaded.append(next(iter(data)))
+        return SimpleNamespace(status_code=self.status_code)
+
+
+def _snapshot(sn: int) -> dict[int, pd.DataFrame]:
+    return {sn: pd.DataFrame({"ldsa": [1.0]}, index=[1_720_000_000])}
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_submit_does_not_wait_and_drops_oldest() -> None:
+    upload = FakeUpload(gated=True)
+    worker = NaneosUploadWorker(max_queue_size=2, upload=upload)
+    worker.start()
+
+    worker.submit(_snapshot(1))
+    _wait_for(lambda: worker.get_pending_count() == 0)  # 1 is uploading and blocks
+
+    start = time.time()
+    for sn in (2, 3, 4):
+        assert worker.submit(_snapshot(sn))
+    assert time.time() - start < 0.5
+
+    upload.release()
+    worker.stop(timeout=5)
+
+    assert upload.uploaded == [1, 3, 4]
+    assert worker.get_counters() == {
+        "submitted": 4,
+        "uploaded": 3,
+        "failed": 0,
+        "dropped": 1,
+        "spilled": 0,
+    }
+
+
+def test_block_policy_times_out() -> None:
+    upload = FakeUpload(gated=True)
+    worker = NaneosUploadWorker(max_queue_size=1, policy="block", block_timeout=0.1, upload=upload)
+    worker.start()
+
+    worker.submit(_snapshot(1))
+    _wait_for(lambda: worker.get_pending_count() == 0)
+    assert worker.submit(_snapshot(2))
+    assert not worker.submit(_snapshot(3))
+
+    upload.release()
+    worker.stop(timeout=5)
+    assert upload.uploaded == [1, 2]
+
+
+def test_spill_policy_survives_restart(tmp_path) -> None:
+    upload = FakeUpload(gated=True)
+    worker = NaneosUploadWorker(max_queue_size=1, policy="spill", spill_dir=tmp_path, upload=upload)
+    worker.start()
+
+    worker.submit(_snapshot(1))
+    _wait_for(lambda: worker.get_pending_count() == 0)
+    for sn in (2, 3, 4):
+        assert worker.submit(_snapshot(sn))
+    assert worker.get_counters()["spilled"] == 2
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+    # stop before the spilled snapshots are uploaded, they stay on disk
+    worker._stop_event.set()
+    upload.release()
+    worker.stop(timeout=5)
+    assert upload.uploaded == [1, 2]
+
+    upload = FakeUpload(status_code=500)
+    results: list[bool] = []
+    worker = NaneosUploadWorker(
+        policy="spill", spill_dir=tmp_path, upload=upload, callback=results.append
+    )
+    worker.start()
+    _wait_for(lambda: len(upload.uploaded) == 2)
+    worker.stop(timeout=5)
+
+    assert upload.uploaded == [3, 4]
+    assert results == [False, False]
+    assert not list(tmp_path.glob("*.pkl"))
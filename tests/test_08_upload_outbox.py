@@ -0,0 +1,126 @@
+import time
+from types import SimpleNamespace
+
+import naneos.protobuf.protoV1_pb2 as pbScheme
+from naneos.iotweb.naneos_upload_outbox import NaneosUploadOutbox
+from naneos.iotweb.naneos_upload_worker import NaneosUploadWorker
+from naneos.protobuf.protobuf import merge_combined_entries
+
+
+def _entry(abs_timestamp: int, sn: int, *timestamps: int) -> pbScheme.CombinedData:
+    entry = pbScheme.CombinedData(abs_timestamp=abs_timestamp)
+    device = entry.devices.add(type=2, serial_number=sn)
+    for timestamp in timestamps:
+        device.device_points.add(timestamp=timestamp, ldsa=timestamp)
+    return entry
+
+
+def _unix_times(entry: pbScheme.CombinedData) -> dict[int, list[int]]:
+    return {
+        device.serial_number: [entry.abs_timestamp - p.timestamp for p in device.device_points]
+        for device in entry.devices
+    }
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_outbox_is_fifo_persistent_and_bounded(tmp_path) -> None:
+    path = tmp_path / "outbox.sqlite3"
+    outbox = NaneosUploadOutbox(path, max_bytes=25)
+    for payload in (b"a" * 10, b"b" * 10, b"c" * 10):
+        outbox.append(payload)
+
+    assert outbox.get_evicted_count() == 1  # oldest first
+    assert [payload for _, payload in outbox.peek(100)] == [b"b" * 10, b"c" * 10]
+    assert len(outbox.peek(15)) == 1
+    assert len(outbox.peek(0)) == 1  # the oldest payload is always returned
+    outbox.close()
+
+    outbox = NaneosUploadOutbox(path, max_bytes=25)
+    rows = outbox.peek(100)
+    assert outbox.get_pending_bytes() == 20
+    outbox.remove([rows[0][0]])
+    assert [payload for _, payload in outbox.peek(100)] == [b"c" * 10]
+    outbox.close()
+
+
+def test_merge_combined_entries_keeps_unix_times() -> None:
+    entries = [_entry(1000, 1, 10, 5), _entry(1030, 2, 3), _entry(1060, 1, 1)]
+    merged = merge_combined_entries(entries)
+
+    assert merged.abs_timestamp == 1060
+    assert _unix_times(merged) == {1: [990, 995, 1059], 2: [1027]}
+
+
+class FastRetryWorker(NaneosUploadWorker):
+    RETRY_MIN_S = 0.05
+    RETRY_MAX_S = 0.1
+    POLL_INTERVAL = 0.01
+
+
+def test_worker_retries_and_merges_stored_payloads(tmp_path) -> None:
+    outbox = NaneosUploadOutbox(tmp_path / "outbox.sqlite3")
+    sent: list[pbScheme.CombinedData] = []
+    failures = {"left": 2}
+
+    def post(payload: bytes) -> SimpleNamespace:
+        if failures["left"]:
+            failures["left"] -= 1
+            raise ConnectionError("no connection")
+        entry = pbScheme.CombinedData()
+        entry.ParseFromString(payload)
+        sent.append(entry)
+        return SimpleNamespace(status_code=200)
+
+    snapshots = iter([_entry(1000, 1, 10), _entry(1005, 1, 2), _entry(1010, 2, 1)])
+    worker = FastRetryWorker(
+        outbox=outbox,
+        create_payload=lambda _: next(snapshots).SerializeToString(),
+        post=post,
+    )
+    worker.start()
+    for _ in range(3):
+        worker.submit({})
+
+    _wait_for(lambda: worker.get_counters()["uploaded"] == 3)
+    worker.stop(timeout=5)
+
+    assert worker.get_counters()["failed"] == 2
+    assert outbox.get_pending_count() == 0
+    unix_times: dict[int, list[int]] = {}
+    for entry in sent:
+        for sn, times in _unix_times(entry).items():
+            unix_times.setdefault(sn, []).extend(times)
+    assert unix_times == {1: [990, 1003], 2: [1009]}
+    outbox.close()
+
+
+def test_worker_drops_rejected_payload(tmp_path) -> None:
+    outbox = NaneosUploadOutbox(tmp_path / "outbox.sqlite3")
+    for entry in (_entry(1000, 1, 1), _entry(1000, 666, 1), _entry(1000, 2, 1)):
+        outbox.append(entry.SerializeToString())
+
+    delivered: list[int] = []
+
+    def post(payload: bytes) -> SimpleNamespace:
+        entry = pbScheme.CombinedData()
+        entry.ParseFromString(payload)
+        serials = [device.serial_number for device in entry.devices]
+        if 666 in serials:
+            return SimpleNamespace(status_code=400)
+        delivered.extend(serials)
+        return SimpleNamespace(status_code=200)
+
+    worker = FastRetryWorker(outbox=outbox, post=post)
+    worker.start()
+    _wait_for(lambda: outbox.get_pending_count() == 0)
+    worker.stop(timeout=5)
+
+    assert delivered == [1, 2]
+    assert worker.get_counters()["dropped"] == 1
+    outbox.close()
@@ -0,0 +1,68 @@
+import base64
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from naneos.iotweb.naneos_uploader import NaneosUploader
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    requests: list[tuple[int, dict[str, str], bytes]] = []
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        RecordingHandler.requests.append((self.client_address[1], dict(self.headers), body))
+
+        content = b'{"ok":true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    RecordingHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/proto/v1"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_uploader_reuses_connection_and_compresses(server) -> None:
+    uploader = NaneosUploader(server, compression="gzip")
+    payload = bytes(range(256)) * 8
+
+    for _ in range(2):
+        assert uploader.post(payload).status_code == 200
+    uploader.close()
+
+    (port_1, headers, body), (port_2, _, _) = RecordingHandler.requests
+    assert port_1 == port_2  # same TCP connection
+    assert headers["Content-Encoding"] == "gzip"
+
+    envelope = json.loads(gzip.decompress(body))
+    assert envelope["gateway"] == "python_webhook"
+    assert base64.b64decode(envelope["data"]) == payload
+
+    stats = uploader.get_stats()
+    assert stats["total"]["requests"] == 2
+    assert stats["last"]["payload_bytes"] == len(payload)
+    assert stats["last"]["body_bytes"] > len(body)
+    assert stats["last"]["sent_bytes"] > len(body)
+    assert stats["last"]["received_bytes"] > len(b'{"ok":true}')
+
+
+def test_uploader_rejects_unknown_compression() -> None:
+    with pytest.raises(ValueError):
+        NaneosUploader(compression="brotli")
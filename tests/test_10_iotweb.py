@@ -1,3 +1,128 @@
+import datetime as dt
+import re
+import threading
+
+import pandas as pd
+import pytest
+
+from naneos.iotweb.download import downloader
+
+
+class _FakeInfluxClient:
+    """Answers the chunk queries with one row per hour, records the queried ranges."""
+
+    queries: list[tuple[int, int]] = []
+    fail_after: int | None = None
+    lock = threading.Lock()
+
+    def __init__(self, **kwargs) -> None:
+        self.kwargs = kwargs
+
+    def __enter__(self) -> "_FakeInfluxClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def query_api(self) -> "_FakeInfluxClient":
+        return self
+
+    def query_data_frame(self, query: str) -> pd.DataFrame:
+        match = re.search(r"range\(start: (\d+), stop: (\d+)\)", query)
+        assert match is not None
+        t1, t2 = int(match.group(1)), int(match.group(2))
+        with self.lock:
+            if self.fail_after is not None and len(self.queries) >= self.fail_after:
+                raise ConnectionError("connection lost")
+            self.queries.append((t1, t2))
+
+        hours = range((t1 + 3599) // 3600 * 3600, t2, 3600)
+        return pd.DataFrame(
+            {
+                "result": "_result",
+                "table": 0,
+                "_time": pd.to_datetime(list(hours), unit="s", utc=True),
+                "ldsa": [float(t) for t in hours],
+            }
+        )
+
+
+@pytest.fixture
+def fake_influx(monkeypatch):
+    _FakeInfluxClient.queries = []
+    _FakeInfluxClient.fail_after = None
+    monkeypatch.setattr(downloader, "InfluxDBClient", _FakeInfluxClient)
+    return _FakeInfluxClient
+
+
+def test_download_chunks_are_aligned() -> None:
+    start = dt.datetime(2025, 4, 1, 12, tzinfo=dt.timezone.utc)
+    stop = dt.datetime(2025, 4, 6, tzinfo=dt.timezone.utc)
+
+    chunks = downloader.create_aligned_start_stop_timestamp(start, stop)
+    assert chunks[0][0] == int(start.timestamp())
+    assert chunks[-1][1] == int(stop.timestamp())
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+    assert all(t2 % downloader.CHUNK_SECONDS == 0 for _, t2 in chunks[:-1])
+
+
+def test_download_parallel_matches_sequential(fake_influx, tmp_path) -> None:
+    start = dt.datetime(2025, 4, 1, tzinfo=dt.timezone.utc)
+    stop = dt.datetime(2025, 4, 11, tzinfo=dt.timezone.utc)
+
+    df = downloader.download_from_iotweb(
+        "bucket", "8134", start, stop, "token", workers=4, cache_dir=None
+    )
+    df_seq = downloader.download_from_iotweb(
+        "bucket", "8134", start, stop, "token", workers=1, cache_dir=None
+    )
+
+    assert len(df) == 10 * 24
+    assert df.index.is_monotonic_increasing
+    assert list(df.columns) == ["ldsa"]
+    pd.testing.assert_frame_equal(df, df_seq)
+
+
+def test_download_cache_resumes(fake_influx, tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    start = dt.datetime(2025, 4, 1, tzinfo=dt.timezone.utc)
+    stop = dt.datetime(2025, 4, 11, tzinfo=dt.timezone.utc)
+    n_chunks = len(downloader.create_aligned_start_stop_timestamp(start, stop))
+
+    fake_influx.fail_after = 2
+    with pytest.raises(ConnectionError):
+        downloader.download_from_iotweb(
+            "bucket", "8134", start, stop, "token", workers=1, cache_dir=tmp_path
+        )
+    assert len(fake_influx.queries) == 2
+
+    fake_influx.fail_after = None
+    df = downloader.download_from_iotweb("bucket", "8134", start, stop, "token", cache_dir=tmp_path)
+    assert len(fake_influx.queries) == n_chunks  # only the missing chunks
+    assert len(df) == 10 * 24
+
+    # a part of the cached range and an open ended range
+    now = dt.datetime.now(dt.timezone.utc)
+    part = downloader.download_from_iotweb(
+        "bucket",
+        "8134",
+        start + dt.timedelta(hours=5),
+        start + dt.timedelta(days=1),
+        "token",
+        cache_dir=tmp_path,
+    )
+    assert len(fake_influx.queries) == n_chunks
+    assert len(part) == 19
+
+    downloader.download_from_iotweb(
+        "bucket", "8134", now - dt.timedelta(hours=3), now, "token", cache_dir=tmp_path
+    )
+    downloader.download_from_iotweb(
+        "bucket", "8134", now - dt.timedelta(hours=3), now, "token", cache_dir=tmp_path
+    )
+    assert len(fake_influx.queries) >= n_chunks + 2  # never cached
+
+
 # import datetime as dt
 # import os
 
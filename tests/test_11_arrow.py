@@ -0,0 +1,136 @@
+import datetime
+import queue
+
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from naneos.arrow import (  # noqa: E402
+    NANEOS_ARROW_SCHEMA,
+    NaneosParquetSink,
+    create_arrow_snapshot,
+    create_data_from_arrow_snapshot,
+)
+from naneos.partector.blueprints._data_buffer import NaneosDeviceDataBuffer  # noqa: E402
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint  # noqa: E402
+
+T0 = 1_700_000_000_000  # 2023-11-14 22:13:20 UTC, ms
+
+
+def _snapshot(seconds: dict[int, list[int]]) -> dict[int, pd.DataFrame]:
+    points = [
+        NaneosDeviceDataPoint(
+            unix_timestamp=T0 + s * 1000,
+            serial_number=serial,
+            connection_type=NaneosDeviceDataPoint.CONN_TYPE_CONNECTED,
+            device_type=NaneosDeviceDataPoint.DEV_TYPE_P2,
+            ldsa=s + 0.5,
+            temperature=None if s % 2 else 21.5,
+        )
+        for serial, serial_seconds in seconds.items()
+        for s in serial_seconds
+    ]
+    buffers = NaneosDeviceDataBuffer.add_data_points_to_dict({}, points)
+    return NaneosDeviceDataBuffer.to_dataframe_dict(buffers)
+
+
+def test_arrow_snapshot_round_trip() -> None:
+    snapshot = _snapshot({1: [0, 1, 2], 2: [0, 1]})
+
+    table = create_arrow_snapshot(snapshot)
+    assert table.schema == NANEOS_ARROW_SCHEMA
+    assert table.num_rows == 5
+    assert table.column("temperature").null_count == 2
+
+    data = create_data_from_arrow_snapshot(table)
+    assert list(data) == [1, 2]
+    for serial, df in snapshot.items():
+        pd.testing.assert_frame_equal(data[serial], df)
+
+
+def test_arrow_snapshot_does_not_copy_values() -> None:
+    df = _snapshot({1: [0, 1, 2]})[1]
+    table = create_arrow_snapshot({1: df})
+
+    ldsa = table.column("ldsa").chunk(0)
+    assert ldsa.buffers()[1].address == df["ldsa"].array._data.ctypes.data
+
+
+def test_parquet_sink_partitions_and_reads(tmp_path) -> None:
+    day = 86_400
+    with NaneosParquetSink(tmp_path) as sink:
+        sink.write(_snapshot({1: [0, 1], 2: [0]}))
+        sink.write(create_arrow_snapshot(_snapshot({1: [2, day]})))
+
+        assert NaneosParquetSink.read(tmp_path) == {}  # open files are hidden
+
+    assert sink.get_counters() == {"rows": 5, "row_groups": 3, "files": 2}
+    assert sorted(p.parent.name for p in tmp_path.glob("*/*.parquet")) == [
+        "date=2023-11-14",
+        "date=2023-11-15",
+    ]
+
+    data = NaneosParquetSink.read(tmp_path)
+    assert data[1].index.tolist() == [T0, T0 + 1000, T0 + 2000, T0 + day * 1000]
+    assert data[2].index.tolist() == [T0]
+    assert str(data[1]["ldsa"].dtype) == "Float32"
+
+    start = datetime.datetime.fromtimestamp(T0 / 1e3 + 1, tz=datetime.timezone.utc)
+    end = start + datetime.timedelta(hours=1)
+    data = NaneosParquetSink.read(tmp_path, start=start, end=end, serial_numbers=[1])
+    assert list(data) == [1]
+    assert data[1].index.tolist() == [T0 + 1000, T0 + 2000]
+
+
+def test_parquet_sink_rolls_files(tmp_path) -> None:
+    sink = NaneosParquetSink(tmp_path, partition="hour", roll_seconds=0)
+    sink.write(_snapshot({1: [0]}))
+    sink.write(_snapshot({1: [1]}))
+
+    assert sink.get_counters()["files"] == 2
+    assert len(list(tmp_path.glob("date=2023-11-14/hour=22/*.parquet"))) == 2
+    data = NaneosParquetSink.read(tmp_path, partition="hour")
+    assert data[1].index.tolist() == [T0, T0 + 1000]
+
+    # the hour partitions prune the directories
+    sink.write(_snapshot({1: [3600]}))
+    start = datetime.datetime.fromtimestamp(T0 / 1e3 + 3600, tz=datetime.timezone.utc)
+    data = NaneosParquetSink.read(tmp_path, start=start, partition="hour")
+    assert data[1].index.tolist() == [T0 + 3600_000]
+
+
+def test_manager_publishes_arrow_snapshots(tmp_path) -> None:
+    from naneos.manager.naneos_device_manager import NaneosDeviceManager
+
+    manager = NaneosDeviceManager(use_serial=False, use_ble=False, parquet_path=tmp_path)
+    out_q: queue.Queue = queue.Queue()
+    manager.register_output_queue(out_q, snapshot_format="arrow")
+
+    manager._publish_snapshot(_snapshot({1: [0, 1]}))
+    manager._parquet_sink.close()
+
+    table = out_q.get_nowait()
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == 2
+    assert len(NaneosParquetSink.read(tmp_path)[1]) == 2
+
+    with pytest.raises(ValueError):
+        manager.register_output_queue(out_q, snapshot_format="csv")
+
+
+def test_manager_falls_back_to_pandas_snapshot(tmp_path, monkeypatch) -> None:
+    import naneos.arrow
+    from naneos.manager.naneos_device_manager import NaneosDeviceManager
+
+    def broken(data):
+        raise pa.ArrowInvalid("could not cast")
+
+    monkeypatch.setattr(naneos.arrow, "create_arrow_snapshot", broken)
+    manager = NaneosDeviceManager(use_serial=False, use_ble=False, parquet_path=tmp_path)
+    out_q: queue.Queue = queue.Queue()
+    manager.register_output_queue(out_q, snapshot_format="arrow")
+
+    snapshot = _snapshot({1: [0]})
+    manager._publish_snapshot(snapshot)  # does not raise
+    assert out_q.get_nowait() is snapshot
@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from naneos.manager.naneos_history_store import NaneosHistoryStore
+from naneos.partector.blueprints._data_buffer import NaneosDeviceDataBuffer
+from naneos.partector.blueprints._data_structure import NaneosDeviceDataPoint
+
+HOUR = 3_600_000
+T0 = (int(time.time() * 1e3) // HOUR - 2) * HOUR  # full hour, two hours ago
+
+
+def _snapshot(seconds: dict[int, list[int]]) -> dict[int, pd.DataFrame]:
+    points = [
+        NaneosDeviceDataPoint(
+            unix_timestamp=T0 + s * 1000,
+            serial_number=serial,
+            connection_type=NaneosDeviceDataPoint.CONN_TYPE_CONNECTED,
+            device_type=NaneosDeviceDataPoint.DEV_TYPE_P2,
+            ldsa=float(s),
+            temperature=None if s % 2 else 20.0,
+        )
+        for serial, serial_seconds in seconds.items()
+        for s in serial_seconds
+    ]
+    buffers = NaneosDeviceDataBuffer.add_data_points_to_dict({}, points)
+    return NaneosDeviceDataBuffer.to_dataframe_dict(buffers)
+
+
+def test_history_store_raw_query(tmp_path) -> None:
+    store = NaneosHistoryStore(tmp_path / "history.sqlite3")
+    snapshot = _snapshot({1: list(range(10)), 2: [0, 1]})
+    store.add(snapshot)
+
+    df = store.query(1, T0, T0 + 10_000)
+    pd.testing.assert_frame_equal(df, snapshot[1], check_index_type=False)
+
+    df = store.query(1, T0 + 2000, T0 + 4000, columns=["ldsa"])
+    assert df.index.tolist() == [T0 + 2000, T0 + 3000]
+    assert list(df.columns) == ["serial_number", "ldsa"]
+    assert store.get_serial_numbers() == [1, 2]
+
+    with pytest.raises(ValueError):
+        store.query(1, T0, T0 + 1, columns=["ldsa; DROP TABLE raw"])
+    store.close()
+
+
+def test_history_store_aggregates(tmp_path) -> None:
+    store = NaneosHistoryStore(tmp_path / "history.sqlite3")
+    store.add(_snapshot({1: list(range(0, 90))}))
+    store.add(_snapshot({1: list(range(60, 150))}))  # 60..89 are stored already
+
+    df = store.query_aggregates(1, T0, T0 + HOUR, "1min", ["ldsa", "temperature"])
+    assert df.index.tolist() == [T0, T0 + 60_000, T0 + 120_000]
+    assert df["ldsa_count"].tolist() == [60, 60, 30]
+    assert df["ldsa_mean"].tolist() == [29.5, 89.5, 134.5]
+    assert df["ldsa_min"].tolist() == [0.0, 60.0, 120.0]
+    assert df["ldsa_max"].tolist() == [59.0, 119.0, 149.0]
+    assert df["temperature_count"].tolist() == [30, 30, 15]
+
+    hourly = store.query_aggregates(1, T0, T0 + HOUR, "1h", ["ldsa", "particle_mass"])
+    assert hourly["ldsa_count"].tolist() == [150]
+    assert hourly["ldsa_mean"].tolist() == [np.mean(range(150))]
+    assert hourly["particle_mass_count"].tolist() == [0]
+    assert hourly["particle_mass_mean"].isna().all()
+
+    with pytest.raises(ValueError):
+        store.query_aggregates(1, T0, T0 + HOUR, "1d")
+    store.close()
+
+
+def test_history_store_retention(tmp_path) -> None:
+    store = NaneosHistoryStore(
+        tmp_path / "history.sqlite3", raw_retention=HOUR / 1e3, tier_retention={"1min": 0}
+    )
+    store.add(_snapshot({1: [0, 1]}))
+
+    assert store.query(1, 0, 2**62).empty
+    assert store.query_aggregates(1, 0, 2**62, "1min").empty
+    assert store.query_aggregates(1, 0, 2**62, "15min")["ldsa_count"].tolist() == [2]
+    store.close()